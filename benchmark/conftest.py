@@ -0,0 +1,154 @@
+"""synthetic but realistic payloads, shaped as the responses of Notion API."""
+
+from __future__ import annotations
+
+from typing import Any
+from uuid import UUID, uuid4, uuid5
+
+import pytest
+
+from notion_df.core.throttle import rate_limiter
+from notion_df.stand_in import SyntheticDatabase
+
+_namespace = UUID("6f1b2c4e-0d2a-4f39-9f4e-1c2b3a4d5e6f")
+_user = {"object": "user", "id": str(uuid5(_namespace, "user"))}
+_annotations = {
+    "bold": False,
+    "italic": False,
+    "strikethrough": False,
+    "underline": False,
+    "code": False,
+    "color": "default",
+}
+
+
+def get_span_raw(index: int) -> dict[str, Any]:
+    """text, linked text, bold text, code text, and mentions of a user and a page, in turn."""
+    match index % 6:
+        case 0:
+            return _get_span_raw(
+                {"type": "text", "text": {"content": f"text {index}", "link": None}}
+            )
+        case 1:
+            url = f"https://example.com/{index}"
+            return _get_span_raw(
+                {"type": "text", "text": {"content": url, "link": {"url": url}}},
+                href=url,
+            )
+        case 2:
+            raw = _get_span_raw(
+                {"type": "text", "text": {"content": "bold", "link": None}}
+            )
+            raw["annotations"] = {**_annotations, "bold": True}
+            return raw
+        case 3:
+            raw = _get_span_raw(
+                {"type": "text", "text": {"content": "code()", "link": None}}
+            )
+            raw["annotations"] = {**_annotations, "code": True, "color": "red"}
+            return raw
+        case 4:
+            return _get_span_raw(
+                {"type": "mention", "mention": {"type": "user", "user": _user}}
+            )
+        case _:
+            page_id = str(uuid5(_namespace, str(index)))
+            return _get_span_raw(
+                {
+                    "type": "mention",
+                    "mention": {"type": "page", "page": {"id": page_id}},
+                }
+            )
+
+
+def _get_span_raw(raw: dict[str, Any], href: Any = None) -> dict[str, Any]:
+    return {
+        **raw,
+        "annotations": _annotations,
+        "plain_text": "plain text",
+        "href": href,
+    }
+
+
+def get_rich_text_raw(size: int) -> list[dict[str, Any]]:
+    return [get_span_raw(index) for index in range(size)]
+
+
+def get_block_contents_raw(typename: str) -> dict[str, Any]:
+    """a typical `block[typename]` of each type in `block_contents_registry`."""
+    rich_text = get_rich_text_raw(6)
+    file = {"type": "external", "external": {"url": "https://example.com/file.pdf"}}
+    match typename:
+        case "bookmark":
+            return {"url": "https://example.com", "caption": rich_text}
+        case "breadcrumb" | "column_list" | "column" | "divider" | "unsupported":
+            return {}
+        case (
+            "bulleted_list_item"
+            | "numbered_list_item"
+            | "paragraph"
+            | "quote"
+            | "toggle"
+        ):
+            return {"rich_text": rich_text, "color": "default"}
+        case "callout":
+            return {
+                "rich_text": rich_text,
+                "icon": {"type": "emoji", "emoji": "💡"},
+                "color": "gray_background",
+            }
+        case "child_database" | "child_page":
+            return {"title": "child"}
+        case "code":
+            return {"rich_text": rich_text, "language": "python", "caption": []}
+        case "embed":
+            return {"url": "https://example.com/embed"}
+        case "equation":
+            return {"expression": "a^2+b^2=c^2"}
+        case "file" | "pdf":
+            return {**file, "caption": rich_text}
+        case "heading_1" | "heading_2" | "heading_3":
+            return {"rich_text": rich_text, "is_toggleable": False, "color": "default"}
+        case "image" | "video":
+            return file
+        case "synced_block":
+            return {"synced_from": {"block_id": str(uuid5(_namespace, "synced"))}}
+        case "table":
+            return {
+                "table_width": 3,
+                "has_column_header": True,
+                "has_row_header": False,
+            }
+        case "table_row":
+            return {"cells": [get_rich_text_raw(2) for _ in range(3)]}
+        case "table_of_contents":
+            return {"color": "default"}
+        case "to_do":
+            return {"rich_text": rich_text, "checked": True, "color": "default"}
+    raise KeyError(f"no sample of block contents, {typename=}")
+
+
+def get_block_raw(typename: str) -> dict[str, Any]:
+    return {
+        "object": "block",
+        "id": str(uuid4()),
+        "parent": {"type": "page_id", "page_id": str(uuid5(_namespace, "parent"))},
+        "created_time": "2023-01-01T00:00:00.000Z",
+        "last_edited_time": "2023-01-02T03:04:00.000Z",
+        "created_by": _user,
+        "last_edited_by": _user,
+        "has_children": False,
+        "archived": False,
+        "type": typename,
+        typename: get_block_contents_raw(typename),
+    }
+
+
+@pytest.fixture
+def database() -> SyntheticDatabase:
+    return SyntheticDatabase(uuid5(_namespace, "database"), 1000)
+
+
+@pytest.fixture
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "rate", None)
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmark.conftest import get_block_raw
+from notion_df.contents import block_contents_registry
+from notion_df.data import BlockData
+
+known_issues = {
+    "synced_block": pytest.mark.xfail(
+        raises=RecursionError, reason="SyncedBlockContents.deserialize() recurses"
+    )
+}
+typenames = [
+    pytest.param(typename, marks=known_issues.get(typename, ()))
+    for typename in block_contents_registry
+]
+
+
+@pytest.mark.parametrize("typename", typenames)
+def test_deserialize_block_data(benchmark, typename):
+    benchmark.group = "BlockData.deserialize"
+    raw = get_block_raw(typename)
+
+    block_data = benchmark(BlockData.deserialize, raw)
+    assert block_data.contents.get_typename() == typename
+
+
+@pytest.mark.parametrize("typename", typenames)
+def test_serialize_block_contents(benchmark, typename):
+    benchmark.group = "BlockContents.serialize"
+    contents = BlockData.deserialize(get_block_raw(typename)).contents
+
+    benchmark(contents.serialize)
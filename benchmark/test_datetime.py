@@ -0,0 +1,32 @@
+import dateutil.parser
+import pytest
+
+from notion_df.core.serialization import deserialize_datetime
+from notion_df.core.variable import my_tz
+
+values = [
+    "2023-01-01",
+    "2023-01-01T00:00:00.000Z",
+    "2023-01-01T00:00:00.000+09:00",
+]
+
+
+def deserialize_datetime_with_dateutil(serialized: str):
+    """the previous implementation, as the baseline."""
+    dt = dateutil.parser.parse(serialized)
+    if len(serialized) == 10:
+        return dt.date()
+    return dt.astimezone(my_tz)
+
+
+@pytest.mark.parametrize("value", values)
+def test_deserialize_datetime(benchmark, value):
+    benchmark.group = f"deserialize_datetime({value!r})"
+    result = benchmark(deserialize_datetime, value)
+    assert result == deserialize_datetime_with_dateutil(value)
+
+
+@pytest.mark.parametrize("value", values)
+def test_deserialize_datetime_with_dateutil(benchmark, value):
+    benchmark.group = f"deserialize_datetime({value!r})"
+    benchmark(deserialize_datetime_with_dateutil, value)
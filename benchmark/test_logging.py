@@ -0,0 +1,68 @@
+import sys
+from uuid import uuid4
+
+import pytest
+from loguru import logger
+
+from notion_df.core import data_core
+from notion_df.data import PageData
+from notion_df.stand_in import SyntheticDatabase
+
+size = 10_000
+
+
+@pytest.fixture(scope="module")
+def page_raw_list() -> list[dict]:
+    database = SyntheticDatabase(uuid4(), size)
+    return [database.get_page_raw(index) for index in range(size)]
+
+
+@pytest.fixture
+def log_level(request, monkeypatch):
+    """replace the handlers with a null sink of the given level."""
+    level, log_entity_data = request.param
+    monkeypatch.setattr(data_core, "log_entity_data", log_entity_data)
+    logger.remove()
+    handler_id = logger.add(lambda message: None, level=level)
+    yield
+    logger.remove(handler_id)
+    logger.add(sys.stderr)
+
+
+@pytest.mark.parametrize(
+    "log_level",
+    [("INFO", False), ("INFO", True), ("TRACE", True)],
+    ids=["default", "entity-trace-filtered", "entity-trace-emitted"],
+    indirect=True,
+)
+def test_deserialize_10k_pages(benchmark, page_raw_list, log_level):
+    """`default` skips the per-entity log. `entity-trace-filtered` is the previous behavior,
+    which logged every entity at TRACE even when no handler accepted it."""
+    benchmark.group = "deserialize 10k pages"
+
+    page_data_list = benchmark.pedantic(
+        lambda: [PageData.deserialize(raw) for raw in page_raw_list], rounds=3
+    )
+    assert len(page_data_list) == size
+
+
+@pytest.mark.parametrize(
+    "log_level", [("WARNING", False)], ids=["filtered"], indirect=True
+)
+@pytest.mark.parametrize("lazy", [True, False], ids=["lazy", "f-string"])
+def test_log_10k_page_calls(benchmark, page_raw_list, log_level, lazy):
+    """the message of `Page.*` methods, whose repr resolves the parent from the local data."""
+    from notion_df.entity import Page
+
+    benchmark.group = "log 10k Page calls"
+    pages = [Page(PageData.deserialize(raw).set_real().id) for raw in page_raw_list]
+
+    def log_lazy():
+        for page in pages:
+            logger.info("Page.retrieve({})", page)
+
+    def log_f_string():
+        for page in pages:
+            logger.info(f"Page.retrieve({page})")
+
+    benchmark(log_lazy if lazy else log_f_string)
@@ -0,0 +1,33 @@
+import pytest
+
+from notion_df.data import PageData
+from notion_df.request.database import QueryDatabase
+
+
+@pytest.mark.parametrize("page_size", [10, 100])
+def test_deserialize_page_data(benchmark, database, page_size):
+    benchmark.group = "PageData.deserialize"
+    results = database.query(page_size=page_size)["results"]
+
+    page_data_list = benchmark(lambda: [PageData.deserialize(raw) for raw in results])
+    assert len(page_data_list) == page_size
+
+
+def test_parse_query_response(benchmark, database):
+    response = database.query()
+
+    page_data_list = benchmark(
+        lambda: list(QueryDatabase.parse_response_data(response))
+    )
+    assert len(page_data_list) == 100
+
+
+def test_serialize_page_properties(benchmark, database):
+    properties_list = [
+        PageData.deserialize(raw).properties for raw in database.query()["results"]
+    ]
+
+    serialized = benchmark(
+        lambda: [properties.serialize() for properties in properties_list]
+    )
+    assert serialized[0]["Count"]["number"] == 0
@@ -0,0 +1,42 @@
+import pytest
+
+from notion_df.core.collection import Paginator
+
+size = 10_000
+
+
+def get_paginator() -> Paginator[int]:
+    return Paginator(int, iter(range(size)))
+
+
+def test_paginator_iterate(benchmark):
+    benchmark.group = "Paginator"
+
+    assert benchmark(lambda: sum(1 for _ in get_paginator())) == size
+
+
+def test_paginator_len(benchmark):
+    benchmark.group = "Paginator"
+
+    assert benchmark(lambda: len(get_paginator())) == size
+
+
+@pytest.mark.parametrize("index", [0, size // 2, -1])
+def test_paginator_index(benchmark, index):
+    benchmark.group = "Paginator"
+
+    assert benchmark(lambda: get_paginator()[index]) == range(size)[index]
+
+
+def test_paginator_slice(benchmark):
+    benchmark.group = "Paginator"
+
+    assert len(benchmark(lambda: get_paginator()[100:200])) == 100
+
+
+def test_paginator_random_access(benchmark):
+    benchmark.group = "Paginator"
+    paginator = get_paginator()
+    len(paginator)
+
+    benchmark(lambda: [paginator[i] for i in range(0, size, 7)])
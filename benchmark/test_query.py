@@ -0,0 +1,41 @@
+import pytest
+
+from notion_df.core import transport
+from notion_df.core.cache import query_cache
+from notion_df.core.transport import Record, ReplayTransport
+from notion_df.entity import Database
+
+
+@pytest.fixture
+def replay(database, no_rate_limit):
+    """every response page of the database query, recorded in advance."""
+    path = f"/v1/databases/{database.id}/query"
+    records = []
+    for start in range(0, database.size, 100):
+        body = {"start_cursor": str(start)} if start else {}
+        records.append(Record("POST", path, None, body, 200, database.query(start), {}))
+    previous = transport.set_transport(ReplayTransport(records))
+    yield
+    transport.set_transport(previous)
+
+
+@pytest.mark.parametrize("prefetch", [0, 1])
+def test_query(benchmark, database, replay, prefetch):
+    benchmark.group = "Database.query"
+    query_cache.configure(None)
+
+    pages = benchmark(lambda: list(Database(database.id).query(prefetch=prefetch)))
+    assert len(pages) == database.size
+
+
+def test_query_frame(benchmark, database, replay, monkeypatch):
+    benchmark.group = "Database.query"
+    from notion_df.frame import get_columns
+    from notion_df.property import DatabaseProperties
+
+    properties = DatabaseProperties.deserialize(database.get_raw()["properties"])
+    monkeypatch.setattr(Database, "properties", properties)
+    assert get_columns(properties)
+
+    frame = benchmark(lambda: Database(database.id).query_frame())
+    assert len(frame) == database.size
@@ -0,0 +1,22 @@
+import pytest
+
+from benchmark.conftest import get_rich_text_raw
+from notion_df.rich_text import RichText
+
+
+@pytest.mark.parametrize("size", [6, 60])
+def test_deserialize_rich_text(benchmark, size):
+    benchmark.group = "RichText.deserialize"
+    raw = get_rich_text_raw(size)
+
+    rich_text = benchmark(RichText.deserialize, raw)
+    assert len(rich_text) == size
+
+
+@pytest.mark.parametrize("size", [6, 60])
+def test_rich_text_round_trip(benchmark, size):
+    benchmark.group = "RichText round trip"
+    raw = get_rich_text_raw(size)
+
+    serialized = benchmark(lambda: RichText.deserialize(raw).serialize())
+    assert len(serialized) == size
@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, field
 from functools import cache
-from typing import cast, Any, Optional, TYPE_CHECKING, get_type_hints
+from typing import cast, Any, Optional, get_type_hints
 
 from typing_extensions import Self
 
@@ -15,9 +15,6 @@ from notion_df.file import File
 from notion_df.misc import Icon
 from notion_df.rich_text import RichText, Span
 
-if TYPE_CHECKING:
-    from notion_df.data import BlockData
-
 block_contents_registry: FinalDict[str, type[BlockContents]] = FinalDict()
 
 
@@ -58,16 +55,19 @@ class BlockContents(DualSerializable, metaclass=ABCMeta):
 def serialize_block_contents_list(
     block_contents_list: list[BlockContents],
 ) -> Optional[list[dict[str, Any]]]:
+    """the nested children set on each block contents are serialized inline."""
     if not block_contents_list:
         return None
-    return [
-        {
-            "object": "block",
-            "type": block_type.get_typename(),
-            block_type.get_typename(): block_type.serialize(),
-        }
-        for block_type in block_contents_list
-    ]
+    serialized_list = []
+    for block_contents in block_contents_list:
+        typename = block_contents.get_typename()
+        serialized = block_contents.serialize()
+        if children := getattr(block_contents, "children", None):
+            serialized["children"] = serialize_block_contents_list(children)
+        serialized_list.append(
+            {"object": "block", "type": typename, typename: serialized}
+        )
+    return serialized_list
 
 
 @dataclass
@@ -91,7 +91,7 @@ class BreadcrumbBlockContents(BlockContents):
 class BulletedListItemBlockContents(BlockContents):
     rich_text: RichText
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -103,7 +103,7 @@ class CalloutBlockContents(BlockContents):
     rich_text: RichText
     icon: Icon
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -255,7 +255,7 @@ class ImageBlockContents(BlockContents):
 class NumberedListItemBlockContents(BlockContents):
     rich_text: RichText
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -266,7 +266,7 @@ class NumberedListItemBlockContents(BlockContents):
 class ParagraphBlockContents(BlockContents):
     rich_text: RichText
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -294,7 +294,7 @@ class PDFBlockContents(BlockContents):
 class QuoteBlockContents(BlockContents):
     rich_text: RichText
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -324,7 +324,7 @@ class SyncedBlockContents(BlockContents, metaclass=ABCMeta):
 class OriginalSyncedBlockValue(SyncedBlockContents):
     """cannot be changed (2023-04-02)"""
 
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     def serialize(self) -> dict[str, Any]:
         return {"synced_from": None, "children": self.children}
@@ -380,7 +380,7 @@ class ToDoBlockContents(BlockContents):
     rich_text: RichText
     checked: bool
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -391,7 +391,7 @@ class ToDoBlockContents(BlockContents):
 class ToggleBlockContents(BlockContents):
     rich_text: RichText
     color: BlockColor = BlockColor.DEFAULT
-    children: list[BlockData] = field(init=False, default=None)
+    children: Optional[list[BlockContents]] = field(init=False, default=None)
 
     @classmethod
     def get_typename(cls) -> str:
@@ -0,0 +1,621 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Iterator,
+    MutableMapping,
+    Optional,
+    TypeVar,
+    cast,
+    TYPE_CHECKING,
+)
+from uuid import UUID
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from notion_df.core.data_core import EntityData
+    from notion_df.entity import Database, Page
+
+KT = TypeVar("KT", bound=Hashable)
+VT = TypeVar("VT")
+PageT = TypeVar("PageT", bound="Page")
+_missing: Any = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    size: int
+    """the number of entries currently stored."""
+    nbytes: int
+    """the estimated size of the entries currently stored. 0 if the backend does not measure it."""
+    hits: int
+    misses: int
+    evictions: int
+    """the number of entries dropped by the size limits or expiration."""
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheBackend(MutableMapping[KT, VT], Generic[KT, VT], metaclass=ABCMeta):
+    """the storage of entity data.
+    lookups through `get()` and `[]` are counted as hits and misses; `in` and iteration are not."""
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        pass
+
+    @abstractmethod
+    def reset_stats(self) -> None:
+        pass
+
+    def get_timestamp(self, key: KT) -> Optional[int]:
+        """the `timestamp` of the stored entity data, used to keep only the latest one."""
+        if (data := self.get(key)) is None:
+            return None
+        return cast("EntityData", data).timestamp
+
+
+class DictCache(CacheBackend[KT, VT]):
+    """the unbounded cache, which keeps every entry until it is deleted."""
+
+    def __init__(self):
+        self._data: dict[KT, VT] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def __getitem__(self, key: KT) -> VT:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            raise
+        self._hits += 1
+        return value
+
+    def get(self, key: KT, default: Any = None) -> Any:
+        # overridden to skip the exception of Mapping.get()
+        if (value := self._data.get(key, _missing)) is _missing:
+            self._misses += 1
+            return default
+        self._hits += 1
+        return value
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        self._data[key] = value
+
+    def __delitem__(self, key: KT) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[KT]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._data),
+            nbytes=0,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=0,
+        )
+
+    def reset_stats(self) -> None:
+        self._hits = self._misses = 0
+
+
+class LRUCache(CacheBackend[KT, VT]):
+    """thread-safe cache which evicts the least recently used entries.
+
+    - maxsize: the maximum number of entries.
+    - max_bytes: the maximum of the summed size of entries, measured by `get_size`.
+    - ttl: seconds after which an entry expires. it is counted from the time of setting, not of lookup.
+    - get_size: the byte estimate of an entry. `estimate_size()` by default.
+
+    None means no limit."""
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        get_size: Optional[Callable[[VT], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.get_size: Callable[[VT], int] = get_size or estimate_size
+        self._data: OrderedDict[KT, _Entry[VT]] = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __getitem__(self, key: KT) -> VT:
+        if (value := self.get(key, _missing)) is _missing:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: KT, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            if self._is_expired(entry, time.monotonic()):
+                self._pop(key)
+                self._evictions += 1
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry.value
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        size = self.get_size(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = _Entry(value, size, time.monotonic())
+            self._nbytes += size
+            self._evict()
+
+    def __delitem__(self, key: KT) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and not self._is_expired(entry, time.monotonic())
+
+    def __iter__(self) -> Iterator[KT]:
+        with self._lock:
+            self.expire()
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+
+    def configure(
+        self,
+        maxsize: Optional[int] = _missing,
+        max_bytes: Optional[int] = _missing,
+        ttl: Optional[float] = _missing,
+    ) -> None:
+        """update the given limits, and evict the entries beyond them. the omitted ones are unchanged.
+        the byte sizes are only measured while `max_bytes` is set."""
+        with self._lock:
+            if max_bytes is not _missing:
+                if max_bytes is not None and self.max_bytes is None:
+                    self._nbytes = 0
+                    for entry in self._data.values():
+                        entry.size = self.get_size(entry.value)
+                        self._nbytes += entry.size
+                self.max_bytes = max_bytes
+            if maxsize is not _missing:
+                self.maxsize = maxsize
+            if ttl is not _missing:
+                self.ttl = ttl
+            self.expire()
+            self._evict()
+
+    def expire(self) -> int:
+        """drop all expired entries. return the number of them."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            expired_keys = [
+                key for key, entry in self._data.items() if self._is_expired(entry, now)
+            ]
+            for key in expired_keys:
+                self._pop(key)
+            self._evictions += len(expired_keys)
+            return len(expired_keys)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._data),
+                nbytes=self._nbytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._hits = self._misses = self._evictions = 0
+
+    def _is_expired(self, entry: _Entry[VT], now: float) -> bool:
+        return self.ttl is not None and now - entry.stored_at > self.ttl
+
+    def _pop(self, key: KT) -> VT:
+        entry = self._data.pop(key)
+        self._nbytes -= entry.size
+        return entry.value
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.maxsize is not None and len(self._data) > self.maxsize)
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            _, entry = self._data.popitem(last=False)
+            self._nbytes -= entry.size
+            self._evictions += 1
+
+
+class SQLiteCache(CacheBackend[tuple[type["EntityData"], UUID], "EntityData"]):
+    """thread-safe cache which persists the raw JSON of entity data in a SQLite file,
+    so that the next process can start with the data of the previous one.
+
+    - path: the database file. it is created if not exists.
+    - max_age: seconds after which a stored entry is ignored. it is counted from the retrieval.
+    - front: the in-memory cache of the rehydrated data. `LRUCache` of 1000 entries by default.
+    - batch_size: the number of writes after which they are committed together.
+
+    the pending writes are also committed on `flush()`, `clear()` and `close()`.
+    call `refresh()` on start to update the stored pages of a database with a single query."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_age: Optional[float] = None,
+        front: Optional[CacheBackend] = None,
+        batch_size: int = 100,
+    ):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.front: CacheBackend = (
+            front if front is not None else LRUCache(maxsize=1000)
+        )
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(_sqlite_schema)
+        self._pending = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __getitem__(self, key: tuple[type[EntityData], UUID]) -> EntityData:
+        if (value := self.get(key, _missing)) is _missing:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: tuple[type[EntityData], UUID], default: Any = None) -> Any:
+        with self._lock:
+            data = self.front.get(key, _missing)
+            if data is _missing or not self._is_fresh(data.timestamp):
+                data = self._load(key)
+            if data is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return data
+
+    def __setitem__(
+        self, key: tuple[type[EntityData], UUID], value: EntityData
+    ) -> None:
+        data_cls, id_ = key
+        raw = value.raw
+        parent = raw.get("parent")
+        # workspace parents have `"workspace": true` instead of an id.
+        parent_id = parent.get(parent.get("type")) if isinstance(parent, dict) else None
+        with self._lock:
+            self.front[key] = value
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entity_data VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    _get_cls_path(data_cls),
+                    str(id_),
+                    parent_id if isinstance(parent_id, str) else None,
+                    raw.get("last_edited_time"),
+                    value.timestamp,
+                    json.dumps(raw),
+                ),
+            )
+            self._add_pending()
+
+    def __delitem__(self, key: tuple[type[EntityData], UUID]) -> None:
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM entity_data WHERE data_cls = ? AND id = ?",
+                (_get_cls_path(key[0]), str(key[1])),
+            )
+            self._add_pending()
+            in_front = self.front.pop(key, _missing) is not _missing
+            if not cursor.rowcount and not in_front:
+                raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get_timestamp(key) is not None
+
+    def __iter__(self) -> Iterator[tuple[type[EntityData], UUID]]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data_cls, id FROM entity_data WHERE timestamp >= ?",
+                (self._get_min_timestamp(),),
+            ).fetchall()
+        return iter(
+            [(_resolve_cls_path(cls_path), UUID(id_)) for cls_path, id_ in rows]
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT count(*) FROM entity_data WHERE timestamp >= ?",
+                (self._get_min_timestamp(),),
+            ).fetchone()
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM entity_data")
+            self._connection.execute("DELETE FROM refresh_watermark")
+            self.flush()
+            self.front.clear()
+
+    def flush(self) -> None:
+        """commit the pending writes."""
+        with self._lock:
+            self._connection.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self),
+            nbytes=self.path.stat().st_size,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=0,
+        )
+
+    def reset_stats(self) -> None:
+        self._hits = self._misses = 0
+
+    def get_timestamp(self, key: tuple[type[EntityData], UUID]) -> Optional[int]:
+        """overridden to compare without rehydrating the stored data."""
+        with self._lock:
+            if (data := self.front.get(key)) is not None and self._is_fresh(
+                data.timestamp
+            ):
+                return data.timestamp
+            row = self._connection.execute(
+                "SELECT timestamp FROM entity_data WHERE data_cls = ? AND id = ?",
+                (_get_cls_path(key[0]), str(key[1])),
+            ).fetchone()
+        if row is None or not self._is_fresh(row[0]):
+            return None
+        return row[0]
+
+    def get_watermark(self, database_id: UUID) -> Optional[datetime]:
+        """the time of the latest `refresh()` of the database, floored to the minute."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT queried_time FROM refresh_watermark WHERE database_id = ?",
+                (str(database_id),),
+            ).fetchone()
+        return None if row is None else datetime.fromtimestamp(row[0], timezone.utc)
+
+    def refresh(self, database: Database) -> list[Page]:
+        """query the pages of the database edited since the previous refresh, which replace the stored data.
+        the other stored pages of the database are renewed as fresh. return the queried pages."""
+        from notion_df.filter import last_edited_time_filter
+
+        # the precision of last_edited_time is a minute, so the pages edited within the same minute are queried again.
+        queried_time = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        timestamp = int(datetime.now().timestamp())
+        if (watermark := self.get_watermark(database.id)) is None:
+            pages = list(database.query())
+        else:
+            pages = list(database.query(last_edited_time_filter.on_or_after(watermark)))
+        with self._lock:
+            self._connection.execute(
+                "UPDATE entity_data SET timestamp = ? WHERE parent_id = ? AND timestamp < ?",
+                (timestamp, str(database.id), timestamp),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO refresh_watermark VALUES (?, ?)",
+                (str(database.id), queried_time.timestamp()),
+            )
+            for page in pages:
+                self[page.data._pk] = page.data
+            self.flush()
+        logger.info("SQLiteCache.refresh({}): {} pages", database, len(pages))
+        return pages
+
+    def _load(self, key: tuple[type[EntityData], UUID]) -> Optional[EntityData]:
+        data_cls, id_ = key
+        row = self._connection.execute(
+            "SELECT timestamp, raw FROM entity_data WHERE data_cls = ? AND id = ?",
+            (_get_cls_path(data_cls), str(id_)),
+        ).fetchone()
+        if row is None or not self._is_fresh(row[0]):
+            return None
+        timestamp, raw = row
+        data = replace(data_cls.deserialize(json.loads(raw)), timestamp=timestamp)
+        self.front[key] = data
+        return data
+
+    def _add_pending(self) -> None:
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def _get_min_timestamp(self) -> float:
+        if self.max_age is None:
+            return 0
+        return datetime.now().timestamp() - self.max_age
+
+    def _is_fresh(self, timestamp: int) -> bool:
+        return timestamp >= self._get_min_timestamp()
+
+
+_sqlite_schema = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS entity_data (
+    data_cls TEXT NOT NULL,
+    id TEXT NOT NULL,
+    parent_id TEXT,
+    last_edited_time TEXT,
+    timestamp INTEGER NOT NULL,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (data_cls, id)
+);
+CREATE INDEX IF NOT EXISTS entity_data_parent_id ON entity_data (parent_id);
+CREATE TABLE IF NOT EXISTS refresh_watermark (
+    database_id TEXT NOT NULL PRIMARY KEY,
+    queried_time REAL NOT NULL
+);
+"""
+
+
+def _get_cls_path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _resolve_cls_path(cls_path: str) -> type:
+    module_name, qualname = cls_path.split(":")
+    return getattr(importlib.import_module(module_name), qualname)
+
+
+class QueryCache:
+    """thread-safe cache of database query results, as the ordered page ids.
+    the page data are not stored here, but looked up from the real data.
+
+    - ttl: seconds to keep a result. None disables the cache."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._data: dict[tuple[UUID, str], tuple[float, list[UUID]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl is not None
+
+    def configure(self, ttl: Optional[float]) -> None:
+        with self._lock:
+            self.ttl = ttl
+            self._data.clear()
+
+    def get(self, database_id: UUID, body: Any) -> Optional[list[UUID]]:
+        if self.ttl is None:
+            return None
+        key = self._get_key(database_id, body)
+        with self._lock:
+            if (value := self._data.get(key)) is not None:
+                stored_at, page_ids = value
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._hits += 1
+                    return page_ids
+                del self._data[key]
+            self._misses += 1
+            return None
+
+    def set(self, database_id: UUID, body: Any, page_ids: list[UUID]) -> None:
+        if self.ttl is None:
+            return
+        key = self._get_key(database_id, body)
+        with self._lock:
+            self._data[key] = time.monotonic(), page_ids
+
+    def record(
+        self, database_id: UUID, body: Any, pages: Iterator[PageT]
+    ) -> Iterator[PageT]:
+        """pass through the pages, and store the result once they are fully consumed."""
+        if self.ttl is None:
+            yield from pages
+            return
+        page_ids = []
+        for page in pages:
+            page_ids.append(page.id)
+            yield page
+        self.set(database_id, body, page_ids)
+
+    def invalidate(self, database_id: Optional[UUID] = None) -> None:
+        """drop the results of the database, or all results if not given."""
+        with self._lock:
+            if database_id is None:
+                self._data.clear()
+                return
+            for key in [key for key in self._data if key[0] == database_id]:
+                del self._data[key]
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                size=len(self._data),
+                nbytes=0,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=0,
+            )
+
+    @staticmethod
+    def _get_key(database_id: UUID, body: Any) -> tuple[UUID, str]:
+        return database_id, json.dumps(body, sort_keys=True, default=str)
+
+
+query_cache = QueryCache()
+"""the process-wide query cache used by `Database.query()`. call `query_cache.configure(ttl=...)` to enable it."""
+
+
+@dataclass
+class _Entry(Generic[VT]):
+    value: VT
+    size: int
+    stored_at: float
+
+
+def estimate_size(value: Any) -> int:
+    """the approximate memory size of a JSON-like value, including its contents.
+    objects with `raw` (entity data) are measured by their raw JSON."""
+    if (raw := getattr(value, "raw", None)) is not None:
+        return sys.getsizeof(value) + estimate_size(raw)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k) + estimate_size(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            size += estimate_size(v)
+    return size
@@ -1,13 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import fields
+import queue
+import threading
+from dataclasses import dataclass, fields, replace
 from enum import Enum
 from itertools import chain
-from typing import TypeVar, NewType, Iterable, Optional, Iterator, Sequence, overload
+from typing import (
+    TypeVar,
+    NewType,
+    Iterable,
+    Optional,
+    Iterator,
+    Sequence,
+    overload,
+    TYPE_CHECKING,
+)
 
 from notion_df.core.exception import ImplementationError
 from notion_df.core.misc import repr_object
 
+if TYPE_CHECKING:
+    from _typeshed import DataclassInstance
+
 
 class StrEnum(str, Enum):  # TODO: use builtin StrEnum after py3.11
     @property
@@ -52,6 +66,7 @@ class DictFilter:
 
 
 T = TypeVar("T")
+DataclassT = TypeVar("DataclassT", bound="DataclassInstance")
 
 
 def peek(it: Iterable[T]) -> Optional[Iterator[T]]:
@@ -63,6 +78,53 @@ def peek(it: Iterable[T]) -> Optional[Iterator[T]]:
     return chain([_first_element], it)
 
 
+def prefetch(it: Iterable[T], depth: int) -> Iterator[T]:
+    """iterate on a background (daemon) thread, keeping up to `depth` elements ahead of the consumer.
+    exceptions are re-raised on the consumer side.
+    the thread stops when the consumer is closed or garbage-collected, after its current element is produced."""
+    buffer: queue.Queue[T | _PrefetchEnd] = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item: T | _PrefetchEnd) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for element in it:
+                if not put(element):
+                    return
+        except BaseException as e:  # NOSONAR
+            put(_PrefetchEnd(e))
+            return
+        put(_PrefetchEnd())
+
+    threading.Thread(target=produce, name="notion_df-prefetch", daemon=True).start()
+    try:
+        while True:
+            item = buffer.get()
+            if isinstance(item, _PrefetchEnd):
+                if item.exception is not None:
+                    raise item.exception
+                return
+            yield item
+    finally:
+        stopped.set()
+
+
+@dataclass(frozen=True)
+class _PrefetchEnd:
+    """the last item of the prefetch buffer."""
+
+    exception: Optional[BaseException] = None
+    """raised by the iterable, if any."""
+
+
 class Paginator(Sequence[T]):
     def __init__(self, element_type: type[T], it: Iterator[T]):
         self.element_type: type[T] = element_type
@@ -73,6 +135,19 @@ class Paginator(Sequence[T]):
     def __repr__(self):
         return repr_object(self, element_type=self.element_type)
 
+    def __enter__(self) -> Paginator[T]:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """stop fetching the rest. the fetched elements are kept.
+        call this on a paginator left partly consumed, to stop its background prefetch if any."""
+        if (close := getattr(self._it, "close", None)) is not None:
+            close()
+        self._it = iter(())
+
     def _fetch_until(self, index: int) -> None:
         """fetch until self._values[index] is possible"""
         while len(self._values) <= index:
@@ -122,10 +197,18 @@ class Paginator(Sequence[T]):
             raise TypeError(f"Expected int or slice, {self=}, {index=}")
 
 
-def coalesce_dataclass(target: T, source: T) -> None:
-    """Modify the target, by filling None fields from source."""
+def coalesce_dataclass(target: DataclassT, source: DataclassInstance) -> DataclassT:
+    """Return a copy of the target, with None init fields filled from source.
+    The target is returned as is if nothing is filled. Neither is modified."""
     if type(target) is not type(source):
         raise ValueError("Both instances must be of the same dataclass type.")
-    for field in fields(target):
-        if getattr(target, field.name) is None:
-            setattr(target, field.name, getattr(source, field.name))
+    missing = {
+        field.name: source_value
+        for field in fields(target)
+        if field.init
+        and getattr(target, field.name) is None
+        and (source_value := getattr(source, field.name)) is not None
+    }
+    if not missing:
+        return target
+    return replace(target, **missing)
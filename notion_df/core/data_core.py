@@ -5,38 +5,49 @@ import functools
 from abc import ABCMeta
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, TypeVar, MutableMapping, Final
+from typing import Any, Callable, TypeVar, Optional, cast
 from uuid import UUID
 
 from loguru import logger
 from typing_extensions import Self
 
+from notion_df.core.cache import CacheBackend, DictCache
 from notion_df.core.collection import coalesce_dataclass
 from notion_df.core.serialization import Deserializable
 
-real_data_dict: Final[MutableMapping[tuple[type[EntityData], UUID], EntityData]] = {}
-preview_data_dict: Final[MutableMapping[tuple[type[EntityData], UUID], EntityData]] = {}
+real_data_dict: CacheBackend[tuple[type[EntityData], UUID], EntityData] = DictCache()
+preview_data_dict: CacheBackend[tuple[type[EntityData], UUID], EntityData] = DictCache()
+log_entity_data: bool = False
+"""log every created entity data at TRACE level. off by default, as it is on the path of every deserialization."""
 
 
-@dataclass
+def set_cache_backend(
+    real: Optional[CacheBackend] = None, preview: Optional[CacheBackend] = None
+) -> None:
+    """replace the storage of the real data and the preview data. the current entries are moved to the new one.
+
+    ex) set_cache_backend(real=LRUCache(maxsize=10_000, ttl=3600))"""
+    global real_data_dict, preview_data_dict
+    if real is not None:
+        real.update(real_data_dict.items())
+        real_data_dict = real
+    if preview is not None:
+        preview.update(preview_data_dict.items())
+        preview_data_dict = preview
+
+
+@dataclass(frozen=True, slots=True)
 class EntityData(Deserializable, metaclass=ABCMeta):
     id: UUID
-    raw: dict[str, Any] = field(init=False, default_factory=dict)
+    raw: dict[str, Any] = field(kw_only=True, default_factory=dict)
     timestamp: int = field(
-        init=False, default_factory=lambda: int(datetime.now().timestamp())
+        kw_only=True, default_factory=lambda: int(datetime.now().timestamp())
     )
-    """the timestamp of instance creation."""
-    finalized: bool = field(init=False, default=False)  # TODO use frozen=True
+    """the timestamp of instance creation. given explicitly when the instance is restored from a storage."""
 
     def __post_init__(self) -> None:
-        logger.trace(self)
-        self.finalized = True
-
-    def __setattr__(self, key: str, value: Any) -> None:
-        # TODO: use frozen=True
-        if getattr(self, "finalized", None) and key != "finalized":
-            raise AttributeError(key, value)
-        super().__setattr__(key, value)
+        if log_entity_data:
+            logger.trace("{}", self)
 
     @property
     def _pk(self) -> tuple[type[EntityData], UUID]:
@@ -44,11 +55,8 @@ class EntityData(Deserializable, metaclass=ABCMeta):
 
     def set_real(self) -> Self:
         """ATTEMPT to set the instance as the real data, if it is the latest."""
-        current_latest_data = real_data_dict.get(self._pk)
-        if (
-            current_latest_data is None
-            or self.timestamp >= current_latest_data.timestamp
-        ):
+        current_timestamp = real_data_dict.get_timestamp(self._pk)
+        if current_timestamp is None or self.timestamp >= current_timestamp:
             real_data_dict[self._pk] = self
         return self
 
@@ -59,15 +67,13 @@ class EntityData(Deserializable, metaclass=ABCMeta):
         return self
 
     def add_preview(self) -> Self:
-        """Set the instance as the preview data.
-        If another preview data exists, COALESCE them (with this one taking priority).
+        """Set the instance as the preview data, and return the stored one.
+        If another preview data exists, COALESCE them (with this one taking priority) into a new instance.
 
         Preview data acts as a default, placeholder data with last lookup priority.
         Set preview data for static pages to reduce the number of API calls."""
         if past_self := preview_data_dict.get(self._pk):
-            self.finalized = False
-            coalesce_dataclass(self, past_self)
-            self.finalized = True
+            self = coalesce_dataclass(self, past_self)
         preview_data_dict[self._pk] = self
         return self
 
@@ -76,28 +82,38 @@ class EntityData(Deserializable, metaclass=ABCMeta):
         del preview_data_dict[self._pk]
         return self
 
-    def __del__(self) -> None:
-        del self.raw
-
     def __init_subclass__(cls, **kwargs) -> None:
-        super().__init_subclass__(**kwargs)
-        _deserialize_this = cls._deserialize_this
-
-        @functools.wraps(_deserialize_this)
-        def _deserialize_this_wrapped(raw: dict[str, Any]) -> Self:
-            self: EntityData = _deserialize_this(raw)
-            self.finalized = False
-            self.raw = raw
-            self.finalized = True
+        # zero-argument super() does not work on the classes recreated by dataclass(slots=True)
+        super(EntityData, cls).__init_subclass__(**kwargs)
+        _deserialize_this = cls.__dict__.get("_deserialize_this")
+        if (
+            not isinstance(_deserialize_this, classmethod)
+            or cls.__dict__.get("_raw_setting_deserialize_this") is _deserialize_this
+        ):
+            # the class recreated by dataclass(slots=True) has the wrapped one already
+            return
+        deserialize_this: Callable[[type[EntityData], dict[str, Any]], EntityData] = (
+            _deserialize_this.__func__
+        )
+
+        @functools.wraps(deserialize_this)
+        def _deserialize_this_wrapped(
+            _cls: type[EntityData], raw: dict[str, Any]
+        ) -> EntityData:
+            self = deserialize_this(_cls, raw)
+            object.__setattr__(self, "raw", raw)
             return self
 
-        setattr(cls, "_deserialize_this", _deserialize_this_wrapped)
+        _deserialize_this = classmethod(_deserialize_this_wrapped)
+        setattr(cls, "_deserialize_this", _deserialize_this)
+        setattr(cls, "_raw_setting_deserialize_this", _deserialize_this)
 
     @classmethod
     def _deserialize_subclass(cls, raw: Any) -> Self:
         from notion_df.data import BlockData, DatabaseData, PageData
 
         object_kind = raw["object"]
+        subclass: type[EntityData]
         match object_kind:
             case "block":
                 subclass = BlockData
@@ -107,7 +123,7 @@ class EntityData(Deserializable, metaclass=ABCMeta):
                 subclass = PageData
             case _:
                 raise ValueError(object_kind)
-        return subclass.deserialize(raw)
+        return cast(Self, subclass.deserialize(raw))
 
     @property
     def time(self) -> datetime:
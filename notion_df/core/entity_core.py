@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import time
 from abc import abstractmethod, ABCMeta
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Final,
     Generic,
     Hashable,
+    Iterable,
+    Optional,
     Union,
     final,
     TypeVar,
@@ -16,7 +20,8 @@ from uuid import UUID
 from loguru import logger
 from typing_extensions import Self
 
-from notion_df.core.data_core import EntityDataT, real_data_dict, preview_data_dict
+from notion_df.core import data_core
+from notion_df.core.data_core import EntityDataT
 from notion_df.core.exception import ImplementationError
 from notion_df.core.misc import undefined, repr_object, Undefined
 
@@ -74,9 +79,10 @@ class Entity(Hashable, Generic[EntityDataT], metaclass=ABCMeta):
     @property
     def local_data(self) -> Union[EntityDataT, Undefined]:
         """Use this instead of `data` if you want to avoid on-demand retrieval."""
-        return real_data_dict.get(
-            self._hash_key, preview_data_dict.get(self._hash_key, undefined)
-        )
+        key = self._hash_key
+        if (data := data_core.real_data_dict.get(key, undefined)) is not undefined:
+            return data
+        return data_core.preview_data_dict.get(key, undefined)
 
 
 CallableT = TypeVar("CallableT", bound=Callable)
@@ -86,7 +92,7 @@ def retrieve_on_demand(func: CallableT) -> CallableT:
     def wrapper(self: RetrievableEntity, *args, **kwargs):
         if (result := func(self, *args, **kwargs)) is not undefined:
             return result
-        logger.debug(f"retrieve on-demand, {self=}")
+        logger.debug("retrieve on-demand, self={!r}", self)
         self.retrieve()
         if (result := func(self, *args, **kwargs)) is not undefined:
             return result
@@ -101,6 +107,42 @@ class RetrievableEntity(Entity[EntityDataT]):
         # TODO: raise EntityNotExistError(ValueError), with page_exists()
         pass
 
+    @classmethod
+    def retrieve_many(
+        cls,
+        entities: Iterable[Self],
+        max_workers: int = 4,
+        max_age: Optional[float] = None,
+    ) -> list[Self]:
+        """retrieve the entities concurrently, skipping the duplicates and those with real data already.
+        return the entities in the input order.
+
+        - max_age: seconds after which the real data is retrieved again. None means the real data is always fresh."""
+        entities = list(entities)
+        min_timestamp = None if max_age is None else time.time() - max_age
+        stale_entities = []
+        for entity in dict.fromkeys(entities):
+            timestamp = data_core.real_data_dict.get_timestamp(entity._hash_key)
+            if timestamp is None or (
+                min_timestamp is not None and timestamp < min_timestamp
+            ):
+                stale_entities.append(entity)
+        logger.info(
+            "{}.retrieve_many(): {} of {} entities",
+            cls.__name__,
+            len(stale_entities),
+            len(entities),
+        )
+        if len(stale_entities) == 1:
+            stale_entities[0].retrieve()
+        elif stale_entities:
+            with ThreadPoolExecutor(
+                max_workers, thread_name_prefix="retrieve_many"
+            ) as executor:
+                for _ in executor.map(lambda entity: entity.retrieve(), stale_entities):
+                    pass
+        return entities
+
     @final
     @property
     @retrieve_on_demand
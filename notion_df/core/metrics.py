@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Literal, Optional, TYPE_CHECKING
+
+from notion_df.core.misc import repr_object
+
+if TYPE_CHECKING:
+    from notion_df.core.request_core import Request
+
+RequestEventKind = Literal["start", "end", "retry", "throttle", "parse"]
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    kind: RequestEventKind
+    """
+    - start: before the first attempt.
+    - end: after the last attempt, either succeeded or failed. `duration` covers every attempt and sleep.
+    - retry: before sleeping between attempts. `duration` is the sleep.
+    - throttle: after waiting for the rate limiter. `duration` is the wait.
+    - parse: after deserializing the response data. `duration` is the parse time."""
+    request: Request
+    duration: float = 0
+    """seconds."""
+    status_code: Optional[int] = None
+    response_size: Optional[int] = None
+    """bytes of the response body."""
+    attempt_number: Optional[int] = None
+    exception: Optional[BaseException] = None
+
+    @property
+    def route(self) -> str:
+        return get_route(self.request.path)
+
+    @property
+    def builder(self) -> Optional[str]:
+        """the class name of the `RequestBuilder` which created the request."""
+        return self.request.builder
+
+
+RequestHook = Callable[[RequestEvent], None]
+hooks: list[RequestHook] = []
+"""called with every request event, on the thread which sends the request. keep them fast."""
+
+_id_pattern = re.compile(
+    r"(?<=/)[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}(?=/|$)",
+    re.IGNORECASE,
+)
+_property_id_pattern = re.compile(r"(?<=/properties/)[^/]+")
+
+
+def get_route(path: str) -> str:
+    """the path with ids replaced. ex) databases/{id}/query, pages/{id}/properties/{property_id}"""
+    path = _id_pattern.sub("{id}", "/" + path.strip("/"))
+    return _property_id_pattern.sub("{property_id}", path).lstrip("/")
+
+
+def add_hook(hook: RequestHook) -> RequestHook:
+    hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: RequestHook) -> None:
+    hooks.remove(hook)
+
+
+def emit(kind: RequestEventKind, request: Request, **kwargs) -> None:
+    """the callers should check `hooks` first, so that nothing is built without any hook."""
+    event = RequestEvent(kind, request, **kwargs)
+    for hook in list(hooks):
+        hook(event)
+
+
+@dataclass(frozen=True)
+class LatencyStats:
+    key: str
+    """the route or the builder."""
+    count: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    total: float
+    """seconds spent in total, which shows the share of each route."""
+    retries: int
+    throttle_wait: float
+    response_size: int
+    parse_time: float
+
+    def __repr__(self) -> str:
+        return repr_object(
+            self,
+            key=self.key,
+            count=self.count,
+            p50=f"{self.p50:.3f}",
+            p95=f"{self.p95:.3f}",
+            p99=f"{self.p99:.3f}",
+        )
+
+
+def get_percentile(sorted_values: list[float], percent: float) -> float:
+    """nearest-rank percentile."""
+    if not sorted_values:
+        return 0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _Series:
+    def __init__(self):
+        self.durations: list[float] = []
+        self.errors = 0
+        self.retries = 0
+        self.throttle_wait = 0.0
+        self.response_size = 0
+        self.parse_time = 0.0
+
+    def get_stats(self, key: str) -> LatencyStats:
+        durations = sorted(self.durations)
+        return LatencyStats(
+            key=key,
+            count=len(durations),
+            errors=self.errors,
+            p50=get_percentile(durations, 50),
+            p95=get_percentile(durations, 95),
+            p99=get_percentile(durations, 99),
+            max=durations[-1] if durations else 0,
+            total=sum(durations),
+            retries=self.retries,
+            throttle_wait=self.throttle_wait,
+            response_size=self.response_size,
+            parse_time=self.parse_time,
+        )
+
+
+class MetricsCollector:
+    """in-memory collector of request events, aggregated by route and by request builder.
+
+    collector = MetricsCollector().install()
+    ...
+    print(collector.format())"""
+
+    def __init__(self):
+        self._series_by_route: dict[str, _Series] = defaultdict(_Series)
+        self._series_by_builder: dict[str, _Series] = defaultdict(_Series)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        keys = (
+            (self._series_by_route, event.route),
+            (self._series_by_builder, event.builder or "Request"),
+        )
+        with self._lock:
+            for series_dict, key in keys:
+                series = series_dict[key]
+                match event.kind:
+                    case "end":
+                        series.durations.append(event.duration)
+                        series.response_size += event.response_size or 0
+                        if event.exception is not None:
+                            series.errors += 1
+                    case "retry":
+                        series.retries += 1
+                    case "throttle":
+                        series.throttle_wait += event.duration
+                    case "parse":
+                        series.parse_time += event.duration
+
+    def install(self) -> MetricsCollector:
+        add_hook(self)
+        return self
+
+    def uninstall(self) -> None:
+        remove_hook(self)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series_by_route.clear()
+            self._series_by_builder.clear()
+
+    def by_route(self) -> list[LatencyStats]:
+        """sorted by the total time, the largest first."""
+        return self._get_stats(self._series_by_route)
+
+    def by_builder(self) -> list[LatencyStats]:
+        """sorted by the total time, the largest first."""
+        return self._get_stats(self._series_by_builder)
+
+    def _get_stats(self, series_dict: dict[str, _Series]) -> list[LatencyStats]:
+        with self._lock:
+            stats_list = [series.get_stats(key) for key, series in series_dict.items()]
+        return sorted(stats_list, key=lambda stats: stats.total, reverse=True)
+
+    def format(self) -> str:
+        lines = []
+        for title, stats_list in (
+            ("route", self.by_route()),
+            ("builder", self.by_builder()),
+        ):
+            lines.append(
+                f"{title:<40} {'count':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} "
+                f"{'total':>9} {'retry':>5} {'throttle':>9} {'parse':>8}"
+            )
+            for s in stats_list:
+                lines.append(
+                    f"{s.key:<40} {s.count:>6} {s.errors:>4} {s.p50:>8.3f} {s.p95:>8.3f} {s.p99:>8.3f} "
+                    f"{s.total:>9.3f} {s.retries:>5} {s.throttle_wait:>9.3f} {s.parse_time:>8.3f}"
+                )
+            lines.append("")
+        return "\n".join(lines)
@@ -1,20 +1,36 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
+import random
+import time
 from abc import abstractmethod, ABCMeta
-from dataclasses import dataclass
-from typing import Generic, Any, final, Optional, Iterator
+from dataclasses import dataclass, field
+from typing import (
+    Generic,
+    Any,
+    final,
+    Optional,
+    Iterable,
+    Iterator,
+    AsyncIterator,
+    Callable,
+    Literal,
+    TypeVar,
+)
 
 import requests.exceptions
 import tenacity
 from loguru import logger
 from requests import Response
 
-from notion_df.core.collection import PlainStrEnum
+from notion_df.core.collection import PlainStrEnum, prefetch as prefetch_it
 from notion_df.core.data_core import EntityDataT
 from notion_df.core.exception import ImplementationError, NotionDfException
 from notion_df.core.misc import repr_object
 from notion_df.core.serialization import serialize
+from notion_df.core import metrics, transport, variable
+from notion_df.core.throttle import rate_limiter
 
 MAX_PAGE_SIZE = 100
 
@@ -40,18 +56,169 @@ def is_server_error(exception: BaseException) -> bool:
     return False
 
 
+def is_rate_limited(exception: BaseException) -> bool:
+    return (
+        isinstance(exception, RequestError)
+        and exception.response.status_code == 429  # rate_limited
+    )
+
+
+def get_retry_after(exception: BaseException) -> Optional[float]:
+    """the seconds to wait requested by the server, from `Retry-After` header."""
+    if not isinstance(exception, RequestError):
+        return None
+    try:
+        return max(float(exception.response.headers["Retry-After"]), 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryEvent:
+    kind: Literal["attempt", "sleep"]
+    """'attempt' is emitted before every attempt, 'sleep' before every sleep between attempts."""
+    request: Request
+    attempt_number: int
+    elapsed: float
+    """seconds since the first attempt."""
+    exception: Optional[BaseException] = None
+    """the exception which caused the sleep."""
+    sleep: float = 0
+    """seconds to sleep before the next attempt."""
+
+
+def _get_exception(retry_state: tenacity.RetryCallState) -> BaseException:
+    """the exception of the last attempt. the attempts are only retried on exceptions."""
+    assert retry_state.outcome is not None
+    exception = retry_state.outcome.exception()
+    assert exception is not None
+    return exception
+
+
+@dataclass
+class RetryPolicy:
+    """retry with exponential backoff and jitter, honoring `Retry-After` header of rate-limited responses.
+    replace `request_core.retry_policy` to change the behavior of every request."""
+
+    max_attempts: int = 5
+    deadline: Optional[float] = 180
+    """the time budget of each request in seconds, including all attempts and sleeps."""
+    initial_wait: float = 0.5
+    max_wait: float = 30
+    jitter: bool = True
+    retry_rate_limited: bool = True
+    on_event: Optional[Callable[[RetryEvent], None]] = None
+    """called with every retry event. the 'sleep' events are also reported to the `metrics` hooks, as 'retry'."""
+
+    def should_retry(self, exception: BaseException) -> bool:
+        if self.retry_rate_limited and is_rate_limited(exception):
+            return True
+        return is_server_error(exception)
+
+    def get_wait(self, attempt_number: int, exception: BaseException) -> float:
+        if (retry_after := get_retry_after(exception)) is not None:
+            return retry_after
+        wait = min(self.initial_wait * 2 ** (attempt_number - 1), self.max_wait)
+        if self.jitter:
+            wait = random.uniform(wait / 2, wait)
+        return wait
+
+    def get_retrying(self, request: Request) -> tenacity.Retrying:
+        return tenacity.Retrying(**self._get_retrying_kwargs(request))
+
+    def get_async_retrying(self, request: Request) -> tenacity.AsyncRetrying:
+        return tenacity.AsyncRetrying(**self._get_retrying_kwargs(request))
+
+    def _get_retrying_kwargs(self, request: Request) -> dict[str, Any]:
+        def stop(retry_state: tenacity.RetryCallState) -> bool:
+            if retry_state.attempt_number >= self.max_attempts:
+                return True
+            if self.deadline is None:
+                return False
+            remaining = self.deadline - (retry_state.seconds_since_start or 0)
+            retry_after = get_retry_after(_get_exception(retry_state))
+            return remaining <= 0 or (retry_after or 0) > remaining
+
+        def wait(retry_state: tenacity.RetryCallState) -> float:
+            wait_time = self.get_wait(
+                retry_state.attempt_number, _get_exception(retry_state)
+            )
+            if self.deadline is not None:
+                remaining = self.deadline - (retry_state.seconds_since_start or 0)
+                wait_time = max(min(wait_time, remaining), 0)
+            return wait_time
+
+        def before(retry_state: tenacity.RetryCallState) -> None:
+            self._emit("attempt", request, retry_state)
+
+        def before_sleep(retry_state: tenacity.RetryCallState) -> None:
+            assert retry_state.next_action is not None
+            sleep = retry_state.next_action.sleep
+            exception = _get_exception(retry_state)
+            logger.debug(
+                "retry in {:.2f}s, attempt={}, exception={}",
+                sleep,
+                retry_state.attempt_number,
+                exception,
+            )
+            self._emit("sleep", request, retry_state, exception=exception, sleep=sleep)
+
+        return dict(
+            retry=tenacity.retry_if_exception(self.should_retry),
+            stop=stop,
+            wait=wait,
+            before=before,
+            before_sleep=before_sleep,
+            reraise=True,
+        )
+
+    def _emit(
+        self,
+        kind: Literal["attempt", "sleep"],
+        request: Request,
+        retry_state: tenacity.RetryCallState,
+        exception: Optional[BaseException] = None,
+        sleep: float = 0,
+    ) -> None:
+        report_metrics = kind == "sleep" and bool(metrics.hooks)
+        if self.on_event is None and not report_metrics:
+            return
+        event = RetryEvent(
+            kind=kind,
+            request=request,
+            attempt_number=retry_state.attempt_number,
+            elapsed=retry_state.seconds_since_start or 0,
+            exception=exception,
+            sleep=sleep,
+        )
+        if report_metrics:
+            metrics.emit(
+                "retry",
+                request,
+                duration=event.sleep,
+                attempt_number=event.attempt_number,
+                exception=event.exception,
+            )
+        if self.on_event is not None:
+            self.on_event(event)
+
+
+retry_policy = RetryPolicy()
+
+
 @dataclass(frozen=True)
 class Request:
     """request builder tailored to Notion API."""
 
     # TODO: rename to RequestBuilder
-    # TODO: async with throttling  https://chat.openai.com/c/adcf80cd-d800-4fef-bfa9-56c548e0058a
     token: str
     method: Method
     version: Version
     path: str
     params: Any
     json: Any
+    builder: Optional[str] = field(default=None, compare=False)
+    """the class name of the `RequestBuilder`, reported to the `metrics` hooks."""
 
     @property
     def headers(self) -> dict[str, Any]:
@@ -64,21 +231,81 @@ class Request:
     def url(self) -> str:
         return f"{self.version.base_url.rstrip('/')}/{self.path.lstrip('/')}"
 
-    @tenacity.retry(
-        wait=tenacity.wait_none(),
-        stop=tenacity.stop_after_attempt(3),
-        retry=tenacity.retry_if_exception(is_server_error),
-    )  # TODO: add request info on TimeoutError
     def execute(self) -> Response:
-        logger.debug(self)
+        # TODO: add request info on TimeoutError
+        logger.debug("{} {}", self.method, self.path)
+        logger.trace("{}", self)
+        if not metrics.hooks:
+            return retry_policy.get_retrying(self)(self._execute_once)
+        metrics.emit("start", self)
+        started_at = time.perf_counter()
+        try:
+            response = retry_policy.get_retrying(self)(self._execute_once)
+        except BaseException as e:
+            self._emit_end(started_at, exception=e)
+            raise
+        self._emit_end(started_at, response=response)
+        return response
+
+    async def execute_async(self) -> Response:
+        """the blocking HTTP call is delegated to the transport worker threads,
+        so that many requests can be awaited concurrently inside one event loop.
+        the concurrency is capped by the number of the workers, `transport.session_settings.pool_maxsize` (default 10);
+        the other requests wait for a free worker. raise it with `transport.configure_session()`."""
+        logger.debug("{} {}", self.method, self.path)
+        logger.trace("{}", self)
+        retrying = retry_policy.get_async_retrying(self)
+        if not metrics.hooks:
+            return await retrying(self._execute_once_async)
+        metrics.emit("start", self)
+        started_at = time.perf_counter()
+        try:
+            response: Response = await retrying(self._execute_once_async)
+        except BaseException as e:
+            self._emit_end(started_at, exception=e)
+            raise
+        self._emit_end(started_at, response=response)
+        return response
+
+    def _execute_once(self) -> Response:
+        wait_time = rate_limiter.acquire()
+        if wait_time > 0 and metrics.hooks:
+            metrics.emit("throttle", self, duration=wait_time)
+        return self._send()
+
+    async def _execute_once_async(self) -> Response:
+        wait_time = await rate_limiter.acquire_async()
+        if wait_time > 0 and metrics.hooks:
+            metrics.emit("throttle", self, duration=wait_time)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(transport.get_executor(), self._send)
+
+    def _emit_end(
+        self,
+        started_at: float,
+        response: Optional[Response] = None,
+        exception: Optional[BaseException] = None,
+    ) -> None:
+        if isinstance(exception, RequestError):
+            response = exception.response
+        metrics.emit(
+            "end",
+            self,
+            duration=time.perf_counter() - started_at,
+            status_code=response.status_code if response is not None else None,
+            response_size=len(response.content) if response is not None else None,
+            exception=exception,
+        )
+
+    def _send(self) -> Response:
         # TODO[1]: catch RequestException
-        response = requests.request(
+        response = transport.get_transport().send(
             method=self.method.value,
             url=self.url,
             headers=self.headers,
             params=self.params,
             json=self.json,
-            timeout=80,
+            timeout=transport.session_settings.timeout,
         )  # TODO: relate with tenacity
         try:
             response.raise_for_status()
@@ -133,7 +360,7 @@ class Version(PlainStrEnum):
 
     @property
     def base_url(self) -> str:
-        return "https://api.notion.com/v1"
+        return variable.api_base_url
 
 
 @dataclass
@@ -180,16 +407,28 @@ class SingleRequestBuilder(Generic[EntityDataT], RequestBuilder, metaclass=ABCMe
 
     @final
     def execute(self) -> EntityDataT:
+        request = self._get_request()
+        response = request.execute()
+        return _parse(request, self.parse_response_data, response.json())  # nomypy
+
+    @final
+    async def execute_async(self) -> EntityDataT:
+        """see `Request.execute_async()` for the concurrency limit."""
+        request = self._get_request()
+        response = await request.execute_async()
+        return _parse(request, self.parse_response_data, response.json())  # nomypy
+
+    def _get_request(self) -> Request:
         settings = self.get_settings()
-        response = Request(
+        return Request(
             token=self.token,
             method=settings.method,
             path=settings.path,
             version=settings.version,
             params=None,
             json=self.get_body(),
-        ).execute()
-        return self.parse_response_data(response.json())  # nomypy
+            builder=type(self).__name__,
+        )
 
     @classmethod
     def parse_response_data(cls, data: dict[str, Any]) -> EntityDataT:
@@ -207,11 +446,55 @@ class PaginatedRequestBuilder(Generic[EntityDataT], RequestBuilder, metaclass=AB
             assert cls.data_element_type
 
     @final
-    def execute(self) -> Iterator[EntityDataT]:
+    def execute(self, prefetch: int = 0) -> Iterator[EntityDataT]:
+        """if `prefetch` is positive, the next pages (at most `prefetch` of them)
+        are requested on a background thread while the caller consumes the current page."""
+        if not metrics.hooks:
+            for data in self.execute_raw(prefetch):
+                yield from self.parse_response_data(data)
+            return
+        start_cursor = None
+        for data in self.execute_raw(prefetch):
+            yield from _parse(
+                _get_page_request(self, self.page_size, start_cursor),
+                lambda _data: list(self.parse_response_data(_data)),
+                data,
+            )
+            start_cursor = data.get("next_cursor")
+
+    @final
+    def execute_raw(self, prefetch: int = 0) -> Iterator[dict[str, Any]]:
+        """yield the response data of each page, without deserialization."""
+        if prefetch > 0:
+            return prefetch_it(self._iter_response_data(), prefetch)
+        return self._iter_response_data()
+
+    def _iter_response_data(self) -> Iterator[dict[str, Any]]:
         start_cursor = None
         while True:
             data = request_page(self, self.page_size, start_cursor)
-            yield from self.parse_response_data(data)
+            yield data
+            if not data["has_more"]:
+                return
+            start_cursor = data["next_cursor"]
+
+    @final
+    async def execute_async(self) -> AsyncIterator[EntityDataT]:
+        """the pages are requested one by one. see `Request.execute_async()` for the concurrency limit."""
+        start_cursor = None
+        while True:
+            data = await request_page_async(self, self.page_size, start_cursor)
+            data_elements: Iterable[EntityDataT]
+            if metrics.hooks:
+                data_elements = _parse(
+                    _get_page_request(self, self.page_size, start_cursor),
+                    lambda _data: list(self.parse_response_data(_data)),
+                    data,
+                )
+            else:
+                data_elements = self.parse_response_data(data)
+            for data_element in data_elements:
+                yield data_element
             if not data["has_more"]:
                 return
             start_cursor = data["next_cursor"]
@@ -227,6 +510,23 @@ def request_page(
     page_size: Optional[int] = MAX_PAGE_SIZE,
     start_cursor: Optional[str] = None,
 ) -> dict[str, Any]:
+    return _get_page_request(self, page_size, start_cursor).execute().json()
+
+
+async def request_page_async(
+    self: RequestBuilder,
+    page_size: Optional[int] = MAX_PAGE_SIZE,
+    start_cursor: Optional[str] = None,
+) -> dict[str, Any]:
+    response = await _get_page_request(self, page_size, start_cursor).execute_async()
+    return response.json()
+
+
+def _get_page_request(
+    self: RequestBuilder,
+    page_size: Optional[int],
+    start_cursor: Optional[str],
+) -> Request:
     settings = self.get_settings()
     body = self.get_body()
 
@@ -247,12 +547,27 @@ def request_page(
         case _:
             raise ImplementationError(f"Invalid method. {type(self)=}")
 
-    response = Request(
+    return Request(
         token=self.token,
         method=settings.method,
         path=settings.path,
         version=settings.version,
         params=params,
         json=serialize(body),
-    ).execute()
-    return response.json()
+        builder=type(self).__name__,
+    )
+
+
+ParsedT = TypeVar("ParsedT")
+
+
+def _parse(
+    request: Request, parse: Callable[[dict[str, Any]], ParsedT], data: dict[str, Any]
+) -> ParsedT:
+    """parse the response data, reporting the parse time to the `metrics` hooks if any."""
+    if not metrics.hooks:
+        return parse(data)
+    started_at = time.perf_counter()
+    parsed = parse(data)
+    metrics.emit("parse", request, duration=time.perf_counter() - started_at)
+    return parsed
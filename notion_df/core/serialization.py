@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import collections.abc
 import inspect
-import re
 import types
 from abc import ABCMeta, abstractmethod
-from dataclasses import fields, InitVar, Field, field, dataclass, is_dataclass
+from dataclasses import fields, InitVar, field, dataclass, is_dataclass
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
@@ -24,6 +24,9 @@ from typing import (
     Literal,
     TypeVar,
     overload,
+    Callable,
+    Optional,
+    Final,
 )
 from uuid import UUID
 
@@ -85,6 +88,9 @@ def serialize(obj: Any):
 T = TypeVar("T")
 
 
+Deserializer = Callable[[Any], Any]
+
+
 @overload
 def deserialize(typ: type[T], serialized: Any) -> T: ...
 
@@ -95,107 +101,338 @@ def deserialize(typ: type, serialized: Any) -> Any: ...
 
 def deserialize(typ: type, serialized: Any) -> Any:
     """unified deserializer for both Deserializable and external classes."""
-    err_vars = {"typ": typ, "serialized": serialized}
+    try:
+        deserializer = get_deserializer(typ)
+    except TypeError:  # unhashable type hint
+        deserializer = compile_deserializer(typ)
+    return deserializer(serialized)
+
+
+@cache
+def get_deserializer(typ: type) -> Deserializer:
+    """the cached version of compile_deserializer()."""
+    return compile_deserializer(typ)
+
+
+def compile_deserializer(typ: type) -> Deserializer:
+    """turn the type hint into a specialized deserializer function.
+    type introspection happens here once, instead of on every deserialize() call.
+    every deserializer returns None as-is."""
     typ_origin: type = get_origin(typ)
     typ_args = get_args(typ)
 
     # 0. explicitly unsupported values
-    if typ is None or serialized is None or typ == Any:
-        return serialized
+    if typ is None or typ == Any:
+        return _deserialize_as_is
 
     # 1. Non-class types
     if isinstance(typ, NewType):  # type: ignore
-        plain_type = cast(NewType, typ).__supertype__
-        return typ(deserialize(plain_type, serialized))
+        plain_deserializer = get_deserializer(cast(NewType, typ).__supertype__)
+
+        def deserialize_new_type(serialized: Any) -> Any:
+            if serialized is None:
+                return None
+            return typ(plain_deserializer(serialized))
+
+        return deserialize_new_type
     if isinstance(typ, InitVar):
-        return deserialize(typ.type, serialized)
+        return get_deserializer(typ.type)
     if typ_origin == Literal:
-        if serialized in typ_args:
-            return serialized
-        raise SerializationError(
-            description="Serialized value does not match any of Literal types",
-            err_vars=err_vars,
-        )
+
+        def deserialize_literal(serialized: Any) -> Any:
+            if serialized is None or serialized in typ_args:
+                return serialized
+            raise SerializationError(
+                description="Serialized value does not match any of Literal types",
+                err_vars={"typ": typ, "serialized": serialized},
+            )
+
+        return deserialize_literal
     if (
         isinstance(typ, types.UnionType) or typ_origin == Union
     ):  # also can handle Optional
-        for typ_arg in typ_args:
+        return _compile_union_deserializer(typ, typ_args)
+    if isinstance(typ, types.GenericAlias) or isinstance(typ, _GenericAlias):
+        return _compile_generic_alias_deserializer(typ, typ_origin, typ_args)
+    if not inspect.isclass(typ):
+        return _get_error_deserializer(typ, "Unsupported non-class type")
+
+    # 2. class types
+    if issubclass(typ, Deserializable):
+        typ_deserialize = typ.deserialize
+
+        def deserialize_deserializable(serialized: Any) -> Any:
+            if serialized is None or isinstance(serialized, Deserializable):
+                return serialized
+            return typ_deserialize(serialized)
+
+        return deserialize_deserializable
+    if typ in {bool, str, int, float, Decimal} or issubclass(typ, Enum):
+
+        def deserialize_plain(serialized: Any) -> Any:
+            if serialized is None:
+                return None
             try:
-                return deserialize(typ_arg, serialized)
+                return typ(serialized)
+            except (ValueError, TypeError) as e:
+                raise SerializationError(
+                    err_vars={"typ": typ, "serialized": serialized, "exception": e}
+                )
+
+        return deserialize_plain
+    if typ == UUID:
+
+        def deserialize_uuid(serialized: Any) -> Any:
+            if serialized is None or isinstance(serialized, UUID):
+                return serialized
+            return UUID(serialized)
+
+        return deserialize_uuid
+    if issubclass(typ, datetime):
+
+        def deserialize_datetime_(serialized: Any) -> Any:
+            if serialized is None:
+                return None
+            try:
+                return deserialize_datetime(serialized)
+            except (ValueError, TypeError) as e:
+                raise SerializationError(
+                    err_vars={"typ": typ, "serialized": serialized, "exception": e}
+                )
+
+        return deserialize_datetime_
+    return _get_error_deserializer(typ, "Unsupported class")
+
+
+def _compile_union_deserializer(typ: type, typ_args: tuple[Any, ...]) -> Deserializer:
+    """dispatch to the union members which can accept the JSON value shape
+    (and the "type" key of JSON objects), trying them in order only if still ambiguous.
+    the result is the same as trying every member in order."""
+    members = [
+        (get_deserializer(typ_arg), _get_json_shapes(typ_arg), typ_arg)
+        for typ_arg in typ_args
+    ]
+    all_deserializers = tuple(deserializer for deserializer, _, _ in members)
+    deserializers_by_shape = {
+        shape: tuple(
+            deserializer
+            for deserializer, shapes, _ in members
+            if shapes is None or shape in shapes
+        )
+        for shape in _json_shapes
+    }
+    dict_members = [
+        (deserializer, typ_arg)
+        for deserializer, shapes, typ_arg in members
+        if shapes is None or dict in shapes
+    ]
+    # (the subclass generation, the typenames of each dict member, the deserializers by typename)
+    # rebuilt whenever a Deserializable subclass is defined, so that new subclasses are dispatched too.
+    typename_state: tuple[
+        int,
+        list[tuple[Deserializer, Optional[frozenset[str]]]],
+        dict[str, tuple[Deserializer, ...]],
+    ] = (-1, [], {})
+
+    def get_dict_deserializers(typename: str) -> tuple[Deserializer, ...]:
+        nonlocal typename_state
+        generation, typed_members, deserializers_by_typename = typename_state
+        if generation != _subclass_generation:
+            generation = _subclass_generation
+            typed_members = [
+                (deserializer, _get_typenames(typ_arg))
+                for deserializer, typ_arg in dict_members
+            ]
+            deserializers_by_typename = {}
+            typename_state = generation, typed_members, deserializers_by_typename
+        if (deserializers := deserializers_by_typename.get(typename)) is None:
+            deserializers = deserializers_by_typename[typename] = tuple(
+                deserializer
+                for deserializer, typenames in typed_members
+                if typenames is None or typename in typenames
+            )
+        return deserializers
+
+    def deserialize_union(serialized: Any) -> Any:
+        if serialized is None:
+            return None
+        shape = type(serialized)
+        deserializers = deserializers_by_shape.get(shape, all_deserializers)
+        if (
+            shape is dict
+            and len(deserializers) > 1
+            and isinstance(typename := serialized.get("type"), str)
+        ):
+            deserializers = get_dict_deserializers(typename)
+        if len(deserializers) == 1:
+            try:
+                return deserializers[0](serialized)
             except SerializationError as e:
-                err_vars.setdefault("exception_list", [])
-                err_vars["exception_list"].append(e)
+                exception_list = [e]
+        else:
+            exception_list = []
+            for deserializer in deserializers:
+                try:
+                    return deserializer(serialized)
+                except SerializationError as e:
+                    exception_list.append(e)
+        err_vars = {"typ": typ, "serialized": serialized}
+        if exception_list:
+            err_vars["exception_list"] = exception_list
         raise SerializationError(
-            description="Cannot deserialize to any of the UnionType", err_vars=err_vars
-        )
-    if isinstance(typ, types.GenericAlias) or isinstance(typ, _GenericAlias):
-        err_vars.update({"typ.origin": typ_origin, "typ.args": typ_args})
-        collection_type_error = SerializationError(
-            description="Collection types require value type to be defined",
+            description="Cannot deserialize to any of the UnionType",
             err_vars=err_vars,
         )
+
+    return deserialize_union
+
+
+_json_shapes: Final = (dict, list, str, int, float, bool)
+_subclass_generation = 0
+"""incremented on every definition of Deserializable subclasses, which invalidates the typename dispatch of unions."""
+_json_scalar_shapes: Final = frozenset({str, int, float, bool})
+
+
+def _get_json_shapes(typ: Any) -> Optional[frozenset[type]]:
+    """the JSON value types which the deserializer of `typ` may accept.
+    None if it may accept anything. types excluded here are guaranteed to fail."""
+    typ_origin = get_origin(typ)
+    if typ is None or typ == Any:
+        return None
+    if isinstance(typ, NewType):  # type: ignore
+        return _get_json_shapes(cast(NewType, typ).__supertype__)
+    if isinstance(typ, InitVar):
+        return _get_json_shapes(typ.type)
+    if typ_origin == Literal:
+        shapes = {type(typ_arg) for typ_arg in get_args(typ)}
+        if shapes & {int, float, bool}:  # 1 == 1.0 == True
+            shapes |= {int, float, bool}
+        return frozenset(shapes)
+    if isinstance(typ, types.UnionType) or typ_origin == Union:
+        shapes = set()
+        for typ_arg in get_args(typ):
+            if (arg_shapes := _get_json_shapes(typ_arg)) is None:
+                return None
+            shapes |= arg_shapes
+        return frozenset(shapes)
+    if isinstance(typ, types.GenericAlias) or isinstance(typ, _GenericAlias):
         if issubclass(typ_origin, dict):
-            try:
-                value_type = typ_args[1]
-            except IndexError:
-                raise collection_type_error
+            return frozenset({dict})
+        if issubclass(typ_origin, list) or issubclass(typ_origin, set):
+            return frozenset({list})
+        return frozenset()
+    if not inspect.isclass(typ):
+        return frozenset()
+    if issubclass(typ, Deserializable):
+        if issubclass(typ, collections.abc.Sequence):
+            return frozenset({list})
+        return frozenset({dict})
+    if typ in {bool, str}:
+        return None
+    if typ in {int, float, Decimal} or issubclass(typ, Enum):
+        return _json_scalar_shapes
+    if typ == UUID or issubclass(typ, datetime):
+        return frozenset({str})
+    return frozenset()
+
+
+def _get_typenames(typ: Any) -> Optional[frozenset[str]]:
+    """the values of "type" key which the Deserializable class and its subclasses can accept.
+    None if unknown."""
+    if not (inspect.isclass(typ) and issubclass(typ, Deserializable)):
+        return None
+    typenames = set()
+    subclasses = [typ]
+    while subclasses:
+        subclass = subclasses.pop()
+        subclasses.extend(subclass.__subclasses__())
+        get_typename = getattr(subclass, "get_typename", None)
+        if get_typename is None:
+            return None
+        try:
+            typename = get_typename()
+        except Exception:  # noqa  NOSONAR
+            typename = None
+        if isinstance(typename, tuple):
+            typename = typename[0] if typename else None
+        if isinstance(typename, str) and typename:
+            typenames.add(typename)
+        elif not inspect.isabstract(subclass):
+            return None
+    return frozenset(typenames)
+
+
+def _compile_generic_alias_deserializer(
+    typ: type, typ_origin: type, typ_args: tuple[Any, ...]
+) -> Deserializer:
+    err_vars = {"typ.origin": typ_origin, "typ.args": typ_args}
+    if issubclass(typ_origin, dict):
+        if len(typ_args) < 2:
+            return _get_error_deserializer(
+                typ, "Collection types require value type to be defined", err_vars
+            )
+        value_deserializer = get_deserializer(typ_args[1])
+
+        def deserialize_dict(serialized: Any) -> Any:
+            if serialized is None:
+                return None
             result = {}
             for key, value in cast(dict, serialized).items():
                 try:
-                    result[key] = deserialize(value_type, value)
+                    result[key] = value_deserializer(value)
                 except SerializationError as e:
                     e.inverted_path.append(key)
                     raise e
-                return typ_origin(result)
-        if issubclass(typ_origin, list) or issubclass(typ_origin, set):
-            try:
-                value_type = typ_args[0]
-            except IndexError:
-                raise collection_type_error
+            return typ_origin(result)
+
+        return deserialize_dict
+    if issubclass(typ_origin, list) or issubclass(typ_origin, set):
+        if len(typ_args) < 1:
+            return _get_error_deserializer(
+                typ, "Collection types require value type to be defined", err_vars
+            )
+        element_deserializer = get_deserializer(typ_args[0])
+
+        def deserialize_list(serialized: Any) -> Any:
+            if serialized is None:
+                return None
             result = []
             for i, value in enumerate(cast(list, serialized)):
                 try:
-                    result.append(deserialize(value_type, value))
+                    result.append(element_deserializer(value))
                 except SerializationError as e:
                     e.inverted_path.append(i)
                     raise e
             return typ_origin(result)
+
+        return deserialize_list
+    return _get_error_deserializer(typ, "GenericAlias with invalid origin", err_vars)
+
+
+def _deserialize_as_is(serialized: Any) -> Any:
+    return serialized
+
+
+def _get_error_deserializer(
+    typ: type, description: str, err_vars: Optional[dict[str, Any]] = None
+) -> Deserializer:
+    def deserialize_error(serialized: Any) -> Any:
+        if serialized is None:
+            return None
         raise SerializationError(
-            description="GenericAlias with invalid origin", err_vars=err_vars
-        )
-    if not inspect.isclass(typ):
-        raise SerializationError(
-            description="Unsupported non-class type", err_vars=err_vars
+            description=description,
+            err_vars={"typ": typ, "serialized": serialized, **(err_vars or {})},
         )
 
-    # 2. class types
-    if issubclass(typ, Deserializable):
-        if isinstance(serialized, Deserializable):
-            return serialized
-        return typ.deserialize(serialized)
-    if typ in {bool, str, int, float, Decimal} or issubclass(typ, Enum):
-        try:
-            return typ(serialized)
-        except (ValueError, TypeError) as e:
-            err_vars["exception"] = e
-            raise SerializationError(err_vars=err_vars)
-    if typ == UUID:
-        if isinstance(serialized, UUID):
-            return serialized
-        return UUID(serialized)
-    if issubclass(typ, datetime):
-        try:
-            return deserialize_datetime(serialized)
-        except (ValueError, TypeError) as e:
-            err_vars["exception"] = e
-            raise SerializationError(err_vars=err_vars)
-    raise SerializationError(description="Unsupported class", err_vars=err_vars)
+    return deserialize_error
 
 
 class Serializable(metaclass=ABCMeta):
     """representation of the resources defined in Notion REST API.
     can be dumped into JSON object."""
 
+    __slots__ = ()
+
     @abstractmethod
     def serialize(self) -> Any:
         raise NotImplementedError
@@ -223,8 +460,12 @@ class Deserializable(metaclass=ABCMeta):
     Concrete classes should implement _deserialize_this();
     Abstract classes can implement _deserialize_this() and _deserialize_subclass()."""
 
+    __slots__ = ()
+
     def __init_subclass__(cls, **kwargs) -> None:
         super().__init_subclass__()
+        global _subclass_generation
+        _subclass_generation += 1
         if not inspect.isabstract(cls):
             # noinspection PyBroadException
             try:
@@ -235,10 +476,16 @@ class Deserializable(metaclass=ABCMeta):
                 raise ImplementationError(
                     "_deserialize_subclass() should not be defined on concrete classes"
                 )
-        deserialize_subclass_old = cls._deserialize_subclass
+        if isinstance(
+            wrapper := cls.__dict__.get("_deserialize_subclass"), classmethod
+        ) and hasattr(wrapper.__func__, "deserialize_subclass_old"):
+            # dataclass(slots=True) recreates the class with the wrapper made for the original class.
+            deserialize_subclass_old = types.MethodType(
+                wrapper.__func__.deserialize_subclass_old.__func__, cls
+            )
+        else:
+            deserialize_subclass_old = cls._deserialize_subclass
 
-        # noinspection PyDecorator
-        @classmethod
         def deserialize_subclass_new(_cls: type[Self], raw: Any) -> Self:
             # cls: the base class _deserialize_subclass is defined
             # _cls: the subclass _deserialize_subclass is called
@@ -246,7 +493,8 @@ class Deserializable(metaclass=ABCMeta):
                 raise NotImplementedError
             return deserialize_subclass_old(raw)
 
-        cls._deserialize_subclass = deserialize_subclass_new
+        deserialize_subclass_new.deserialize_subclass_old = deserialize_subclass_old
+        cls._deserialize_subclass = classmethod(deserialize_subclass_new)
 
     @classmethod
     @final
@@ -279,52 +527,65 @@ class Deserializable(metaclass=ABCMeta):
 
         helper method to implement _deserialize_this().
         Note: this collects post-init fields as well."""
-        assert is_dataclass(cls)
         if inspect.isabstract(cls):
             raise TypeError(
                 "cannot instantiate abstract class",
                 {"cls": cls, "serialized": serialized},
             )
 
-        _undefined = object()
-
-        def deserialize_field(_fd: Field):
-            if _fd.name in overrides:
-                return overrides[_fd.name]
-            if _fd.name in serialized:
-                if _fd.name not in cls._get_type_hints():
-                    raise SerializationError(
-                        description=f'field "{_fd.name}" should have explicit type hint or provided as "overrides"'
-                    )
-                return deserialize(
-                    cls._get_type_hints()[_fd.name], serialized[_fd.name]
-                )
-            return _undefined
-            # TODO: post-init fields should be explicitly set inside each _deserialize_this()
-            # if _fd.default or _fd.default_factory:
-            #     return undefined
-            # raise SerializationError(
-            #     f'field "{_fd.name}" has no default value, '
-            #     f'therefore it should be provided either as "serialized" or "overrides"')
-
         init_params: dict[str, Any] = {}
         post_init_params: dict[str, Any] = {}
-        # noinspection PyDataclass
-        for fd in fields(cls):
-            fd_value = deserialize_field(fd)
-            if fd_value is _undefined:
+        for fd_name, fd_init, fd_deserializer in cls._get_deserialize_plan():
+            if fd_name in overrides:
+                fd_value = overrides[fd_name]
+            elif fd_name in serialized:
+                if fd_deserializer is None:
+                    raise SerializationError(
+                        description=f'field "{fd_name}" should have explicit type hint or provided as "overrides"'
+                    )
+                fd_value = fd_deserializer(serialized[fd_name])
+            else:
                 continue
-            if fd.init:
-                init_params[fd.name] = fd_value
+                # TODO: post-init fields should be explicitly set inside each _deserialize_this()
+                # if _fd.default or _fd.default_factory:
+                #     return undefined
+                # raise SerializationError(
+                #     f'field "{_fd.name}" has no default value, '
+                #     f'therefore it should be provided either as "serialized" or "overrides"')
+            if fd_init:
+                init_params[fd_name] = fd_value
             else:
-                post_init_params[fd.name] = fd_value
+                post_init_params[fd_name] = fd_value
 
         # noinspection PyArgumentList
         self = cls(**init_params)
         for fd_name, fd_value in post_init_params.items():
-            setattr(self, fd_name, fd_value)
+            # the dataclass may be frozen
+            object.__setattr__(self, fd_name, fd_value)
         return self
 
+    @classmethod
+    @final
+    @cache
+    def _get_deserialize_plan(
+        cls,
+    ) -> tuple[tuple[str, bool, Optional[Deserializer]], ...]:
+        """(field name, whether it is an init field, compiled deserializer) of each dataclass field.
+        the deserializer is None if the field has no type hint."""
+        assert is_dataclass(cls)
+        type_hints = cls._get_type_hints()
+        # noinspection PyDataclass
+        return tuple(
+            (
+                fd.name,
+                fd.init,
+                get_deserializer(type_hints[fd.name])
+                if fd.name in type_hints
+                else None,
+            )
+            for fd in fields(cls)
+        )
+
     @classmethod
     @cache
     def _get_type_hints(cls) -> dict[str, type]:
@@ -353,7 +614,7 @@ class DualSerializable(Serializable, Deserializable, metaclass=ABCMeta):
     interchangeable with JSON object.
     field with `init=False` are usually the case which not required from user-side but provided from server-side."""
 
-    pass
+    __slots__ = ()
 
 
 def serialize_datetime(dt: date | datetime):
@@ -363,11 +624,48 @@ def serialize_datetime(dt: date | datetime):
 
 
 def deserialize_datetime(serialized: str) -> date | datetime:
+    if not isinstance(serialized, str):
+        raise TypeError(f"Expected str, {serialized=}")
+    datetime_format = serialized.translate(_digit_to_d)
+    if (parser := _datetime_parser_by_format.get(datetime_format)) is None:
+        parser = _get_datetime_parser(serialized, datetime_format)
+    return parser(serialized)
+
+
+_digit_to_d: Final = str.maketrans("0123456789", "d" * 10)
+_datetime_parser_by_format: dict[str, Callable[[str], date | datetime]] = {}
+"""the cache of the parser of each datetime format. the format is the serialized value with digits replaced by 'd'.
+ex) '2023-01-01T00:00:00.000Z' -> 'dddd-dd-ddTdd:dd:dd.dddZ'"""
+
+
+def _get_datetime_parser(
+    serialized: str, datetime_format: str
+) -> Callable[[str], date | datetime]:
+    """only the fast parsers are cached, after they succeed on the value once.
+    a malformed value does not decide the parser of its format."""
+    if datetime_format == "dddd-dd-dd":
+        parser = date.fromisoformat
+    else:
+        try:
+            datetime.fromisoformat(serialized)
+            parser = _parse_iso_datetime
+        except ValueError:
+            return _parse_datetime
+    if len(_datetime_parser_by_format) < 256:
+        _datetime_parser_by_format[datetime_format] = parser
+    return parser
+
+
+def _parse_iso_datetime(serialized: str) -> datetime:
+    """the fast path for the ISO 8601 formats which Notion emits."""
+    return datetime.fromisoformat(serialized).astimezone(my_tz)
+
+
+def _parse_datetime(serialized: str) -> datetime:
+    """the general parser for any other formats."""
     try:
         dt = dateutil.parser.parse(serialized)
     except dateutil.parser.ParserError as e:
         print(serialized)
         raise e
-    if re.match(r"^\d{4}-\d{2}-\d{2}$", serialized):
-        return dt.date()
     return dt.astimezone(my_tz)
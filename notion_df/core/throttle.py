@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class ThrottleStats:
+    queue_depth: int
+    """the number of callers currently waiting for a token."""
+    wait_time: float
+    """seconds which a new caller would wait for a token."""
+    total_wait_time: float
+    """seconds which all callers have waited so far, summed."""
+    acquired: int
+    """the number of tokens handed out so far."""
+
+
+class TokenBucket:
+    """thread-safe token bucket shared by sync callers and coroutines.
+
+    each caller reserves a token under the lock, then sleeps until the reserved time outside the lock.
+    the token count can go negative, so that waiting callers are served in the order of arrival."""
+
+    def __init__(self, rate: Optional[float], burst: int):
+        self.rate: Optional[float] = rate
+        """tokens refilled per second. None means unlimited."""
+        self.burst: int = burst
+        """the maximum number of tokens which can be spent at once."""
+        self._tokens: float = burst
+        self._updated_at: float = time.monotonic()
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._total_wait_time = 0.0
+        self._acquired = 0
+
+    def configure(
+        self, rate: Optional[float] = None, burst: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            if rate is not None:
+                self.rate = rate
+            if burst is not None:
+                self.burst = burst
+                self._tokens = min(self._tokens, burst)
+
+    def disable(self) -> None:
+        with self._lock:
+            self.rate = None
+
+    def acquire(self) -> float:
+        """block until a token is available. return the seconds waited."""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.trace("throttle {:.3f}s", wait_time)
+            self._enter_queue()
+            try:
+                time.sleep(wait_time)
+            finally:
+                self._exit_queue()
+        return wait_time
+
+    async def acquire_async(self) -> float:
+        """wait until a token is available without blocking the event loop. return the seconds waited."""
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.trace("throttle {:.3f}s", wait_time)
+            self._enter_queue()
+            try:
+                await asyncio.sleep(wait_time)
+            finally:
+                self._exit_queue()
+        return wait_time
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue_depth
+
+    @property
+    def wait_time(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._get_wait_time()
+
+    def stats(self) -> ThrottleStats:
+        with self._lock:
+            self._refill(time.monotonic())
+            return ThrottleStats(
+                queue_depth=self._queue_depth,
+                wait_time=self._get_wait_time(),
+                total_wait_time=self._total_wait_time,
+                acquired=self._acquired,
+            )
+
+    def _reserve(self) -> float:
+        with self._lock:
+            self._acquired += 1
+            if self.rate is None:
+                return 0.0
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait_time = self._get_wait_time(self._tokens + 1)
+            self._total_wait_time += wait_time
+            return wait_time
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            elapsed = now - self._updated_at
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def _get_wait_time(self, tokens: Optional[float] = None) -> float:
+        """seconds until `tokens` reaches 1."""
+        if tokens is None:
+            tokens = self._tokens
+        if self.rate is None or tokens >= 1:
+            return 0.0
+        return (1 - tokens) / self.rate
+
+    def _enter_queue(self) -> None:
+        with self._lock:
+            self._queue_depth += 1
+
+    def _exit_queue(self) -> None:
+        with self._lock:
+            self._queue_depth -= 1
+
+
+rate_limiter = TokenBucket(rate=3, burst=3)
+"""the process-wide rate limiter applied to every request.
+Notion allows an average of three requests per second for each integration."""
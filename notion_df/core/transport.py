@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import json
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from os import PathLike
+from typing import Optional, Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass(frozen=True)
+class SessionSettings:
+    """connection pool settings of the HTTP session shared by every Request."""
+
+    pool_connections: int = 10
+    """the number of per-host connection pools to keep."""
+    pool_maxsize: int = 10
+    """the maximum number of kept-alive connections per host.
+    set this equal to or above the number of threads which send requests concurrently."""
+    pool_block: bool = False
+    """if True, wait for a free connection when the host pool is exhausted,
+    instead of opening a throwaway connection."""
+    timeout: float = 80
+    """seconds to wait for the server response."""
+
+
+session_settings = SessionSettings()
+_session: Optional[requests.Session] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """the process-wide, keep-alive HTTP session.
+    it is lazily created, so that `configure_session()` can be called beforehand."""
+    global _session
+    if (session := _session) is not None:
+        return session
+    with _session_lock:
+        if _session is None:
+            _session = _create_session(session_settings)
+        return _session
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """the worker threads which run blocking requests on behalf of the asyncio event loop.
+    its size follows `pool_maxsize`, so that every worker can hold a kept-alive connection."""
+    global _executor
+    if (executor := _executor) is not None:
+        return executor
+    with _session_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=session_settings.pool_maxsize,
+                thread_name_prefix="notion_df",
+            )
+        return _executor
+
+
+def configure_session(**kwargs: Any) -> SessionSettings:
+    """update the session settings with given fields, and replace the current session.
+    the connections of the previous session are closed."""
+    global session_settings
+    with _session_lock:
+        session_settings = replace(session_settings, **kwargs)
+        _close()
+    return session_settings
+
+
+def close_session() -> None:
+    """close all pooled connections. the next request will open a new session."""
+    with _session_lock:
+        _close()
+
+
+def _close() -> None:
+    global _session, _executor
+    if _session is not None:
+        _session.close()
+        _session = None
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _create_session(settings: SessionSettings) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=settings.pool_connections,
+        pool_maxsize=settings.pool_maxsize,
+        pool_block=settings.pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class Transport(metaclass=ABCMeta):
+    """sends the HTTP request of every `Request`. replace it with `set_transport()`."""
+
+    @abstractmethod
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, Any],
+        params: Any,
+        json: Any,
+        timeout: float,
+    ) -> requests.Response:
+        pass
+
+
+class SessionTransport(Transport):
+    """the default transport, which sends through the process-wide session."""
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, Any],
+        params: Any,
+        json: Any,
+        timeout: float,
+    ) -> requests.Response:
+        return get_session().request(
+            method=method,
+            url=url,
+            headers=headers,
+            params=params,
+            json=json,
+            timeout=timeout,
+        )
+
+
+@dataclass
+class Record:
+    """a request and its response, as saved by `RecordingTransport`, one JSON object per line."""
+
+    method: str
+    path: str
+    """the URL path, without the host. ex) /v1/pages/<id>"""
+    params: Any
+    body: Any
+    status: int
+    response: Any
+    headers: dict[str, str]
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return get_record_key(self.method, self.path, self.params, self.body)
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers.update(self.headers)
+        response._content = json.dumps(self.response).encode()
+        response.url = url
+        response.encoding = "utf-8"
+        return response
+
+
+def get_record_key(
+    method: str, path: str, params: Any, body: Any
+) -> tuple[str, str, str]:
+    return method.upper(), path, json.dumps([params, body], sort_keys=True)
+
+
+def load_records(path: str | PathLike) -> list[Record]:
+    with open(path, encoding="utf-8") as file:
+        return [Record(**json.loads(line)) for line in file if line.strip()]
+
+
+class RecordingTransport(Transport):
+    """send through another transport, and append each request and response to a JSON-lines file.
+    the recordings can be replayed by `ReplayTransport` or the stand-in server (`notion_df.stand_in`)."""
+
+    def __init__(self, path: str | PathLike, transport: Optional[Transport] = None):
+        self.path = path
+        self.transport: Transport = transport or SessionTransport()
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, Any],
+        params: Any,
+        json: Any,
+        timeout: float,
+    ) -> requests.Response:
+        response = self.transport.send(method, url, headers, params, json, timeout)
+        try:
+            response_data = response.json()
+        except ValueError:
+            response_data = None
+        record = Record(
+            method=method,
+            path=urlsplit(url).path,
+            params=params,
+            body=json,
+            status=response.status_code,
+            response=response_data,
+            headers={
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() in _recorded_headers
+            },
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(_dump_record(record) + "\n")
+        return response
+
+
+_recorded_headers = {"content-type", "retry-after"}
+
+
+def _dump_record(record: Record) -> str:
+    return json.dumps(asdict(record), ensure_ascii=False, default=str)
+
+
+class ReplayTransport(Transport):
+    """answer from the recorded responses, without any network access.
+    the same request recorded several times is answered in the recorded order, then with the last one.
+    the requests never recorded get a 404 response."""
+
+    def __init__(self, records: str | PathLike | list[Record]):
+        if not isinstance(records, list):
+            records = load_records(records)
+        self._records_by_key: dict[tuple[str, str, str], deque[Record]] = defaultdict(
+            deque
+        )
+        for record in records:
+            self._records_by_key[record.key].append(record)
+        self._lock = threading.Lock()
+
+    def find(self, method: str, path: str, params: Any, body: Any) -> Optional[Record]:
+        with self._lock:
+            if not (
+                records := self._records_by_key.get(
+                    get_record_key(method, path, params, body)
+                )
+            ):
+                return None
+            return records.popleft() if len(records) > 1 else records[0]
+
+    def send(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, Any],
+        params: Any,
+        json: Any,
+        timeout: float,
+    ) -> requests.Response:
+        path = urlsplit(url).path
+        if (record := self.find(method, path, params, json)) is None:
+            record = Record(
+                method, path, params, json, 404, get_not_found_error(path), {}
+            )
+        return record.to_response(url)
+
+
+def get_not_found_error(path: str) -> dict[str, Any]:
+    return {
+        "object": "error",
+        "status": 404,
+        "code": "object_not_found",
+        "message": f"no recorded response for {path}",
+    }
+
+
+_transport: Transport = SessionTransport()
+
+
+def get_transport() -> Transport:
+    return _transport
+
+
+def set_transport(transport: Transport) -> Transport:
+    """replace the transport of every `Request`, and return the previous one."""
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
@@ -7,3 +7,5 @@ from typing import Final
 my_tz = timezone(timedelta(hours=9))
 print_width = 120
 token: Final[str] = os.getenv("NOTION_TOKEN")  # TODO: support multiple token
+api_base_url: str = os.getenv("NOTION_API_BASE_URL", "https://api.notion.com/v1")
+"""set to the address of a stand-in server (`notion_df.stand_in`) to run without api.notion.com."""
@@ -46,7 +46,7 @@ def _get_type_hints(cls) -> dict[str, type]:
     )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BlockData(EntityData):
     parent: Union[Block, Page, Workspace]
     created_time: datetime
@@ -75,7 +75,7 @@ class BlockData(EntityData):
         return _get_type_hints(cls)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DatabaseData(EntityData):
     parent: Union[Block, Page, Workspace]
     created_time: datetime
@@ -99,7 +99,7 @@ class DatabaseData(EntityData):
         return _get_type_hints(cls)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PageData(EntityData):
     parent: Union[Block, Database, Page, Workspace]
     created_time: datetime
@@ -11,12 +11,16 @@ from typing import (
     cast,
     Generic,
     TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Iterator,
 )
 from uuid import UUID
 
 from loguru import logger
 from typing_extensions import Self
 
+from notion_df.core.cache import query_cache
 from notion_df.core.collection import Paginator
 from notion_df.core.entity_core import (
     retrieve_on_demand,
@@ -30,14 +34,22 @@ from notion_df.core.uuid_parser import get_page_or_database_id, get_block_id
 from notion_df.core.variable import token
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pandas as pd
+    import pyarrow as pa
+
     from notion_df.contents import BlockContents
     from notion_df.data import BlockData, DatabaseData, PageData
     from notion_df.file import ExternalFile, File
     from notion_df.filter import Filter
-    from notion_df.misc import Icon
+    from notion_df.frame import WriteBackResult
+    from notion_df.misc import Icon, PartialParent
     from notion_df.property import Property, PageProperties, DatabaseProperties, PPVT
     from notion_df.rich_text import RichText
     from notion_df.sort import Sort, Direction
+    from notion_df.sync import DatabaseMirror, SyncResult
+    from notion_df.tree import BlockTreeNode
     from notion_df.user import PartialUser
 
 BlockT = TypeVar("BlockT", bound="Block")
@@ -188,57 +200,109 @@ class Block(BaseBlock["BlockData"], Generic[BlockT]):
         return repr_object(self, id=self.id)
 
     def retrieve(self) -> Self:
-        logger.info(f"Block.retrieve({self})")
+        logger.info("Block.retrieve({})", self)
         from notion_df.request.block import RetrieveBlock
 
         RetrieveBlock(token, self.id).execute()
         return self
 
-    def retrieve_children(self) -> Paginator[Block]:
-        logger.info(f"Block.retrieve_children({self})")
+    async def retrieve_async(self) -> Self:
+        """the async version of `retrieve()`. see `Request.execute_async()` for the concurrency limit."""
+        logger.info("Block.retrieve_async({})", self)
+        from notion_df.request.block import RetrieveBlock
+
+        await RetrieveBlock(token, self.id).execute_async()
+        return self
+
+    def retrieve_children(self, prefetch: int = 0) -> Paginator[Block]:
+        logger.info("Block.retrieve_children({})", self)
         from notion_df.request.block import RetrieveBlockChildren
 
         return Paginator(
             Block,
             (
                 Block(block_data.id)
-                for block_data in RetrieveBlockChildren(token, self.id).execute()
+                for block_data in RetrieveBlockChildren(token, self.id).execute(
+                    prefetch
+                )
             ),
         )
 
+    def retrieve_descendants(
+        self,
+        max_depth: Optional[int] = None,
+        max_workers: int = 4,
+        callback: Optional[Callable[[BlockTreeNode], None]] = None,
+        include_child_pages: bool = False,
+    ) -> BlockTreeNode:
+        """retrieve the block tree under this block, with the children of different blocks retrieved concurrently.
+        return the root node, whose `children` are the nodes of the child blocks.
+        child pages and child databases are not entered unless `include_child_pages` is set.
+        see `notion_df.tree.retrieve_descendants()` for the details."""
+        logger.info("Block.retrieve_descendants({})", self)
+        from notion_df.tree import retrieve_descendants
+
+        return retrieve_descendants(
+            self, max_depth, max_workers, callback, include_child_pages
+        )
+
+    async def retrieve_children_async(self) -> AsyncIterator[Block]:
+        """the async version of `retrieve_children()`. see `Request.execute_async()` for the concurrency limit."""
+        logger.info("Block.retrieve_children_async({})", self)
+        from notion_df.request.block import RetrieveBlockChildren
+
+        async for block_data in RetrieveBlockChildren(token, self.id).execute_async():
+            yield Block(block_data.id)
+
     def update(
         self, block_type: Optional[BlockContents], archived: Optional[bool]
     ) -> Self:
-        logger.info(f"Block.update({self})")
+        logger.info("Block.update({})", self)
         from notion_df.request.block import UpdateBlock
 
         UpdateBlock(token, self.id, block_type, archived).execute()
         return self
 
     def delete(self, ignore_archived: bool = False) -> Self:
-        logger.info(f"Block.delete({self})")
+        logger.info("Block.delete({})", self)
         try:
             from notion_df.request.block import DeleteBlock
 
             DeleteBlock(token, self.id).execute()
         except RequestError as e:
             if ignore_archived and "Can't edit block that is archived." in e.message:
-                logger.info(f"ignore already archived block {self}")
+                logger.info("ignore already archived block {}", self)
             else:
                 raise e
         return self
 
     def append_children(self, child_values: list[BlockContents]) -> list[Block]:
-        logger.info(f"Block.append_children({self})")
+        """the children are appended in chunks of at most 100 blocks, in order.
+        the nested children set on each block contents are appended as well."""
+        logger.info("Block.append_children({})", self)
+        if not child_values:
+            return []
+        from notion_df.request.block import append_block_children
+
+        return [
+            Block(block_data.id)
+            for block_data in append_block_children(token, self.id, child_values)
+        ]
+
+    async def append_children_async(
+        self, child_values: list[BlockContents]
+    ) -> list[Block]:
+        """the async version of `append_children()`. see `Request.execute_async()` for the concurrency limit."""
+        logger.info("Block.append_children_async({})", self)
         if not child_values:
             return []
-        from notion_df.request.block import AppendBlockChildren
+        from notion_df.request.block import append_block_children_async
 
         return [
             Block(block_data.id)
-            for block_data in AppendBlockChildren(
+            for block_data in await append_block_children_async(
                 token, self.id, child_values
-            ).execute()
+            )
         ]
 
     def create_child_database(
@@ -249,7 +313,7 @@ class Block(BaseBlock["BlockData"], Generic[BlockT]):
         icon: Optional[Icon] = None,
         cover: Optional[File] = None,
     ) -> Database:
-        logger.info(f"Block.create_child_database({self})")
+        logger.info("Block.create_child_database({})", self)
         from notion_df.request.database import CreateDatabase
 
         return Database(
@@ -336,17 +400,26 @@ class Database(BaseBlock["DatabaseData"], Generic[PageT]):
             return repr_object(self, id=self.id)
 
     def retrieve(self) -> Self:
-        logger.info(f"Database.retrieve({self})")
+        logger.info("Database.retrieve({})", self)
         from notion_df.request.database import RetrieveDatabase
 
         RetrieveDatabase(token, self.id).execute()
         return self
 
+    async def retrieve_async(self) -> Self:
+        """the async version of `retrieve()`. see `Request.execute_async()` for the concurrency limit."""
+        logger.info("Database.retrieve_async({})", self)
+        from notion_df.request.database import RetrieveDatabase
+
+        await RetrieveDatabase(token, self.id).execute_async()
+        return self
+
     def update(self, title: RichText, properties: DatabaseProperties) -> Database:
-        logger.info(f"Database.update({self})")
+        logger.info("Database.update({})", self)
         from notion_df.request.database import UpdateDatabase
 
         UpdateDatabase(token, self.id, title, properties).execute()
+        query_cache.invalidate(self.id)
         return self
 
     def create_child_page(
@@ -356,22 +429,14 @@ class Database(BaseBlock["DatabaseData"], Generic[PageT]):
         icon: Optional[Icon] = None,
         cover: Optional[File] = None,
     ) -> Page:
-        logger.info(f"Database.create_child_page({self})")
-        from notion_df.request.page import CreatePage
+        logger.info("Database.create_child_page({})", self)
         from notion_df.misc import PartialParent
 
-        return Page(
-            CreatePage(
-                token,
-                PartialParent("database_id", self.id),
-                properties,
-                children,
-                icon,
-                cover,
-            )
-            .execute()
-            .id
+        page = _create_page(
+            PartialParent("database_id", self.id), properties, children, icon, cover
         )
+        query_cache.invalidate(self.id)
+        return page
 
     # noinspection PyShadowingBuiltins
     def query(
@@ -379,20 +444,161 @@ class Database(BaseBlock["DatabaseData"], Generic[PageT]):
         filter: Optional[Filter] = None,
         sort: Optional[list[Sort]] = None,
         page_size: Optional[int] = None,
+        prefetch: int = 0,
+        prefetch_related: Optional[list[str | Property]] = None,
     ) -> Paginator[Page]:  # TODO: temp fix since generic[PageT] not recognized
-        logger.info(f"Database.query({self})")
+        """set `prefetch` to request the next pages in background while the current page is consumed.
+        `close()` the result (or use it as a context manager) if it is not fully consumed.
+
+        set `prefetch_related` to the relation properties whose pages are read afterward. other properties raise ValueError.
+        the related pages of each response page are retrieved together, before its pages are yielded.
+        the relations with more than 25 pages are prefetched only partially.
+
+        if `query_cache` is enabled, the same query is answered from the cache,
+        as long as the data of every page in the result is still held."""
+        logger.info("Database.query({})", self)
         from notion_df.request.database import QueryDatabase
 
-        return Paginator(
-            Page,
-            (
-                Page(page_data.id)
-                for page_data in QueryDatabase(
-                    token, self.id, filter, sort, page_size
-                ).execute()
+        query = QueryDatabase(token, self.id, filter, sort, page_size)
+        body = {"body": query.get_body(), "page_size": page_size}
+        if (page_ids := query_cache.get(self.id, body)) is not None:
+            pages = [Page(page_id) for page_id in page_ids]
+            if all(page.local_data for page in pages):
+                if prefetch_related:
+                    _prefetch_related(
+                        [page.local_data for page in pages], prefetch_related
+                    )
+                return Paginator(Page, iter(pages))
+
+        def iter_pages() -> Iterator[Page]:
+            if not prefetch_related:
+                for page_data in query.execute(prefetch):
+                    yield Page(page_data.id)
+                return
+            for data in query.execute_raw(prefetch):
+                page_data_list = list(query.parse_response_data(data))
+                _prefetch_related(page_data_list, prefetch_related)
+                for page_data in page_data_list:
+                    yield Page(page_data.id)
+
+        return Paginator(Page, query_cache.record(self.id, body, iter_pages()))
+
+    @property
+    def mirror(self) -> DatabaseMirror:
+        """the local copy of the pages, updated by `sync()`."""
+        from notion_df.sync import get_mirror
+
+        return get_mirror(self)
+
+    def sync(self) -> SyncResult:
+        """query only the pages edited since the last sync, and merge them into `mirror`.
+        return the added and the updated pages."""
+        logger.info("Database.sync({})", self)
+        return self.mirror.sync()
+
+    # noinspection PyShadowingBuiltins
+    def query_frame(
+        self,
+        filter: Optional[Filter] = None,
+        sort: Optional[list[Sort]] = None,
+        page_size: Optional[int] = None,
+        prefetch: int = 1,
+        cache: bool = False,
+    ) -> pd.DataFrame:
+        """query into a DataFrame indexed by page id, with a column typed by each database property.
+        the values are read from the response JSON without creating `Page` instances. requires `pandas`.
+
+        - number: Float64, checkbox: boolean, title/rich_text/url/...: string
+        - date/created_time/last_edited_time: datetime in `my_tz`. only the start of date ranges are kept.
+        - select/status: category, ordered as the database options.
+        - multi_select/relation/people/files: list of names or ids.
+
+        set `cache` to keep the pages as the real data as well, which `write_back()` compares with."""
+        logger.info("Database.query_frame({})", self)
+        from notion_df.frame import cache_pages, get_columns, to_frame
+        from notion_df.request.database import QueryDatabase
+
+        response_data = QueryDatabase(
+            token, self.id, filter, sort, page_size
+        ).execute_raw(prefetch)
+        if cache:
+            response_data = cache_pages(response_data)
+        return to_frame(get_columns(self.properties), response_data)
+
+    def write_back(
+        self, frame: pd.DataFrame, max_workers: int = 4
+    ) -> list[WriteBackResult]:
+        """update the pages of the rows edited from `query_frame()`, sending the changed properties only.
+        the rows are compared with the real data of the pages, which are retrieved if missing.
+        return the result of each row, including the request errors."""
+        logger.info("Database.write_back({})", self)
+        from notion_df.frame import write_back
+
+        return write_back(frame, self, max_workers)
+
+    # noinspection PyShadowingBuiltins
+    def query_record_batches(
+        self,
+        filter: Optional[Filter] = None,
+        sort: Optional[list[Sort]] = None,
+        page_size: Optional[int] = None,
+        prefetch: int = 1,
+    ) -> pa.RecordBatchReader:
+        """query into a stream of Arrow record batches, one for each response page.
+        the columns are typed as `query_frame()`. requires `pyarrow`."""
+        logger.info("Database.query_record_batches({})", self)
+        import pyarrow as pa
+        from notion_df.frame import get_arrow_schema, get_columns, iter_record_batches
+        from notion_df.request.database import QueryDatabase
+
+        columns = get_columns(self.properties)
+        return pa.RecordBatchReader.from_batches(
+            get_arrow_schema(columns),
+            iter_record_batches(
+                columns,
+                QueryDatabase(token, self.id, filter, sort, page_size).execute_raw(
+                    prefetch
+                ),
             ),
         )
 
+    # noinspection PyShadowingBuiltins
+    def export_parquet(
+        self,
+        path: str | Path,
+        filter: Optional[Filter] = None,
+        sort: Optional[list[Sort]] = None,
+        prefetch: int = 1,
+    ) -> int:
+        """write the query result into a Parquet file, a row group for each response page,
+        so that the memory usage does not grow with the database size. return the number of rows.
+        requires `pyarrow`."""
+        logger.info("Database.export_parquet({}, {})", self, path)
+        from notion_df.frame import get_columns, write_parquet
+        from notion_df.request.database import QueryDatabase
+
+        return write_parquet(
+            get_columns(self.properties),
+            QueryDatabase(token, self.id, filter, sort).execute_raw(prefetch),
+            path,
+        )
+
+    # noinspection PyShadowingBuiltins
+    async def query_async(
+        self,
+        filter: Optional[Filter] = None,
+        sort: Optional[list[Sort]] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[Page]:
+        """the async version of `query()`. see `Request.execute_async()` for the concurrency limit."""
+        logger.info("Database.query_async({})", self)
+        from notion_df.request.database import QueryDatabase
+
+        async for page_data in QueryDatabase(
+            token, self.id, filter, sort, page_size
+        ).execute_async():
+            yield Page(page_data.id)
+
 
 class Page(BaseBlock["PageData"]):
     @classmethod
@@ -496,16 +702,44 @@ class Page(BaseBlock["PageData"]):
         return block
 
     def retrieve(self) -> Self:
-        logger.info(f"Page.retrieve({self})")
+        logger.info("Page.retrieve({})", self)
         from notion_df.request.page import RetrievePage
 
         RetrievePage(token, self.id).execute()
         return self
 
+    async def retrieve_async(self) -> Self:
+        """the async version of `retrieve()`. see `Request.execute_async()` for the concurrency limit."""
+        logger.info("Page.retrieve_async({})", self)
+        from notion_df.request.page import RetrievePage
+
+        await RetrievePage(token, self.id).execute_async()
+        return self
+
+    def retrieve_descendants(
+        self,
+        max_depth: Optional[int] = None,
+        max_workers: int = 4,
+        callback: Optional[Callable[[BlockTreeNode], None]] = None,
+        include_child_pages: bool = False,
+    ) -> BlockTreeNode:
+        """retrieve the block tree of the page contents, with the children of different blocks retrieved concurrently.
+        return the root node, whose `children` are the nodes of the top-level blocks.
+        child pages and child databases are not entered unless `include_child_pages` is set.
+        see `notion_df.tree.retrieve_descendants()` for the details."""
+        logger.info("Page.retrieve_descendants({})", self)
+        from notion_df.tree import retrieve_descendants
+
+        return retrieve_descendants(
+            self, max_depth, max_workers, callback, include_child_pages
+        )
+
     def retrieve_property_item(
         self, property_id: str | Property[Any, PPVT, Any]
     ) -> PPVT:
-        logger.info(f'Page.retrieve_property_item({self}, property_id="{property_id}")')
+        logger.info(
+            'Page.retrieve_property_item({}, property_id="{}")', self, property_id
+        )
         from notion_df.request.page import RetrievePagePropertyItem
         from notion_df.property import Property
 
@@ -541,10 +775,14 @@ class Page(BaseBlock["PageData"]):
         cover: Optional[ExternalFile] = None,
         archived: Optional[bool] = None,
     ) -> Self:
-        logger.info(f"Page.update({self})")
+        logger.info("Page.update({})", self)
         from notion_df.request.page import UpdatePage
 
-        UpdatePage(token, self.id, properties, icon, cover, archived).execute()
+        page_data = UpdatePage(
+            token, self.id, properties, icon, cover, archived
+        ).execute()
+        if isinstance(page_data.parent, Database):
+            query_cache.invalidate(page_data.parent.id)
         return self
 
     def create_child_page(
@@ -554,21 +792,11 @@ class Page(BaseBlock["PageData"]):
         icon: Optional[Icon] = None,
         cover: Optional[File] = None,
     ) -> Page:
-        logger.info(f"Page.create_child_page({self})")
-        from notion_df.request.page import CreatePage
+        logger.info("Page.create_child_page({})", self)
         from notion_df.misc import PartialParent
 
-        return Page(
-            CreatePage(
-                token,
-                PartialParent("page_id", self.id),
-                properties,
-                children,
-                icon,
-                cover,
-            )
-            .execute()
-            .id
+        return _create_page(
+            PartialParent("page_id", self.id), properties, children, icon, cover
         )
 
     def create_child_database(
@@ -579,7 +807,50 @@ class Page(BaseBlock["PageData"]):
         icon: Optional[Icon] = None,
         cover: Optional[File] = None,
     ) -> Database:
-        logger.info(f"Page.create_child_database({self})")
+        logger.info("Page.create_child_database({})", self)
         return self.as_block().create_child_database(
             title, properties=properties, icon=icon, cover=cover
         )
+
+
+def _create_page(
+    parent: PartialParent,
+    properties: Optional[PageProperties],
+    children: Optional[list[BlockContents]],
+    icon: Optional[Icon],
+    cover: Optional[File],
+) -> Page:
+    """create the page with as many leading children as fit in a single request, with their nested children.
+    the rest of the children are appended after the page is created."""
+    from notion_df.request.block import append_block_children, count_inline_children
+    from notion_df.request.page import CreatePage
+
+    children = children or []
+    inline_count = count_inline_children(children)
+    page_data = CreatePage(
+        token, parent, properties, children[:inline_count], icon, cover
+    ).execute()
+    if children[inline_count:]:
+        append_block_children(token, page_data.id, children[inline_count:])
+    return Page(page_data.id)
+
+
+def _prefetch_related(
+    page_data_list: list[PageData], props: list[str | Property]
+) -> None:
+    """retrieve the pages related to the given pages by the properties, at once.
+    raise ValueError if any of the properties is not a relation."""
+    from notion_df.property import RelationPagePropertyValue, RelationProperty
+
+    for prop in props:
+        if not isinstance(prop, (str, RelationProperty)):
+            raise ValueError(f"not a relation property, {prop=}")
+    related_pages = []
+    for page_data in page_data_list:
+        for prop in props:
+            if (prop_value := page_data.properties.get(prop)) is None:
+                continue
+            if not isinstance(prop_value, RelationPagePropertyValue):
+                raise ValueError(f"not a relation property, {prop=}")
+            related_pages.extend(prop_value)
+    Page.retrieve_many(related_pages)
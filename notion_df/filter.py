@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import operator
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
-from datetime import datetime, date
-from typing import Literal, Any, Callable, Optional
+from datetime import datetime, date, timedelta
+from typing import Literal, Any, Callable, Final, Optional, TYPE_CHECKING
 from uuid import UUID
 
-from notion_df.core.serialization import Serializable, serialize
+from dateutil.relativedelta import relativedelta
+
+from notion_df.core.exception import NotionDfException
+from notion_df.core.serialization import Serializable, serialize, deserialize_datetime
+from notion_df.core.variable import my_tz
 from notion_df.constant import TimestampName, Number
 from notion_df.entity import Page
 
+if TYPE_CHECKING:
+    from notion_df.data import PageData
+
 CompoundOperator = Literal["and", "or"]
 RollupAggregate = Literal["any", "every", "none"]
 FilterCondition = dict[str, Any]
@@ -255,9 +263,23 @@ class RelationFilterBuilder(FilterBuilder):
         return self._build({"is_not_empty": True})
 
 
+class LocalEvaluationError(NotionDfException, ValueError):
+    """the filter is valid, but the local page data is not enough to evaluate it.
+    ex) a property referred by its id, a rollup aggregated into a number, a filter type or condition with no local evaluator.
+    the callers can fall back to the server, such as `Database.query()`."""
+
+    pass
+
+
 @dataclass
 class Filter(Serializable, metaclass=ABCMeta):
     # https://developers.notion.com/reference/post-database-query-filter
+    @abstractmethod
+    def evaluate(self, page_data: PageData) -> bool:
+        """apply the filter to the local page data, as the server would do on a database query.
+        raise LocalEvaluationError if the local data is not enough."""
+        pass
+
     def __and__(self, other: Filter) -> CompoundFilter:
         return self.__compound(other, "and")
 
@@ -282,6 +304,11 @@ class CompoundFilter(Filter):
     def serialize(self):
         return {self.operator: serialize(self.elements)}
 
+    def evaluate(self, page_data: PageData) -> bool:
+        if self.operator == "and":
+            return all(element.evaluate(page_data) for element in self.elements)
+        return any(element.evaluate(page_data) for element in self.elements)
+
 
 # noinspection PyPep8Naming
 def AND(elements: list[Filter]) -> CompoundFilter:
@@ -302,6 +329,14 @@ class PropertyFilter(Filter):
     def serialize(self):
         return {"property": self.name_or_id, self.typename: serialize(self.condition)}
 
+    def evaluate(self, page_data: PageData) -> bool:
+        prop_value = _get_prop_value(page_data, self.name_or_id)
+        return _evaluate_condition(
+            _get_filter_typename(self.typename),
+            _get_operand(self.typename, prop_value),
+            self.condition,
+        )
+
 
 @dataclass
 class FormulaPropertyFilter(Filter):
@@ -316,6 +351,12 @@ class FormulaPropertyFilter(Filter):
             self.typename: {self.value_typename: serialize(self.condition)},
         }
 
+    def evaluate(self, page_data: PageData) -> bool:
+        prop_value = _get_prop_value(page_data, self.name_or_id)
+        return _evaluate_condition(
+            self.value_typename, _get_operand("formula", prop_value), self.condition
+        )
+
 
 @dataclass
 class RollupPropertyAggregateFilter(Filter):
@@ -330,6 +371,39 @@ class RollupPropertyAggregateFilter(Filter):
             "rollup": {self.aggregate_type: {self.typename: serialize(self.condition)}},
         }
 
+    def evaluate(self, page_data: PageData) -> bool:
+        """only the rollups shown as the original values (array) can be evaluated."""
+        from notion_df.property import Property, RollupPagePropertyValue
+
+        prop_value = _get_prop_value(page_data, self.name_or_id)
+        if (
+            not isinstance(prop_value, RollupPagePropertyValue)
+            or prop_value.value_typename != "array"
+        ):
+            raise LocalEvaluationError(
+                f"rollup of the original values is required, {self.name_or_id=}"
+            )
+        evaluate = _get_condition_evaluator(
+            _get_filter_typename(self.typename), self.condition
+        )
+        results = []
+        for element_raw in prop_value.value:
+            if element_raw.get("type") != self.typename:
+                raise LocalEvaluationError(
+                    f"rollup of {self.typename} is required, {element_raw.get('type')=}"
+                )
+            # noinspection PyProtectedMember
+            element: Any = Property._deserialize_page_value(element_raw)
+            operand = _get_operand(self.typename, element)
+            results.append(evaluate(operand))
+        match self.aggregate_type:
+            case "any":
+                return any(results)
+            case "every":
+                return all(results)
+            case "none":
+                return not any(results)
+
     def serialize2(self):
         # TODO: find which is correct by actual testing
         return {
@@ -346,6 +420,11 @@ class TimestampFilter(Filter):
     def serialize(self):
         return {"timestamp_type": self.name, self.name: serialize(self.condition)}
 
+    def evaluate(self, page_data: PageData) -> bool:
+        return _evaluate_condition(
+            "date", getattr(page_data, self.name), self.condition
+        )
+
 
 def _get_timestamp_filter_builder(name: TimestampName) -> DateFilterBuilder:
     def build(filter_condition: dict[str, Any]):
@@ -356,3 +435,228 @@ def _get_timestamp_filter_builder(name: TimestampName) -> DateFilterBuilder:
 
 created_time_filter = _get_timestamp_filter_builder("created_time")
 last_edited_time_filter = _get_timestamp_filter_builder("last_edited_time")
+
+
+def _get_filter_typename(property_typename: str) -> Optional[str]:
+    """the typename of the filter builder of the property type. None if the property type has no filter builder."""
+    from notion_df.property import property_registry
+
+    filter_cls = getattr(property_registry.get(property_typename), "_filter_cls", None)
+    if isinstance(filter_cls, type) and issubclass(filter_cls, FilterBuilder):
+        return filter_cls.get_typename()
+    return None
+
+
+def _get_prop_value(page_data: PageData, name_or_id: str | UUID) -> Any:
+    try:
+        return page_data.properties[str(name_or_id)]
+    except KeyError:
+        raise LocalEvaluationError(
+            f"the page data has no property named {name_or_id!r}"
+        ) from None
+
+
+def _get_operand(typename: str, prop_value: Any) -> Any:
+    """convert the page property value into the operand of the filter condition.
+    text -> str, select -> option name, multi_select -> option names,
+    date -> start, people/relation -> ids, files -> the list itself."""
+    match typename:
+        case "title" | "rich_text":
+            return prop_value.plain_text
+        case "select" | "status":
+            return prop_value.name if prop_value else None
+        case "multi_select":
+            return [option.name for option in prop_value]
+        case "date" | "formula" if hasattr(prop_value, "start"):
+            return prop_value.start
+        case "people" | "relation":
+            return [str(element.id) for element in prop_value]
+        case "created_by" | "last_edited_by":
+            return [str(prop_value.id)]
+        case _:
+            return prop_value
+
+
+def _get_condition_evaluator(
+    filter_typename: Optional[str], condition: FilterCondition
+) -> Callable[[Any], bool]:
+    """raise LocalEvaluationError if the filter type or any key of the condition has no local evaluator.
+    such conditions may still be valid on the server."""
+    if filter_typename is None or filter_typename not in _condition_evaluators:
+        raise LocalEvaluationError(f"no local evaluator of {filter_typename} filter")
+    evaluate = _condition_evaluators[filter_typename]
+    if unknown_keys := condition.keys() - _condition_keys[filter_typename]:
+        raise LocalEvaluationError(
+            f"no local evaluator of {filter_typename} filter condition, {sorted(unknown_keys)}"
+        )
+    return lambda operand: all(
+        evaluate(operand, key, value) for key, value in condition.items()
+    )
+
+
+def _evaluate_condition(
+    filter_typename: Optional[str], operand: Any, condition: FilterCondition
+) -> bool:
+    return _get_condition_evaluator(filter_typename, condition)(operand)
+
+
+def _evaluate_text_condition(operand: Optional[str], key: str, value: Any) -> bool:
+    operand = operand or ""
+    match key:
+        case "equals":
+            return operand == value
+        case "does_not_equal":
+            return operand != value
+        case "contains":
+            return value.casefold() in operand.casefold()
+        case "does_not_contain":
+            return value.casefold() not in operand.casefold()
+        case "starts_with":
+            return operand.casefold().startswith(value.casefold())
+        case "ends_with":
+            return operand.casefold().endswith(value.casefold())
+    return _evaluate_emptiness_condition(operand, key, value)
+
+
+def _evaluate_number_condition(operand: Optional[Number], key: str, value: Any) -> bool:
+    if key in _number_operators:
+        return operand is not None and _number_operators[key](operand, value)
+    if key == "does_not_equal":
+        return operand != value
+    return _evaluate_emptiness_condition(operand, key, value)
+
+
+_number_operators: dict[str, Callable[[Any, Any], bool]] = {
+    "equals": operator.eq,
+    "greater_than": operator.gt,
+    "less_than": operator.lt,
+    "greater_than_or_equal_to": operator.ge,
+    "less_than_or_equal_to": operator.le,
+}
+
+
+def _evaluate_checkbox_condition(operand: bool, key: str, value: Any) -> bool:
+    if key == "equals":
+        return bool(operand) == value
+    return bool(operand) != value  # does_not_equal
+
+
+def _evaluate_select_condition(operand: Optional[str], key: str, value: Any) -> bool:
+    match key:
+        case "equals":
+            return operand == value
+        case "does_not_equal":
+            return operand != value
+    return _evaluate_emptiness_condition(operand, key, value)
+
+
+def _evaluate_list_condition(operand: list[str], key: str, value: Any) -> bool:
+    """multi_select option names, people ids, relation ids, or files."""
+    match key:
+        case "contains":
+            return str(value) in operand
+        case "does_not_contain":
+            return str(value) not in operand
+    return _evaluate_emptiness_condition(operand, key, value)
+
+
+def _evaluate_date_condition(
+    operand: Optional[date | datetime], key: str, value: Any
+) -> bool:
+    if key in _date_operators:
+        if operand is None:
+            return False
+        if isinstance(value, str):
+            value = deserialize_datetime(value)
+        return _date_operators[key](*_get_comparable_dates(operand, value))
+    if key in _relative_date_ranges:
+        if operand is None:
+            return False
+        today = datetime.now(my_tz).date()
+        start, end = sorted([today, today + _relative_date_ranges[key]])
+        operand_date, _ = _get_comparable_dates(operand, today)
+        return start <= operand_date <= end
+    return _evaluate_emptiness_condition(operand, key, value)
+
+
+_date_operators: dict[str, Callable[[Any, Any], bool]] = {
+    "equals": operator.eq,
+    "before": operator.lt,
+    "after": operator.gt,
+    "on_or_before": operator.le,
+    "on_or_after": operator.ge,
+}
+_relative_date_ranges: dict[str, timedelta | relativedelta] = {
+    "past_week": timedelta(weeks=-1),
+    "past_month": relativedelta(months=-1),
+    "past_year": relativedelta(years=-1),
+    "next_week": timedelta(weeks=1),
+    "next_month": relativedelta(months=1),
+    "next_year": relativedelta(years=1),
+}
+
+
+def _get_comparable_dates(
+    date_1: date | datetime, date_2: date | datetime
+) -> tuple[date | datetime, date | datetime]:
+    """compare by date if either one has no time. naive datetimes are regarded to be in `my_tz`."""
+    if isinstance(date_1, datetime) and isinstance(date_2, datetime):
+        return _as_aware(date_1), _as_aware(date_2)
+    return _as_date(date_1), _as_date(date_2)
+
+
+def _as_aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=my_tz)
+
+
+def _as_date(dt: date | datetime) -> date:
+    if isinstance(dt, datetime):
+        return _as_aware(dt).astimezone(my_tz).date()
+    return dt
+
+
+def _evaluate_emptiness_condition(operand: Any, key: str, value: Any) -> bool:
+    is_empty = operand is None or (
+        isinstance(operand, (str, list)) and len(operand) == 0
+    )
+    if key == "is_empty":
+        return is_empty == value
+    return (not is_empty) == value  # is_not_empty
+
+
+_condition_evaluators: dict[str, Callable[[Any, str, Any], bool]] = {
+    "text": _evaluate_text_condition,
+    "number": _evaluate_number_condition,
+    "checkbox": _evaluate_checkbox_condition,
+    "select": _evaluate_select_condition,
+    "multi_select": _evaluate_list_condition,
+    "date": _evaluate_date_condition,
+    "people": _evaluate_list_condition,
+    "files": _evaluate_list_condition,
+    "relation": _evaluate_list_condition,
+}
+"""the evaluator of each filter type, which takes the operand, the condition key and the condition value."""
+_emptiness_keys: Final = frozenset({"is_empty", "is_not_empty"})
+_list_keys: Final = frozenset({"contains", "does_not_contain"}) | _emptiness_keys
+_condition_keys: dict[str, frozenset[str]] = {
+    "text": frozenset(
+        {
+            "equals",
+            "does_not_equal",
+            "contains",
+            "does_not_contain",
+            "starts_with",
+            "ends_with",
+        }
+    )
+    | _emptiness_keys,
+    "number": frozenset({*_number_operators, "does_not_equal"}) | _emptiness_keys,
+    "checkbox": frozenset({"equals", "does_not_equal"}),
+    "select": frozenset({"equals", "does_not_equal"}) | _emptiness_keys,
+    "multi_select": _list_keys,
+    "date": frozenset({*_date_operators, *_relative_date_ranges}) | _emptiness_keys,
+    "people": _list_keys,
+    "files": _emptiness_keys,
+    "relation": _list_keys,
+}
+"""the condition keys understood by the local evaluator of each filter type."""
@@ -0,0 +1,504 @@
+"""columnar materialization of database query results,
+used by `Database.query_frame()`, `Database.query_record_batches()`, `Database.export_parquet()`
+and `Database.write_back()`.
+requires the optional dependencies `pandas` and `pyarrow` (`notion_df[frame]`).
+
+the values are read straight from the response JSON, skipping the deserialization into `PageData`."""
+
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Literal, Optional, TYPE_CHECKING
+from uuid import UUID
+
+from loguru import logger
+
+from notion_df.core.serialization import deserialize_datetime
+from notion_df.core.variable import my_tz
+from notion_df.misc import DateRange, SelectOption
+from notion_df.property import (
+    DatabaseProperties,
+    PageProperties,
+    RelationPagePropertyValue,
+    SelectDatabasePropertyValue,
+    StatusDatabasePropertyValue,
+)
+from notion_df.rich_text import RichText
+from notion_df.user import PartialUser
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+    from notion_df.entity import Database, Page
+
+ColumnKind = Literal[
+    "number", "boolean", "datetime", "category", "string", "list", "object"
+]
+
+
+def _get_plain_text(value: list[dict[str, Any]]) -> str:
+    return "".join(span["plain_text"] for span in value)
+
+
+def _get_name(value: Optional[dict[str, Any]]) -> Optional[str]:
+    return value["name"] if value else None
+
+
+def _get_names(value: list[dict[str, Any]]) -> list[str]:
+    return [element["name"] for element in value]
+
+
+def _get_id(value: dict[str, Any]) -> str:
+    return value["id"]
+
+
+def _get_ids(value: list[dict[str, Any]]) -> list[str]:
+    return [element["id"] for element in value]
+
+
+def _get_date_start(value: Optional[dict[str, Any]]) -> Optional[str]:
+    return value["start"] if value else None
+
+
+def _get_formula_value(value: dict[str, Any]) -> Any:
+    typename = value["type"]
+    if typename == "date":
+        return _get_date_start(value["date"])
+    return value[typename]
+
+
+def _get_rollup_value(value: dict[str, Any]) -> Any:
+    typename = value["type"]
+    match typename:
+        case "date":
+            return _get_date_start(value["date"])
+        case "array":
+            return [get_value(element) for element in value["array"]]
+        case _:
+            return value.get(typename)
+
+
+def _get_as_is(value: Any) -> Any:
+    return value
+
+
+value_getter_by_typename: dict[str, Callable[[Any], Any]] = {
+    "checkbox": _get_as_is,
+    "created_by": _get_id,
+    "created_time": _get_as_is,
+    "date": _get_date_start,
+    "email": _get_as_is,
+    "files": _get_names,
+    "formula": _get_formula_value,
+    "last_edited_by": _get_id,
+    "last_edited_time": _get_as_is,
+    "multi_select": _get_names,
+    "number": _get_as_is,
+    "people": _get_ids,
+    "phone_number": _get_as_is,
+    "relation": _get_ids,
+    "rollup": _get_rollup_value,
+    "rich_text": _get_plain_text,
+    "title": _get_plain_text,
+    "select": _get_name,
+    "status": _get_name,
+    "url": _get_as_is,
+}
+"""the getter of the column value from the serialized property value, for each property type.
+dates are kept as ISO 8601 strings, to be parsed by column."""
+
+kind_by_typename: dict[str, ColumnKind] = {
+    "checkbox": "boolean",
+    "created_by": "string",
+    "created_time": "datetime",
+    "date": "datetime",
+    "email": "string",
+    "files": "list",
+    "last_edited_by": "string",
+    "last_edited_time": "datetime",
+    "multi_select": "list",
+    "number": "number",
+    "people": "list",
+    "phone_number": "string",
+    "relation": "list",
+    "rich_text": "string",
+    "select": "category",
+    "status": "category",
+    "title": "string",
+    "url": "string",
+}
+"""the column kind of each property type. the others are "object", holding mixed values."""
+
+
+def get_value(prop_serialized: dict[str, Any]) -> Any:
+    typename = prop_serialized["type"]
+    value = prop_serialized.get(typename)
+    if (getter := value_getter_by_typename.get(typename)) is None:
+        return value
+    return getter(value)
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    typename: str
+    categories: tuple[str, ...] = ()
+    """the option names of select and status properties, in the order of the database."""
+
+    @property
+    def kind(self) -> ColumnKind:
+        return kind_by_typename.get(self.typename, "object")
+
+
+def get_columns(properties: DatabaseProperties) -> list[Column]:
+    columns = []
+    for prop, prop_value in properties.items():
+        categories: tuple[str, ...] = ()
+        if isinstance(
+            prop_value, (SelectDatabasePropertyValue, StatusDatabasePropertyValue)
+        ):
+            categories = tuple(option.name for option in prop_value.options)
+        columns.append(Column(prop.name, prop.typename, categories))
+    return columns
+
+
+def iter_column_batches(
+    columns: list[Column], response_data: Iterable[dict[str, Any]]
+) -> Iterator[tuple[list[str], dict[str, list[Any]]]]:
+    """yield the page ids and the column values of each response page.
+    only one response page is kept in memory at once."""
+    for data in response_data:
+        results = data["results"]
+        batch: dict[str, list[Any]] = {}
+        for column in columns:
+            name = column.name
+            getter = value_getter_by_typename.get(column.typename)
+            values = []
+            for page in results:
+                if (prop_serialized := page["properties"].get(name)) is None:
+                    values.append(None)
+                elif getter is None:
+                    values.append(prop_serialized.get(column.typename))
+                else:
+                    values.append(getter(prop_serialized[column.typename]))
+            batch[name] = values
+        yield [page["id"] for page in results], batch
+
+
+def to_frame(
+    columns: list[Column], response_data: Iterable[dict[str, Any]]
+) -> pd.DataFrame:
+    pd = _import_pandas()
+    ids: list[str] = []
+    values_by_name: dict[str, list[Any]] = {column.name: [] for column in columns}
+    for batch_ids, batch in iter_column_batches(columns, response_data):
+        ids.extend(batch_ids)
+        for name, values in batch.items():
+            values_by_name[name].extend(values)
+    index = pd.Index(ids, dtype="string", name="id")
+    return pd.DataFrame(
+        {
+            column.name: _to_series(pd, column, values_by_name[column.name], index)
+            for column in columns
+        },
+        index=index,
+    )
+
+
+def get_arrow_schema(columns: list[Column]) -> pa.Schema:
+    """the schema of the record batches, with "id" as the first field."""
+    pa = _import_pyarrow()
+    type_by_kind = {
+        "number": pa.float64(),
+        "boolean": pa.bool_(),
+        "datetime": pa.timestamp("us", tz=_get_tz_offset()),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "string": pa.string(),
+        "list": pa.list_(pa.string()),
+        "object": pa.string(),
+    }
+    return pa.schema(
+        [
+            pa.field("id", pa.string(), nullable=False),
+            *(pa.field(column.name, type_by_kind[column.kind]) for column in columns),
+        ]
+    )
+
+
+def iter_record_batches(
+    columns: list[Column], response_data: Iterable[dict[str, Any]]
+) -> Iterator[pa.RecordBatch]:
+    """yield a record batch for each response page, with the schema of `get_arrow_schema()`.
+    "object" columns (formula, rollup, ...) are stored as JSON strings."""
+    pa = _import_pyarrow()
+    schema = get_arrow_schema(columns)
+    for ids, batch in iter_column_batches(columns, response_data):
+        arrays = [pa.array(ids, pa.string())]
+        for column in columns:
+            values = batch[column.name]
+            match column.kind:
+                case "datetime":
+                    values = [_to_datetime(value) for value in values]
+                case "object":
+                    values = [
+                        None if value is None else json.dumps(value, ensure_ascii=False)
+                        for value in values
+                    ]
+            arrays.append(pa.array(values, schema.field(column.name).type))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(
+    columns: list[Column],
+    response_data: Iterable[dict[str, Any]],
+    path: str | Path,
+    **writer_kwargs: Any,
+) -> int:
+    """write a row group for each response page. return the number of rows."""
+    import pyarrow.parquet as pq
+
+    num_rows = 0
+    with pq.ParquetWriter(path, get_arrow_schema(columns), **writer_kwargs) as writer:
+        for record_batch in iter_record_batches(columns, response_data):
+            writer.write_batch(record_batch)
+            num_rows += record_batch.num_rows
+    return num_rows
+
+
+def cache_pages(response_data: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """pass through the response data, setting the pages as the real data on the way."""
+    from notion_df.request.database import QueryDatabase
+
+    for data in response_data:
+        for _ in QueryDatabase.parse_response_data(data):
+            pass
+        yield data
+
+
+writable_typenames = {
+    "checkbox",
+    "date",
+    "email",
+    "multi_select",
+    "number",
+    "people",
+    "phone_number",
+    "relation",
+    "rich_text",
+    "select",
+    "status",
+    "title",
+    "url",
+}
+
+
+@dataclass
+class WriteBackResult:
+    page: Page
+    prop_names: list[str] = field(default_factory=list)
+    """the names of the changed properties."""
+    error: Optional[Exception] = None
+
+    @property
+    def updated(self) -> bool:
+        return bool(self.prop_names) and self.error is None
+
+
+def get_page_diffs(
+    frame: pd.DataFrame, database: Database
+) -> list[tuple[Page, PageProperties | Exception]]:
+    """compare each row with the real data of the page, which is retrieved if missing.
+    return the changed properties of each row, or the error if the row cannot be written back."""
+    from notion_df.entity import Page
+
+    pd = _import_pandas()
+    properties = database.properties
+    columns = [column for column in get_columns(properties) if column.name in frame]
+    pages = Page.retrieve_many(Page(page_id) for page_id in frame.index)
+    original_frame = to_frame(
+        columns, [{"results": [page.local_data.raw for page in pages]}]
+    )
+
+    diffs: list[tuple[Page, PageProperties | Exception]] = []
+    for page, (_, row), (_, original_row) in zip(
+        pages, frame.iterrows(), original_frame.iterrows()
+    ):
+        page_properties = PageProperties()
+        try:
+            for column in columns:
+                value = row[column.name]
+                if _equals(pd, value, original_row[column.name]):
+                    continue
+                if column.typename not in writable_typenames:
+                    raise ValueError(f"{column.typename} property is read-only", column)
+                prop_serialized = page.local_data.raw["properties"].get(column.name)
+                page_properties[properties._get_prop(column.name)] = _to_page_value(
+                    pd, column, value, prop_serialized
+                )
+        except ValueError as e:
+            diffs.append((page, e))
+        else:
+            diffs.append((page, page_properties))
+    return diffs
+
+
+def write_back(
+    frame: pd.DataFrame, database: Database, max_workers: int = 4
+) -> list[WriteBackResult]:
+    """update the pages with the changed properties only. return the result of each row.
+    the requests are sent concurrently, under the process-wide rate limit."""
+    diffs = get_page_diffs(frame, database)
+
+    def update(page: Page, page_properties: PageProperties) -> WriteBackResult:
+        result = WriteBackResult(page, [prop.name for prop in page_properties])
+        try:
+            page.update(page_properties)
+        except Exception as e:
+            result.error = e
+        return result
+
+    futures = {}
+    results: list[WriteBackResult] = []
+    with ThreadPoolExecutor(max_workers, thread_name_prefix="write_back") as executor:
+        for i, (page, diff) in enumerate(diffs):
+            if isinstance(diff, Exception):
+                results.append(WriteBackResult(page, error=diff))
+            elif not diff:
+                results.append(WriteBackResult(page))
+            else:
+                results.append(WriteBackResult(page))
+                futures[i] = executor.submit(update, page, diff)
+    for i, future in futures.items():
+        results[i] = future.result()
+    logger.info(
+        "write_back({}): {} updated, {} failed",
+        database,
+        sum(result.updated for result in results),
+        sum(result.error is not None for result in results),
+    )
+    return results
+
+
+def _equals(pd: Any, value: Any, original_value: Any) -> bool:
+    if isinstance(value, (list, tuple)) or isinstance(original_value, (list, tuple)):
+        return list(value or ()) == list(original_value or ())
+    value_is_na = pd.isna(value)
+    original_value_is_na = pd.isna(original_value)
+    if value_is_na or original_value_is_na:
+        return value_is_na and original_value_is_na
+    return value == original_value
+
+
+def _to_page_value(
+    pd: Any, column: Column, value: Any, prop_serialized: Optional[dict[str, Any]]
+) -> Any:
+    from notion_df.entity import Page
+
+    if not isinstance(value, (list, tuple)) and pd.isna(value):
+        value = None
+    match column.typename:
+        case "title" | "rich_text":
+            return RichText.from_plain_text(value)
+        case "number":
+            return None if value is None else float(value)
+        case "checkbox":
+            return bool(value)
+        case "email" | "phone_number" | "url":
+            return None if value is None else str(value)
+        case "select" | "status":
+            return None if value is None else SelectOption(str(value))
+        case "multi_select":
+            return [SelectOption(str(name)) for name in value or ()]
+        case "relation":
+            return RelationPagePropertyValue(Page(page_id) for page_id in value or ())
+        case "people":
+            return [PartialUser(UUID(str(user_id))) for user_id in value or ()]
+        case "date":
+            if value is None:
+                return None
+            timestamp = pd.Timestamp(value)
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.tz_localize(my_tz)
+            start = timestamp.tz_convert(my_tz).to_pydatetime()
+            original_value = prop_serialized and prop_serialized.get("date")
+            if start.time() == time() and (
+                not original_value or len(original_value["start"]) == 10
+            ):
+                start = start.date()
+            # only the start is in the frame, so the end is kept.
+            end = original_value and original_value.get("end")
+            return DateRange(start, end and deserialize_datetime(end))
+    raise ValueError(f"{column.typename} property is read-only", column)
+
+
+def _to_series(
+    pd: Any, column: Column, values: list[Any], index: pd.Index
+) -> pd.Series:
+    match column.kind:
+        case "number":
+            return pd.Series(values, index=index, dtype="Float64")
+        case "boolean":
+            return pd.Series(values, index=index, dtype="boolean")
+        case "string":
+            return pd.Series(values, index=index, dtype="string")
+        case "datetime":
+            return pd.Series(_parse_datetimes(pd, values), index=index)
+        case "category":
+            series = pd.Series(values, index=index, dtype="category")
+            extra_categories = [
+                category
+                for category in series.cat.categories
+                if category not in column.categories
+            ]
+            return series.cat.set_categories([*column.categories, *extra_categories])
+        case _:
+            return pd.Series(values, index=index, dtype=object)
+
+
+def _parse_datetimes(pd: Any, values: list[Optional[str]]) -> Any:
+    # dates without time are local dates.
+    local_offset = _get_tz_offset()
+    values = [
+        f"{value}T00:00:00{local_offset}"
+        if value is not None and len(value) == 10
+        else value
+        for value in values
+    ]
+    return pd.to_datetime(values, utc=True, format="ISO8601").tz_convert(my_tz)
+
+
+def _to_datetime(value: Optional[str]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(dt := deserialize_datetime(value), datetime):
+        return dt
+    return datetime.combine(dt, time(), my_tz)
+
+
+def _get_tz_offset() -> str:
+    return my_tz.tzname(None).removeprefix("UTC") or "+00:00"
+
+
+def _import_pandas() -> Any:
+    try:
+        import pandas
+    except ImportError as e:
+        raise ImportError(
+            "pandas is required, install with `pip install notion_df[frame]`"
+        ) from e
+    return pandas
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required, install with `pip install notion_df[frame]`"
+        ) from e
+    return pyarrow
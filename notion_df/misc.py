@@ -53,7 +53,7 @@ class PartialParent(DualSerializable):
                 return Workspace()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Annotations(DualSerializable):
     bold: bool = False
     italic: bool = False
@@ -120,7 +120,7 @@ class Emoji(Icon):
         return cls(raw["emoji"])
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DateRange(DualSerializable):
     """timezone option is disabled. you should handle timezone inside 'start' and 'end'."""
 
@@ -136,8 +136,8 @@ class DateRange(DualSerializable):
     def __init__(
         self, start: date | datetime | None = None, end: date | datetime | None = None
     ):
-        self.start = start
-        self.end = end
+        object.__setattr__(self, "start", start)
+        object.__setattr__(self, "end", end)
 
     def __iter__(self) -> Iterator[date | datetime]:
         return iter([self.start, self.end])
@@ -150,7 +150,7 @@ class DateRange(DualSerializable):
         return cls._deserialize_from_dict(raw)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SelectOption(DualSerializable):
     """can be equalized with str to match the name or id."""
 
@@ -182,6 +182,10 @@ class SelectOption(DualSerializable):
             return self.name == other or self.id == other
         return False
 
+    def __hash__(self) -> int:
+        # the equal options always have the same name
+        return hash(self.name)
+
 
 class SelectOptions(list[SelectOption]):
     def __init__(self, select_options: list[SelectOption]):
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Optional
 from uuid import UUID
 
 from notion_df.contents import BlockContents, serialize_block_contents_list
@@ -15,15 +18,24 @@ from notion_df.core.request_core import (
 )
 from notion_df.data import BlockData
 
+MAX_CHILDREN_PER_REQUEST = 100
+"""the maximum length of each children array in a request."""
+MAX_NESTING_DEPTH = 2
+"""the levels of nested children which can be sent in a single request."""
+MAX_BLOCKS_PER_REQUEST = 1000
+"""the maximum number of blocks in a request, including the nested ones."""
+
 
 @dataclass
 class AppendBlockChildren(SingleRequestBuilder[list[BlockData]]):
-    """https://developers.notion.com/reference/patch-block-children"""
+    """https://developers.notion.com/reference/patch-block-children
+
+    a single request, which accepts at most 100 children, and their nested children up to 2 levels.
+    use `append_block_children()` to append more than that."""
 
     data_type = list[BlockData]
     id: UUID
     children: list[BlockContents]
-    # TODO: split to multiple requests when len(children) > 100
 
     def get_settings(self) -> RequestSettings:
         return RequestSettings(
@@ -41,6 +53,154 @@ class AppendBlockChildren(SingleRequestBuilder[list[BlockData]]):
         return data_element_list
 
 
+def get_nested_children(contents: BlockContents) -> list[BlockContents]:
+    """the children given to the block contents, which are serialized inline if they fit in the request."""
+    return getattr(contents, "children", None) or []
+
+
+def _get_inline_size(contents: BlockContents, depth: int = 0) -> Optional[int]:
+    """the number of blocks of the contents and its nested children, if all of them can be sent inline."""
+    if not (nested_children := get_nested_children(contents)):
+        return 1
+    if depth >= MAX_NESTING_DEPTH or len(nested_children) > MAX_CHILDREN_PER_REQUEST:
+        return None
+    size = 1
+    for child in nested_children:
+        if (child_size := _get_inline_size(child, depth + 1)) is None:
+            return None
+        size += child_size
+    return size if size <= MAX_BLOCKS_PER_REQUEST else None
+
+
+_Chunk = list[tuple[BlockContents, list[BlockContents]]]
+"""the children of a request, each with its nested children to be appended after the request."""
+
+
+def _chunk(children: list[BlockContents]) -> list[_Chunk]:
+    """split the children into requests, in order.
+    the nested children of a block are sent inline as a whole, or appended to the created block as a whole."""
+    chunks: list[_Chunk] = []
+    chunk: _Chunk = []
+    chunk_size = 0
+    for contents in children:
+        if (size := _get_inline_size(contents)) is None:
+            deferred_children = get_nested_children(contents)
+            contents = copy.copy(contents)
+            setattr(contents, "children", None)
+            size = 1
+        else:
+            deferred_children = []
+        if chunk and (
+            len(chunk) >= MAX_CHILDREN_PER_REQUEST
+            or chunk_size + size > MAX_BLOCKS_PER_REQUEST
+        ):
+            chunks.append(chunk)
+            chunk, chunk_size = [], 0
+        chunk.append((contents, deferred_children))
+        chunk_size += size
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def count_inline_children(children: list[BlockContents]) -> int:
+    """the number of the leading children which can be sent in a single request, with all their nested children."""
+    if not (chunks := _chunk(children)):
+        return 0
+    count = 0
+    for _, deferred_children in chunks[0]:
+        if deferred_children:
+            break
+        count += 1
+    return count
+
+
+def append_block_children(
+    token: str, id: UUID, children: list[BlockContents], max_workers: int = 4
+) -> list[BlockData]:
+    """append any number of children to the block, in requests of at most 100 children.
+
+    the nested children of each block contents (its `children`) are sent inline if they fit in the request.
+    otherwise, they are appended to the created block as soon as its chunk is done,
+    concurrently with the remaining chunks of the other parents.
+    the chunks of the same parent are sent one after another to keep the order.
+    returns the data of the top-level children, in order."""
+    if not children:
+        return []
+
+    # (parent id, chunks left to append), one for each parent with pending children
+    queue_dict: dict[UUID, list[_Chunk]] = {}
+    result: list[BlockData] = []
+
+    def submit_next(parent_id: UUID) -> None:
+        chunk = queue_dict[parent_id].pop(0)
+        if not queue_dict[parent_id]:
+            del queue_dict[parent_id]
+        request = AppendBlockChildren(token, parent_id, [c for c, _ in chunk])
+        pending[executor.submit(request.execute)] = (parent_id, chunk)
+
+    with ThreadPoolExecutor(
+        max_workers, thread_name_prefix="append_block_children"
+    ) as executor:
+        pending: dict[Future[list[BlockData]], tuple[UUID, _Chunk]] = {}
+        queue_dict[id] = _chunk(children)
+        submit_next(id)
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parent_id, chunk = pending.pop(future)
+                    block_data_list = future.result()
+                    if parent_id == id:
+                        result.extend(block_data_list)
+                    if parent_id in queue_dict:
+                        submit_next(parent_id)
+                    for (_, deferred_children), block_data in zip(
+                        chunk, block_data_list
+                    ):
+                        if deferred_children:
+                            queue_dict[block_data.id] = _chunk(deferred_children)
+                            submit_next(block_data.id)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    return result
+
+
+async def append_block_children_async(
+    token: str,
+    id: UUID,
+    children: list[BlockContents],
+) -> list[BlockData]:
+    """the async version of `append_block_children()`.
+    if a request fails, the pending appends of the nested children are cancelled."""
+    result: list[BlockData] = []
+    nested_tasks: list[asyncio.Future[list[BlockData]]] = []
+    try:
+        for chunk in _chunk(children):
+            block_data_list = await AppendBlockChildren(
+                token, id, [c for c, _ in chunk]
+            ).execute_async()
+            result.extend(block_data_list)
+            for (_, deferred_children), block_data in zip(chunk, block_data_list):
+                if deferred_children:
+                    nested_tasks.append(
+                        asyncio.ensure_future(
+                            append_block_children_async(
+                                token, block_data.id, deferred_children
+                            )
+                        )
+                    )
+        await asyncio.gather(*nested_tasks)
+    except BaseException:
+        for task in nested_tasks:
+            task.cancel()
+        await asyncio.gather(*nested_tasks, return_exceptions=True)
+        raise
+    return result
+
+
 @dataclass
 class RetrieveBlock(SingleRequestBuilder[BlockData]):
     """https://developers.notion.com/reference/retrieve-a-block"""
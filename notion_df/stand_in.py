@@ -0,0 +1,468 @@
+"""a local stand-in of Notion API, to run benchmarks and load tests without api.notion.com.
+
+it replays the responses recorded by `RecordingTransport`, and serves synthetic databases of any size.
+point the library to it with `NOTION_API_BASE_URL` (or `notion_df.core.variable.api_base_url`).
+
+    python -m notion_df.stand_in --pages 10000 --latency 0.05 --rate-limit-ratio 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import PathLike
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlsplit
+from uuid import UUID, uuid4, uuid5
+
+from loguru import logger
+
+from notion_df.core.misc import repr_object
+from notion_df.core.transport import Record, ReplayTransport, get_not_found_error
+
+stage_names = ["todo", "doing", "done"]
+
+
+@dataclass
+class SyntheticDatabase:
+    """a database with `size` pages, each generated from its index on demand.
+    the properties are Name(title), Count(number), Done(checkbox), Stage(select), Due(date), and Links(relation)."""
+
+    id: UUID
+    size: int
+    edited_pages: dict[UUID, dict[str, Any]] = field(default_factory=dict, repr=False)
+
+    def get_page_id(self, index: int) -> UUID:
+        return uuid5(self.id, str(index))
+
+    def get_raw(self) -> dict[str, Any]:
+        return {
+            "object": "database",
+            "id": str(self.id),
+            "created_time": _base_time.isoformat(),
+            "last_edited_time": _base_time.isoformat(),
+            "icon": None,
+            "cover": None,
+            "url": f"https://www.notion.so/{self.id.hex}",
+            "title": _get_rich_text(f"database {self.size}"),
+            "description": [],
+            "parent": {"type": "workspace", "workspace": True},
+            "archived": False,
+            "is_inline": False,
+            "properties": {
+                "Name": {"id": "title", "name": "Name", "type": "title", "title": {}},
+                "Count": {
+                    "id": "cnt",
+                    "name": "Count",
+                    "type": "number",
+                    "number": {"format": "number"},
+                },
+                "Done": {
+                    "id": "done",
+                    "name": "Done",
+                    "type": "checkbox",
+                    "checkbox": {},
+                },
+                "Stage": {
+                    "id": "stg",
+                    "name": "Stage",
+                    "type": "select",
+                    "select": {
+                        "options": [
+                            {"id": name, "name": name, "color": "default"}
+                            for name in stage_names
+                        ]
+                    },
+                },
+                "Due": {"id": "due", "name": "Due", "type": "date", "date": {}},
+                "Links": {
+                    "id": "lnk",
+                    "name": "Links",
+                    "type": "relation",
+                    "relation": {
+                        "database_id": str(self.id),
+                        "type": "single_property",
+                        "single_property": {},
+                    },
+                },
+            },
+        }
+
+    def get_page_raw(self, index: int) -> dict[str, Any]:
+        page_id = self.get_page_id(index)
+        edited_time = _base_time + timedelta(minutes=index)
+        raw: dict[str, Any] = {
+            "object": "page",
+            "id": str(page_id),
+            "created_time": _base_time.isoformat(),
+            "last_edited_time": edited_time.isoformat(),
+            "created_by": _user,
+            "last_edited_by": _user,
+            "cover": None,
+            "icon": None,
+            "parent": {"type": "database_id", "database_id": str(self.id)},
+            "archived": False,
+            "url": f"https://www.notion.so/{page_id.hex}",
+            "properties": {
+                "Name": {
+                    "id": "title",
+                    "type": "title",
+                    "title": _get_rich_text(f"page {index}"),
+                },
+                "Count": {"id": "cnt", "type": "number", "number": index},
+                "Done": {"id": "done", "type": "checkbox", "checkbox": index % 2 == 0},
+                "Stage": {
+                    "id": "stg",
+                    "type": "select",
+                    "select": {
+                        "id": (name := stage_names[index % len(stage_names)]),
+                        "name": name,
+                        "color": "default",
+                    },
+                },
+                "Due": {
+                    "id": "due",
+                    "type": "date",
+                    "date": {
+                        "start": (_base_time + timedelta(days=index))
+                        .date()
+                        .isoformat(),
+                        "end": None,
+                        "time_zone": None,
+                    },
+                },
+                "Links": {
+                    "id": "lnk",
+                    "type": "relation",
+                    "relation": [
+                        {"id": str(self.get_page_id((index + i) % self.size))}
+                        for i in (1, 2)
+                    ],
+                    "has_more": False,
+                },
+            },
+        }
+        if (properties := self.edited_pages.get(page_id)) is not None:
+            raw["properties"].update(properties)
+        return raw
+
+    def query(self, start: int = 0, page_size: int = 100) -> dict[str, Any]:
+        """the response of a database query, from the `start`-th page."""
+        end = min(start + page_size, self.size)
+        return {
+            "object": "list",
+            "results": [self.get_page_raw(index) for index in range(start, end)],
+            "next_cursor": str(end) if end < self.size else None,
+            "has_more": end < self.size,
+            "type": "page",
+            "page": {},
+        }
+
+
+class StandInServer:
+    """a threaded HTTP server in the background, which answers the requests in the following order.
+
+    1. with `rate_limit_ratio` probability, 429 with `Retry-After` header.
+    2. the recorded response of the same request, if any.
+    3. the synthetic databases, their pages and the blocks created on them.
+    4. otherwise, 404.
+
+    each response is delayed by `latency` seconds. filters and sorts of database queries are ignored."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency: float = 0,
+        rate_limit_ratio: float = 0,
+        retry_after: float = 0.1,
+        records: Optional[str | PathLike | list[Record]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.replay: Optional[ReplayTransport] = (
+            ReplayTransport(records) if records is not None else None
+        )
+        self.database_dict: dict[UUID, SyntheticDatabase] = {}
+        self.block_children_dict: dict[UUID, list[dict[str, Any]]] = {}
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self._random = random.Random(seed)
+        self._page_index_dict: dict[UUID, tuple[SyntheticDatabase, int]] = {}
+        self._block_dict: dict[UUID, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _get_handler_cls(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def __repr__(self) -> str:
+        return repr_object(self, url=self.url)
+
+    def __enter__(self) -> StandInServer:
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """the API base URL. ex) http://127.0.0.1:8000/v1"""
+        host, port = self._httpd.server_address[:2]
+        assert isinstance(host, str)
+        return f"http://{host}:{port}/v1"
+
+    def add_database(self, size: int, id: Optional[UUID] = None) -> UUID:
+        database = SyntheticDatabase(id or uuid4(), size)
+        with self._lock:
+            self.database_dict[database.id] = database
+            for index in range(size):
+                self._page_index_dict[database.get_page_id(index)] = (database, index)
+        return database.id
+
+    def start(self) -> StandInServer:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="stand_in", daemon=True
+        )
+        self._thread.start()
+        logger.info("StandInServer.start(): {}", self.url)
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def handle(
+        self, method: str, path: str, params: Any, body: Any
+    ) -> tuple[int, Any, dict[str, str]]:
+        """return the status, the response data, and the headers."""
+        with self._lock:
+            self.request_count += 1
+            rate_limited = self._random.random() < self.rate_limit_ratio
+            if rate_limited:
+                self.rate_limited_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if rate_limited:
+            return (
+                429,
+                {
+                    "object": "error",
+                    "status": 429,
+                    "code": "rate_limited",
+                    "message": "You have been rated limited. Please try again in a few minutes.",
+                },
+                {"Retry-After": str(self.retry_after)},
+            )
+        if self.replay is not None and (
+            record := self.replay.find(method, path, params, body)
+        ):
+            return record.status, record.response, record.headers
+        try:
+            response = self._synthesize(method, path, params, body)
+        except _ValidationError as e:
+            return 400, e.get_response(), {}
+        if response is not None:
+            return 200, response, {}
+        return 404, get_not_found_error(path), {}
+
+    def _synthesize(
+        self, method: str, path: str, params: Any, body: Any
+    ) -> Optional[dict[str, Any]]:
+        match method, path.strip("/").split("/"):
+            case "GET", ["v1", "databases", database_id]:
+                if database := self._get_database(database_id):
+                    return database.get_raw()
+            case "POST", ["v1", "databases", database_id, "query"]:
+                if database := self._get_database(database_id):
+                    body = body or {}
+                    return database.query(
+                        int(body.get("start_cursor") or 0),
+                        int(body.get("page_size") or 100),
+                    )
+            case "GET", ["v1", "pages", page_id]:
+                if page := self._get_page(page_id):
+                    return page[0].get_page_raw(page[1])
+            case "PATCH", ["v1", "pages", page_id]:
+                if page := self._get_page(page_id):
+                    database, index = page
+                    with self._lock:
+                        database.edited_pages.setdefault(
+                            database.get_page_id(index), {}
+                        ).update((body or {}).get("properties", {}))
+                    return database.get_page_raw(index)
+            case "GET", ["v1", "blocks", block_id, "children"]:
+                return self._paginate(
+                    self.block_children_dict.get(_parse_id(block_id, "block_id"), []),
+                    params or {},
+                )
+            case "PATCH", ["v1", "blocks", block_id, "children"]:
+                return self._append_children(
+                    _parse_id(block_id, "block_id"), (body or {}).get("children", [])
+                )
+        return None
+
+    def _get_database(self, database_id: str) -> Optional[SyntheticDatabase]:
+        return self.database_dict.get(_parse_id(database_id, "database_id"))
+
+    def _get_page(self, page_id: str) -> Optional[tuple[SyntheticDatabase, int]]:
+        return self._page_index_dict.get(_parse_id(page_id, "page_id"))
+
+    @staticmethod
+    def _paginate(results: list[Any], params: dict[str, Any]) -> dict[str, Any]:
+        start = int(params.get("start_cursor") or 0)
+        end = min(start + int(params.get("page_size") or 100), len(results))
+        return {
+            "object": "list",
+            "results": results[start:end],
+            "next_cursor": str(end) if end < len(results) else None,
+            "has_more": end < len(results),
+            "type": "block",
+            "block": {},
+        }
+
+    def _append_children(
+        self, parent_id: UUID, children: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        now = datetime.now(timezone.utc).isoformat()
+        blocks = [
+            {
+                "object": "block",
+                "id": str(uuid4()),
+                "parent": {"type": "block_id", "block_id": str(parent_id)},
+                "created_time": now,
+                "last_edited_time": now,
+                "created_by": _user,
+                "last_edited_by": _user,
+                "has_children": False,
+                "archived": False,
+                **child,
+            }
+            for child in children
+        ]
+        with self._lock:
+            self.block_children_dict.setdefault(parent_id, []).extend(blocks)
+            if (parent := self._block_dict.get(parent_id)) is not None:
+                parent["has_children"] = True
+            for block in blocks:
+                self._block_dict[UUID(str(block["id"]))] = block
+        return self._paginate(blocks, {"page_size": len(blocks)})
+
+
+_base_time = datetime(2023, 1, 1, tzinfo=timezone.utc)
+_user = {"object": "user", "id": "00000000-0000-0000-0000-000000000000"}
+
+
+def _get_rich_text(content: str) -> list[dict[str, Any]]:
+    return [
+        {
+            "type": "text",
+            "text": {"content": content, "link": None},
+            "annotations": {
+                "bold": False,
+                "italic": False,
+                "strikethrough": False,
+                "underline": False,
+                "code": False,
+                "color": "default",
+            },
+            "plain_text": content,
+            "href": None,
+        }
+    ]
+
+
+class _ValidationError(Exception):
+    """the request is malformed, which the API responds with 400."""
+
+    def get_response(self) -> dict[str, Any]:
+        return {
+            "object": "error",
+            "status": 400,
+            "code": "validation_error",
+            "message": str(self),
+        }
+
+
+def _parse_id(id_str: str, name: str) -> UUID:
+    try:
+        return UUID(id_str)
+    except ValueError:
+        raise _ValidationError(
+            f'path failed validation: path.{name} should be a valid uuid, instead was `"{id_str}"`.'
+        ) from None
+
+
+def _get_handler_cls(server: StandInServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def _handle(self) -> None:
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query)) or None
+            if length := int(self.headers.get("Content-Length") or 0):
+                body = json.loads(self.rfile.read(length))
+            else:
+                body = None
+            status, response, headers = server.handle(
+                self.command, url.path, params, body
+            )
+            content = json.dumps(response).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.opt(lazy=True).trace("{}", lambda: format % args)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--pages", type=int, default=1000, help="the size of the synthetic database"
+    )
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0)
+    parser.add_argument("--records", help="a JSON-lines file of RecordingTransport")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        rate_limit_ratio=args.rate_limit_ratio,
+        records=args.records,
+    )
+    database_id = server.add_database(args.pages)
+    print(f"NOTION_API_BASE_URL={server.url}")
+    print(f"database_id={database_id}")
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+from uuid import UUID
+
+from loguru import logger
+
+from notion_df.core.misc import repr_object
+from notion_df.core.variable import token
+
+if TYPE_CHECKING:
+    from notion_df.data import PageData
+    from notion_df.entity import Database, Page
+    from notion_df.filter import Filter
+
+
+@dataclass
+class SyncResult:
+    added: list[Page] = field(default_factory=list)
+    """the pages which were not in the mirror."""
+    updated: list[Page] = field(default_factory=list)
+    """the pages whose data has changed since the last sync."""
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated)
+
+
+class DatabaseMirror:
+    """the local copy of the pages of a database, kept up-to-date by `sync()`.
+
+    each sync queries only the pages edited on or after the watermark, the latest `last_edited_time` seen so far.
+    the pages archived or moved out of the database are not detected, since they are not queried anymore."""
+
+    def __init__(self, database: Database):
+        self.database: Database = database
+        self.watermark: Optional[datetime] = None
+        self._page_data_dict: dict[UUID, PageData] = {}
+        self._digest_dict: dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return repr_object(
+            self,
+            database=self.database,
+            watermark=self.watermark,
+            size=len(self._page_data_dict),
+        )
+
+    def __len__(self) -> int:
+        return len(self._page_data_dict)
+
+    @property
+    def pages(self) -> list[Page]:
+        from notion_df.entity import Page
+
+        return [Page(page_id) for page_id in self._page_data_dict]
+
+    def get_page_data(self, page: Page) -> Optional[PageData]:
+        return self._page_data_dict.get(page.id)
+
+    # noinspection PyShadowingBuiltins
+    def query(self, filter: Optional[Filter] = None) -> list[Page]:
+        """query the mirrored pages with the filter evaluated locally, without any request.
+        raise LocalEvaluationError if the filter cannot be evaluated locally; use `Database.query()` instead."""
+        from notion_df.entity import Page
+
+        return [
+            Page(page_id)
+            for page_id, page_data in self._page_data_dict.items()
+            if filter is None or filter.evaluate(page_data)
+        ]
+
+    def sync(self) -> SyncResult:
+        """query the pages edited since the last sync and merge them into the mirror.
+        the first sync queries the whole database."""
+        from notion_df.entity import Page
+        from notion_df.filter import last_edited_time_filter
+        from notion_df.request.database import QueryDatabase
+        from notion_df.sort import TimestampSort
+
+        with self._lock:
+            if self.watermark is None:
+                filter = None
+            else:
+                # the precision of last_edited_time is a minute, so the pages edited within
+                # the same minute are queried again, and compared by their contents.
+                filter = last_edited_time_filter.on_or_after(self.watermark)
+            sort = [TimestampSort("last_edited_time", "ascending")]
+
+            result = SyncResult()
+            for page_data in QueryDatabase(
+                token, self.database.id, filter, sort
+            ).execute():
+                digest = hash(json.dumps(page_data.raw["properties"], sort_keys=True))
+                if page_data.id not in self._page_data_dict:
+                    result.added.append(Page(page_data.id))
+                elif self._digest_dict[page_data.id] != digest or (
+                    page_data.last_edited_time
+                    > self._page_data_dict[page_data.id].last_edited_time
+                ):
+                    result.updated.append(Page(page_data.id))
+                self._page_data_dict[page_data.id] = page_data
+                self._digest_dict[page_data.id] = digest
+                if (
+                    self.watermark is None
+                    or page_data.last_edited_time > self.watermark
+                ):
+                    self.watermark = page_data.last_edited_time
+        logger.info(
+            "DatabaseMirror.sync({}): {} added, {} updated",
+            self.database,
+            len(result.added),
+            len(result.updated),
+        )
+        return result
+
+
+mirror_dict: dict[UUID, DatabaseMirror] = {}
+"""the mirror of each database, used by `Database.sync()`."""
+_mirror_dict_lock = threading.Lock()
+
+
+def get_mirror(database: Database) -> DatabaseMirror:
+    with _mirror_dict_lock:
+        if (mirror := mirror_dict.get(database.id)) is None:
+            mirror = mirror_dict[database.id] = DatabaseMirror(database)
+        return mirror
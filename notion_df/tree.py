@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional, Union, TYPE_CHECKING
+
+from loguru import logger
+
+from notion_df.core.misc import repr_object
+from notion_df.core.variable import token
+
+if TYPE_CHECKING:
+    from notion_df.data import BlockData
+    from notion_df.entity import Block, Page
+
+
+@dataclass(eq=False)
+class BlockTreeNode:
+    """a block with its children, as retrieved by `retrieve_descendants()`.
+    the root node holds the block or page which the retrieval started from, without `data`."""
+
+    block: Union[Block, Page]
+    data: Optional[BlockData]
+    parent: Optional[BlockTreeNode] = field(default=None, repr=False)
+    children: list[BlockTreeNode] = field(default_factory=list, repr=False)
+
+    def __repr__(self) -> str:
+        return repr_object(
+            self, block=self.block, depth=self.depth, children=len(self.children)
+        )
+
+    @property
+    def depth(self) -> int:
+        """0 for the root, 1 for its children, and so on."""
+        depth = 0
+        node: Optional[BlockTreeNode] = self.parent
+        while node is not None:
+            depth += 1
+            node = node.parent
+        return depth
+
+    def walk(self) -> Iterator[BlockTreeNode]:
+        """iterate the descendants in the document order, excluding the node itself."""
+        for child in self.children:
+            yield child
+            yield from child.walk()
+
+
+def retrieve_descendants(
+    root: Union[Block, Page],
+    max_depth: Optional[int] = None,
+    max_workers: int = 4,
+    callback: Optional[Callable[[BlockTreeNode], None]] = None,
+    include_child_pages: bool = False,
+) -> BlockTreeNode:
+    """retrieve the whole block tree under the root, level by level, with the children of
+    different blocks retrieved concurrently. the requests go through the process-wide rate limiter.
+
+    - max_depth: the deepest level to retrieve. the children of the root are at level 1. None means no limit.
+    - callback: called with each node as soon as it is retrieved, on the calling thread.
+      its children are not retrieved yet at that time.
+    - include_child_pages: whether to retrieve the contents of child pages and child databases."""
+    from notion_df.contents import ChildDatabaseBlockContents, ChildPageBlockContents
+    from notion_df.entity import Block
+    from notion_df.request.block import RetrieveBlockChildren
+
+    def retrieve_children(node: BlockTreeNode) -> list[BlockData]:
+        return list(RetrieveBlockChildren(token, node.block.id).execute())
+
+    def should_expand(node: BlockTreeNode, depth: int) -> bool:
+        if max_depth is not None and depth >= max_depth:
+            return False
+        if node.data is None:
+            return True
+        if not include_child_pages and isinstance(
+            node.data.contents, (ChildPageBlockContents, ChildDatabaseBlockContents)
+        ):
+            return False
+        return bool(node.data.has_children)
+
+    root_node = BlockTreeNode(root, None)
+    count = 0
+    with ThreadPoolExecutor(
+        max_workers, thread_name_prefix="retrieve_descendants"
+    ) as executor:
+        pending: dict[Future[list[BlockData]], tuple[BlockTreeNode, int]] = {
+            executor.submit(retrieve_children, root_node): (root_node, 0)
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, depth = pending.pop(future)
+                    for block_data in future.result():
+                        child = BlockTreeNode(Block(block_data.id), block_data, node)
+                        node.children.append(child)
+                        count += 1
+                        if callback is not None:
+                            callback(child)
+                        if should_expand(child, depth + 1):
+                            pending[executor.submit(retrieve_children, child)] = (
+                                child,
+                                depth + 1,
+                            )
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+    logger.info("retrieve_descendants({}): {} blocks", root, count)
+    return root_node
@@ -9,7 +9,7 @@ from typing_extensions import Self
 from notion_df.core.serialization import DualSerializable
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PartialUser(DualSerializable):  # TODO: User
     id: UUID
 
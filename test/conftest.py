@@ -0,0 +1,126 @@
+"""the shared factories of raw Notion API objects, and the shared fixtures."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Optional
+from uuid import UUID, uuid4
+
+import pytest
+
+
+def get_page_raw(
+    page_id: Optional[UUID | str] = None,
+    properties: Optional[dict[str, dict[str, Any]]] = None,
+    *,
+    database_id: Optional[UUID | str] = None,
+    last_edited_time: str = "2023-01-02T00:00:00.000Z",
+) -> dict[str, Any]:
+    """a page in a database. `properties` are the raw page property values by name."""
+    user = {"object": "user", "id": str(uuid4())}
+    return {
+        "object": "page",
+        "id": str(page_id or uuid4()),
+        "created_time": "2023-01-01T00:00:00.000Z",
+        "last_edited_time": last_edited_time,
+        "created_by": user,
+        "last_edited_by": user,
+        "cover": None,
+        "icon": None,
+        "parent": {"type": "database_id", "database_id": str(database_id or uuid4())},
+        "archived": False,
+        "url": "https://www.notion.so/page",
+        "properties": properties or {},
+    }
+
+
+def get_title_raw(text: str) -> dict[str, Any]:
+    """the raw value of a title property."""
+    return {
+        "id": "title",
+        "type": "title",
+        "title": [
+            {
+                "type": "text",
+                "text": {"content": text, "link": None},
+                "annotations": {
+                    "bold": False,
+                    "italic": False,
+                    "strikethrough": False,
+                    "underline": False,
+                    "code": False,
+                    "color": "default",
+                },
+                "plain_text": text,
+                "href": None,
+            }
+        ],
+    }
+
+
+def get_block_raw(
+    block_id: Optional[UUID | str] = None,
+    parent_id: Optional[UUID | str] = None,
+    has_children: bool = False,
+) -> dict[str, Any]:
+    """an empty paragraph block."""
+    user = {"object": "user", "id": str(uuid4())}
+    return {
+        "object": "block",
+        "id": str(block_id or uuid4()),
+        "parent": {"type": "block_id", "block_id": str(parent_id or uuid4())},
+        "created_time": "2023-01-01T00:00:00.000Z",
+        "last_edited_time": "2023-01-01T00:00:00.000Z",
+        "created_by": user,
+        "last_edited_by": user,
+        "has_children": has_children,
+        "archived": False,
+        "type": "paragraph",
+        "paragraph": {"rich_text": [], "color": "default"},
+    }
+
+
+class FakeExecute:
+    """replace `execute()` of request builders, recording the requests from every thread."""
+
+    def __init__(self, monkeypatch: pytest.MonkeyPatch):
+        self.requests: list[Any] = []
+        self._lock = threading.Lock()
+        self._monkeypatch = monkeypatch
+
+    def patch(self, builder_cls: type, respond: Callable[[Any], Any]) -> None:
+        """`respond` takes the request and returns what `execute()` returns."""
+
+        def execute(request, *args, **kwargs):
+            with self._lock:
+                self.requests.append(request)
+            return respond(request)
+
+        self._monkeypatch.setattr(builder_cls, "execute", execute)
+
+    @property
+    def requested_ids(self) -> list[UUID]:
+        with self._lock:
+            return [request.id for request in self.requests]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+
+@pytest.fixture
+def fake_execute(monkeypatch) -> FakeExecute:
+    return FakeExecute(monkeypatch)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """a local stand-in of the Notion API, which every request is sent to, without throttling."""
+    from notion_df.core import variable
+    from notion_df.core.throttle import rate_limiter
+    from notion_df.stand_in import StandInServer
+
+    monkeypatch.setattr(rate_limiter, "rate", None)
+    with StandInServer(seed=0) as server:
+        monkeypatch.setattr(variable, "api_base_url", server.url)
+        yield server
@@ -0,0 +1,182 @@
+import time
+from dataclasses import replace
+from types import SimpleNamespace
+from uuid import uuid4
+
+from notion_df.core import data_core
+from notion_df.core.cache import (
+    DictCache,
+    LRUCache,
+    QueryCache,
+    SQLiteCache,
+    estimate_size,
+)
+from notion_df.core.data_core import set_cache_backend
+from notion_df.data import PageData
+from notion_df.entity import Database
+from notion_df.filter import last_edited_time_filter
+from notion_df.request.database import QueryDatabase
+from test.conftest import get_page_raw
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3
+    assert list(cache) == ["a", "c"]
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert (stats.size, stats.hits, stats.misses, stats.evictions) == (2, 1, 1, 1)
+
+
+def test_lru_cache_max_bytes():
+    value = {"content": "x" * 100}
+    cache = LRUCache(max_bytes=estimate_size(value) * 2)
+    for key in range(5):
+        cache[key] = value
+    assert list(cache) == [3, 4]
+    assert cache.stats().nbytes == estimate_size(value) * 2
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(ttl=0.01)
+    cache["a"] = 1
+    assert "a" in cache
+    time.sleep(0.02)
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert cache.stats().evictions == 1
+
+
+def test_lru_cache_configure():
+    cache = LRUCache(maxsize=2, max_bytes=1000)
+    cache.configure(ttl=60)
+    assert (cache.maxsize, cache.max_bytes, cache.ttl) == (2, 1000, 60)
+    for key in range(3):
+        cache[key] = key
+    assert list(cache) == [1, 2]
+
+    cache.configure(maxsize=None)
+    assert (cache.maxsize, cache.max_bytes, cache.ttl) == (None, 1000, 60)
+
+
+def test_set_cache_backend():
+    key = (object, uuid4())
+    data_core.real_data_dict[key] = "data"
+    try:
+        set_cache_backend(real=LRUCache(maxsize=100))
+        assert data_core.real_data_dict[key] == "data"
+    finally:
+        del data_core.real_data_dict[key]
+        set_cache_backend(real=DictCache())
+
+
+def test_sqlite_cache(tmp_path):
+    database_id = str(uuid4())
+    data = PageData.deserialize(
+        get_page_raw(
+            properties={"num": {"id": "a", "type": "number", "number": 3}},
+            database_id=database_id,
+        )
+    )
+    cache = SQLiteCache(tmp_path / "cache.db")
+    cache[data._pk] = data
+    cache.close()
+
+    cache = SQLiteCache(tmp_path / "cache.db")
+    assert len(cache) == 1
+    assert cache.get_timestamp(data._pk) == data.timestamp
+    rehydrated = cache[data._pk]
+    assert rehydrated.raw == data.raw
+    assert rehydrated.properties == data.properties
+    assert rehydrated.timestamp == data.timestamp
+    assert cache[data._pk] is rehydrated
+
+    cache.max_age = -1
+    assert cache.get(data._pk) is None
+
+
+def test_sqlite_cache_batch(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", batch_size=2)
+    reader = SQLiteCache(tmp_path / "cache.db")
+    raw = get_page_raw()
+    raw["parent"] = {"type": "workspace", "workspace": True}
+    workspace_page = PageData.deserialize(raw)
+    cache[workspace_page._pk] = workspace_page
+    assert len(reader) == 0
+    data = PageData.deserialize(get_page_raw())
+    cache[data._pk] = data
+    assert len(reader) == 2
+
+    del cache[data._pk]
+    assert len(reader) == 2
+    cache.flush()
+    assert len(reader) == 1
+    (parent_id,) = reader._connection.execute(
+        "SELECT parent_id FROM entity_data"
+    ).fetchone()
+    assert parent_id is None
+
+
+def test_sqlite_cache_refresh(tmp_path, monkeypatch):
+    database_id = uuid4()
+    page_id = uuid4()
+    filters = []
+    responses = [
+        [get_page_raw(page_id, database_id=database_id, last_edited_time=time)]
+        for time in ("2023-01-02T00:00:00.000Z", "2023-01-03T00:00:00.000Z")
+    ]
+
+    def execute_raw(request, *_):
+        filters.append(request.filter)
+        return iter([{"results": responses.pop(0), "has_more": False}])
+
+    monkeypatch.setattr(QueryDatabase, "execute_raw", execute_raw)
+    cache = SQLiteCache(tmp_path / "cache.db", max_age=60)
+    assert len(cache.refresh(Database(database_id))) == 1
+    watermark = cache.get_watermark(database_id)
+    assert watermark is not None and watermark.second == 0
+
+    # stored later, with a later last_edited_time, and expired since
+    other_data = replace(
+        PageData.deserialize(
+            get_page_raw(
+                database_id=database_id, last_edited_time="2023-01-05T00:00:00.000Z"
+            )
+        ),
+        timestamp=int(time.time()) - 120,
+    )
+    cache[other_data._pk] = other_data
+    assert other_data._pk not in cache
+
+    assert len(cache.refresh(Database(database_id))) == 1
+    assert filters == [None, last_edited_time_filter.on_or_after(watermark)]
+    assert (
+        cache[PageData, page_id].raw["last_edited_time"] == "2023-01-03T00:00:00.000Z"
+    )
+    assert other_data._pk in cache
+    assert len(cache) == 2
+
+
+def test_query_cache():
+    cache = QueryCache()
+    database_id = uuid4()
+    page_ids = [uuid4(), uuid4()]
+    pages = [SimpleNamespace(id=page_id) for page_id in page_ids]
+    assert list(cache.record(database_id, {}, iter(pages))) == pages
+    assert cache.get(database_id, {}) is None
+
+    cache.configure(ttl=60)
+    recorded = cache.record(database_id, {"filter": 1}, iter(pages))
+    next(recorded)
+    assert cache.get(database_id, {"filter": 1}) is None
+    list(recorded)
+    assert cache.get(database_id, {"filter": 1}) == page_ids
+    assert cache.get(database_id, {"filter": 2}) is None
+
+    cache.invalidate(database_id)
+    assert cache.get(database_id, {"filter": 1}) is None
+    assert cache.stats().hits == 1
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 
-from notion_df.core.collection import coalesce_dataclass, Paginator
+import pytest
+
+from notion_df.core.collection import coalesce_dataclass, Paginator, prefetch
 
 
 def test_paginator():
@@ -19,5 +21,20 @@ def test_coalesce_dataclass():
 
     instance1 = ExampleDataClass(field1=1, field2=None, field3=2.5)
     instance2 = ExampleDataClass(field1=None, field2="Hello", field3=None)
-    coalesce_dataclass(instance1, instance2)
-    assert instance1 == ExampleDataClass(field1=1, field2="Hello", field3=2.5)
+    coalesced = coalesce_dataclass(instance1, instance2)
+    assert coalesced == ExampleDataClass(field1=1, field2="Hello", field3=2.5)
+    assert instance1 == ExampleDataClass(field1=1, field2=None, field3=2.5)
+    assert coalesce_dataclass(coalesced, instance2) is coalesced
+
+
+def test_prefetch():
+    assert list(prefetch(iter(range(10)), 3)) == list(range(10))
+
+    def fail():
+        yield 1
+        raise ValueError
+
+    it = prefetch(fail(), 1)
+    assert next(it) == 1
+    with pytest.raises(ValueError):
+        next(it)
@@ -0,0 +1,49 @@
+from dataclasses import FrozenInstanceError, replace
+from uuid import uuid4
+
+import pytest
+
+from notion_df.core import data_core
+from notion_df.core.data_core import EntityData
+from notion_df.data import PageData
+from notion_df.misc import Annotations, DateRange, SelectOption
+from notion_df.stand_in import SyntheticDatabase
+from notion_df.user import PartialUser
+
+
+def test_entity_data_frozen():
+    raw = SyntheticDatabase(uuid4(), 1).get_page_raw(0)
+    data = EntityData.deserialize(raw)
+    assert type(data) is PageData
+    assert data.raw is raw
+    assert not hasattr(data, "__dict__")
+    assert not hasattr(data.created_by, "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        data.archived = True  # type: ignore
+    with pytest.raises(FrozenInstanceError):
+        data.created_by.id = uuid4()  # type: ignore
+
+
+def test_entity_data_add_preview(monkeypatch):
+    monkeypatch.setattr(data_core, "preview_data_dict", data_core.DictCache())
+    data = PageData.deserialize(SyntheticDatabase(uuid4(), 1).get_page_raw(0))
+    data.add_preview()
+    partial_data = replace(data, url=None)
+    preview = partial_data.add_preview()
+    assert preview.url == data.url
+    assert preview.raw is data.raw
+    assert partial_data.url is None
+    assert data_core.preview_data_dict[data._pk] is preview
+
+
+def test_value_objects():
+    for value in (Annotations(), DateRange(None, None), PartialUser(uuid4())):
+        assert not hasattr(value, "__dict__")
+        assert value == replace(value)
+        assert hash(value) == hash(replace(value))
+    with pytest.raises(FrozenInstanceError):
+        Annotations().bold = True  # type: ignore
+
+    option = SelectOption.deserialize({"name": "a", "id": "1", "color": "red"})
+    assert option == SelectOption("a") == "a"
+    assert {option} == {SelectOption("a")}
@@ -0,0 +1,30 @@
+import time
+from uuid import uuid4
+
+from notion_df.data import PageData
+from notion_df.entity import Page
+from notion_df.request.page import RetrievePage
+from test.conftest import get_page_raw
+
+
+def test_retrieve_many(fake_execute):
+    fake_execute.patch(
+        RetrievePage,
+        lambda request: PageData.deserialize(get_page_raw(request.id)).set_real(),
+    )
+    cached, a, b = (Page(uuid4()) for _ in range(3))
+    RetrievePage("", cached.id).execute()
+    fake_execute.clear()
+
+    pages = Page.retrieve_many([a, cached, b, a])
+    assert pages == [a, cached, b, a]
+    assert sorted(fake_execute.requested_ids) == sorted([a.id, b.id])
+    assert all(page.local_data for page in pages)
+
+    fake_execute.clear()
+    assert Page.retrieve_many([a, b]) == [a, b]
+    assert fake_execute.requested_ids == []
+
+    time.sleep(0.01)
+    Page.retrieve_many([a], max_age=0)
+    assert fake_execute.requested_ids == [a.id]
@@ -0,0 +1,50 @@
+from uuid import uuid4
+
+from notion_df.core.metrics import MetricsCollector, get_percentile, get_route
+from notion_df.entity import Database
+
+
+def test_get_route():
+    page_id = uuid4()
+    assert get_route(f"databases/{page_id}/query") == "databases/{id}/query"
+    assert get_route(f"pages/{page_id.hex}") == "pages/{id}"
+    assert (
+        get_route(f"pages/{page_id}/properties/a%3Db")
+        == "pages/{id}/properties/{property_id}"
+    )
+    assert get_route("search") == "search"
+
+
+def test_get_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert get_percentile(values, 50) == 50
+    assert get_percentile(values, 95) == 95
+    assert get_percentile(values, 99) == 99
+    assert get_percentile([1.0], 99) == 1
+    assert get_percentile([], 50) == 0
+
+
+def test_metrics_collector(server):
+    database = Database(server.add_database(300))
+    collector = MetricsCollector().install()
+    try:
+        server.rate_limit_ratio = 0.3
+        assert len(list(database.query())) == 300
+        database.retrieve()
+    finally:
+        collector.uninstall()
+
+    route_stats = {stats.key: stats for stats in collector.by_route()}
+    query_stats = route_stats["databases/{id}/query"]
+    assert query_stats.count == 3
+    assert query_stats.errors == 0
+    assert query_stats.p50 <= query_stats.p95 <= query_stats.p99 <= query_stats.max
+    assert query_stats.response_size > 0
+    assert query_stats.parse_time > 0
+    assert route_stats["databases/{id}"].count == 1
+    assert sum(stats.retries for stats in route_stats.values()) > 0
+
+    builder_stats = {stats.key: stats for stats in collector.by_builder()}
+    assert builder_stats["QueryDatabase"].count == 3
+    assert builder_stats["RetrieveDatabase"].parse_time > 0
+    assert "databases/{id}/query" in collector.format()
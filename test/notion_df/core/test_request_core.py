@@ -0,0 +1,177 @@
+import json
+from typing import Any
+
+import pytest
+import requests
+import tenacity
+
+from notion_df.core import metrics, request_core, transport, variable
+from notion_df.core.request_core import (
+    RequestError,
+    RetryPolicy,
+    Request,
+    Method,
+    Version,
+)
+from notion_df.core.throttle import rate_limiter
+from notion_df.core.transport import Transport
+from notion_df.request.database import QueryDatabase
+
+
+def get_response(status_code: int, headers: dict[str, str]) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers)
+    if status_code < 400:
+        content = {"object": "list", "results": [], "has_more": False}
+    else:
+        content = {"object": "error", "status": status_code, "code": "", "message": ""}
+    response._content = json.dumps(content).encode()
+    return response
+
+
+def get_request() -> Request:
+    return Request("", Method.GET, Version.v20220628, "pages/", None, None)
+
+
+def get_request_error(status_code: int, headers: dict[str, str]) -> RequestError:
+    return RequestError(get_request(), get_response(status_code, headers))
+
+
+class SequenceTransport(Transport):
+    """responds with the given status codes and headers in turn, recording the sleeps between attempts."""
+
+    def __init__(self, responses: list[tuple[int, dict[str, str]]]):
+        self.responses = responses
+        self.send_count = 0
+        self.sleeps: list[float] = []
+
+    def send(self, method, url, headers, params, json, timeout) -> requests.Response:
+        status_code, response_headers = self.responses[self.send_count]
+        self.send_count += 1
+        return get_response(status_code, response_headers)
+
+
+@pytest.fixture
+def sequence_transport(monkeypatch):
+    """install a SequenceTransport, with the throttling and the sleeps between attempts skipped."""
+    monkeypatch.setattr(rate_limiter, "rate", None)
+
+    def install(responses: list[tuple[int, dict[str, str]]]) -> SequenceTransport:
+        sequence = SequenceTransport(responses)
+        monkeypatch.setattr(transport, "_transport", sequence)
+        monkeypatch.setattr(tenacity.nap.time, "sleep", sequence.sleeps.append)
+        return sequence
+
+    return install
+
+
+def test_retry_policy():
+    policy = RetryPolicy(initial_wait=1, max_wait=4, jitter=False)
+    server_error = get_request_error(502, {})
+    rate_limited = get_request_error(429, {"Retry-After": "7"})
+    validation_error = get_request_error(400, {})
+
+    assert policy.should_retry(server_error)
+    assert policy.should_retry(rate_limited)
+    assert not policy.should_retry(validation_error)
+    assert [policy.get_wait(i, server_error) for i in range(1, 5)] == [1, 2, 4, 4]
+    assert policy.get_wait(1, rate_limited) == 7
+
+    jitter_policy = RetryPolicy(initial_wait=1, max_wait=4, jitter=True)
+    assert 1 <= jitter_policy.get_wait(2, server_error) <= 2
+
+
+def test_retry_loop(monkeypatch, sequence_transport):
+    events = []
+    monkeypatch.setattr(
+        request_core,
+        "retry_policy",
+        RetryPolicy(initial_wait=1, jitter=False, on_event=events.append),
+    )
+    sequence = sequence_transport([(502, {}), (429, {"Retry-After": "7"}), (200, {})])
+    assert get_request().execute().status_code == 200
+    assert sequence.send_count == 3
+    assert sequence.sleeps == [1, 7]
+    assert [(event.kind, event.attempt_number) for event in events] == [
+        ("attempt", 1),
+        ("sleep", 1),
+        ("attempt", 2),
+        ("sleep", 2),
+        ("attempt", 3),
+    ]
+    assert events[3].sleep == 7
+    assert events[3].exception.response.status_code == 429
+
+
+def test_retry_loop_reraise(monkeypatch, sequence_transport):
+    monkeypatch.setattr(request_core, "retry_policy", RetryPolicy(max_attempts=2))
+    sequence = sequence_transport([(502, {}), (503, {}), (200, {})])
+    with pytest.raises(RequestError) as exc_info:
+        get_request().execute()
+    assert exc_info.value.response.status_code == 503
+    assert sequence.send_count == 2
+
+    sequence = sequence_transport([(400, {})])
+    with pytest.raises(RequestError):
+        get_request().execute()
+    assert sequence.send_count == 1
+
+
+def test_retry_loop_deadline(monkeypatch, sequence_transport):
+    monkeypatch.setattr(request_core, "retry_policy", RetryPolicy())
+    sequence = sequence_transport([(429, {"Retry-After": "200"}), (200, {})])
+    with pytest.raises(RequestError) as exc_info:
+        get_request().execute()
+    assert exc_info.value.response.status_code == 429
+    assert sequence.send_count == 1
+    assert sequence.sleeps == []
+
+    monkeypatch.setattr(request_core, "retry_policy", RetryPolicy(deadline=0))
+    sequence = sequence_transport([(502, {}), (200, {})])
+    with pytest.raises(RequestError):
+        get_request().execute()
+    assert sequence.send_count == 1
+
+
+def test_retry_loop_metrics(monkeypatch, sequence_transport):
+    policy_events = []
+    metrics_events: list[Any] = []
+    monkeypatch.setattr(
+        request_core,
+        "retry_policy",
+        RetryPolicy(initial_wait=1, jitter=False, on_event=policy_events.append),
+    )
+    monkeypatch.setattr(metrics, "hooks", [metrics_events.append])
+    sequence_transport([(502, {}), (200, {})])
+    get_request().execute()
+
+    retry_events = [event for event in metrics_events if event.kind == "retry"]
+    sleep_events = [event for event in policy_events if event.kind == "sleep"]
+    assert len(retry_events) == len(sleep_events) == 1
+    assert retry_events[0].duration == sleep_events[0].sleep == 1
+    assert retry_events[0].exception is sleep_events[0].exception
+    assert [event.kind for event in metrics_events] == ["start", "retry", "end"]
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_paginated_parse_metrics(monkeypatch, server, prefetch):
+    database_id = server.add_database(250)
+    events: list[Any] = []
+    monkeypatch.setattr(metrics, "hooks", [events.append])
+    assert (
+        len(list(QueryDatabase(variable.token, database_id).execute(prefetch))) == 250
+    )
+
+    start_cursors = [
+        (event.request.json or {}).get("start_cursor")
+        for event in events
+        if event.kind == "start"
+    ]
+    parse_cursors = [
+        (event.request.json or {}).get("start_cursor")
+        for event in events
+        if event.kind == "parse"
+    ]
+    assert len(start_cursors) == 3
+    assert parse_cursors == start_cursors
@@ -1,6 +1,20 @@
+from dataclasses import dataclass
 from datetime import datetime, date
+from typing import Any, Optional, Union
+from uuid import UUID
 
-from notion_df.core.serialization import deserialize_datetime, serialize_datetime
+import dateutil.parser
+import pytest
+from typing_extensions import Self
+
+from notion_df.core import serialization
+from notion_df.core.serialization import (
+    deserialize_datetime,
+    serialize_datetime,
+    deserialize,
+    get_deserializer,
+    SerializationError,
+)
 from notion_df.core.variable import my_tz
 
 
@@ -11,3 +25,83 @@ def test_serde_datetime():
     assert deserialize_datetime("2023-01-01T00:00:00+09:00") == datetime(
         2023, 1, 1, tzinfo=my_tz
     )
+    assert deserialize_datetime("2022-12-31T15:00:00.000Z") == datetime(
+        2023, 1, 1, tzinfo=my_tz
+    )
+    assert deserialize_datetime("Jan 1 2023 00:00 +0900") == datetime(
+        2023, 1, 1, tzinfo=my_tz
+    )
+
+
+def test_deserialize():
+    assert get_deserializer(list[int]) is get_deserializer(list[int])
+    assert deserialize(dict[str, int], {"a": "1", "b": 2}) == {"a": 1, "b": 2}
+    assert deserialize(list[Optional[UUID]], [None, str(UUID(int=1))]) == [
+        None,
+        UUID(int=1),
+    ]
+    assert deserialize(Union[int, str], "a") == "a"
+    assert deserialize(date, None) is None
+    with pytest.raises(SerializationError) as exc_info:
+        deserialize(list[int], [1, "a"])
+    assert exc_info.value.inverted_path == [1]
+
+
+def test_deserialize_union():
+    from notion_df.misc import DateRange, Emoji, Icon
+    from notion_df.file import ExternalFile
+
+    typ = Union[date, datetime, DateRange]
+    assert deserialize(typ, "2023-01-01") == date(2023, 1, 1)
+    assert deserialize(typ, {"start": "2023-01-01", "end": None}) == DateRange(
+        date(2023, 1, 1)
+    )
+    assert deserialize(Union[Emoji, Icon], {"type": "emoji", "emoji": "a"}) == Emoji(
+        "a"
+    )
+    external = {"type": "external", "external": {"url": "https://a"}}
+    assert isinstance(deserialize(Union[Emoji, Icon], external), ExternalFile)
+    with pytest.raises(SerializationError):
+        deserialize(Union[int, UUID], [1])
+
+
+def test_deserialize_union_new_subclass(monkeypatch):
+    from notion_df import misc
+    from notion_df.misc import Emoji, Icon
+
+    monkeypatch.setattr(misc, "icon_registry", dict(misc.icon_registry))
+    typ = Union[Emoji, Icon, list[int]]
+    assert deserialize(typ, {"type": "emoji", "emoji": "a"}) == Emoji("a")
+
+    @dataclass
+    class CustomEmoji(Icon):
+        name: str
+
+        @classmethod
+        def get_typename(cls) -> str:
+            return "custom_emoji"
+
+        def serialize(self):
+            return {"type": "custom_emoji", "custom_emoji": {"name": self.name}}
+
+        @classmethod
+        def _deserialize_this(cls, raw: dict[str, Any]) -> Self:
+            return cls(raw["custom_emoji"]["name"])
+
+    custom_emoji = CustomEmoji("a")
+    assert deserialize(typ, custom_emoji.serialize()) == custom_emoji
+
+
+def test_deserialize_datetime_malformed_first(monkeypatch):
+    monkeypatch.setattr(serialization, "_datetime_parser_by_format", {})
+    with pytest.raises(dateutil.parser.ParserError):
+        deserialize_datetime("2023-13-01T00:00:00.000Z")
+    assert serialization._datetime_parser_by_format == {}
+
+    assert deserialize_datetime("2022-12-31T15:00:00.000Z") == datetime(
+        2023, 1, 1, tzinfo=my_tz
+    )
+    assert (
+        serialization._datetime_parser_by_format["dddd-dd-ddTdd:dd:dd.dddZ"]
+        is serialization._parse_iso_datetime
+    )
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+
+from notion_df.core.throttle import TokenBucket
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=20, burst=2)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.wait_time > 0
+
+    started_at = time.monotonic()
+    waited = bucket.acquire()
+    assert 0 < waited <= 0.05
+    assert time.monotonic() - started_at >= waited * 0.9
+    assert bucket.stats().acquired == 3
+
+
+def test_token_bucket_queue_depth():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.acquire()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    stats = bucket.stats()
+    assert stats.queue_depth == 3
+    assert stats.wait_time > 0.2
+    for thread in threads:
+        thread.join()
+    assert bucket.queue_depth == 0
+    assert bucket.stats().total_wait_time > 0.5
+
+
+def test_token_bucket_async():
+    bucket = TokenBucket(rate=50, burst=1)
+
+    async def main():
+        return await asyncio.gather(*(bucket.acquire_async() for _ in range(3)))
+
+    wait_times = asyncio.run(main())
+    assert wait_times[0] == 0
+    assert 0 < wait_times[1] < wait_times[2] <= 0.05
+
+
+def test_token_bucket_unlimited():
+    bucket = TokenBucket(rate=None, burst=1)
+    assert all(bucket.acquire() == 0 for _ in range(10))
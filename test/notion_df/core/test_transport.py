@@ -0,0 +1,17 @@
+from notion_df.core import transport
+from notion_df.core.transport import configure_session, get_session
+
+
+def test_configure_session():
+    session = get_session()
+    assert get_session() is session
+
+    settings = configure_session(pool_maxsize=32)
+    assert settings.pool_maxsize == 32
+    assert transport.session_settings.pool_maxsize == 32
+    new_session = get_session()
+    assert new_session is not session
+    # noinspection PyProtectedMember
+    assert new_session.get_adapter("https://api.notion.com")._pool_maxsize == 32
+
+    configure_session(pool_maxsize=10)
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+from uuid import UUID, uuid4
+
+import pytest
+
+from notion_df.contents import ParagraphBlockContents
+from notion_df.data import BlockData, PageData
+from notion_df.entity import Block, Page
+from notion_df.request.block import AppendBlockChildren
+from notion_df.request.page import CreatePage
+from notion_df.rich_text import RichText
+from test.conftest import get_block_raw, get_page_raw
+
+
+def paragraph(text: str, children=None) -> ParagraphBlockContents:
+    contents = ParagraphBlockContents(RichText.from_plain_text(text))
+    contents.children = children
+    return contents
+
+
+def count_blocks(serialized_list: list[dict], depth: int = 0) -> int:
+    """assert the limits of a request, and return the number of blocks."""
+    assert 0 < len(serialized_list) <= 100
+    assert depth <= 2
+    count = 0
+    for serialized in serialized_list:
+        nested = serialized[serialized["type"]].get("children")
+        count += 1 + (count_blocks(nested, depth + 1) if nested else 0)
+    return count
+
+
+class FakeAppendBlockChildren:
+    def __init__(self):
+        self.children_dict: dict[UUID, list[str]] = {}
+        self.chunk_sizes: list[int] = []
+        self.lock = threading.Lock()
+
+    def execute(self, request: AppendBlockChildren) -> list[BlockData]:
+        assert count_blocks(request.get_body()["children"]) <= 1000
+        with self.lock:
+            self.chunk_sizes.append(len(request.children))
+            return [
+                BlockData.deserialize(get_block_raw(self.record(request.id, contents)))
+                for contents in request.children
+            ]
+
+    async def execute_async(self, request: AppendBlockChildren) -> list[BlockData]:
+        await asyncio.sleep(0)
+        return self.execute(request)
+
+    def record(self, parent_id: UUID, contents: ParagraphBlockContents) -> UUID:
+        block_id = uuid4()
+        self.children_dict.setdefault(parent_id, []).append(
+            contents.rich_text.plain_text
+        )
+        self.children_dict[block_id] = []
+        for child in contents.children or []:
+            self.record(block_id, child)
+        return block_id
+
+
+def test_append_children(monkeypatch):
+    fake = FakeAppendBlockChildren()
+    monkeypatch.setattr(
+        AppendBlockChildren, "execute", lambda request: fake.execute(request)
+    )
+    nested = [paragraph(f"nested {i}") for i in range(150)]
+    child_values = [paragraph(str(i)) for i in range(250)]
+    child_values[120] = paragraph("120", nested)
+
+    block_id = uuid4()
+    blocks = Block(block_id).append_children(child_values)
+
+    assert len(blocks) == 250
+    assert fake.children_dict[block_id] == [str(i) for i in range(250)]
+    assert fake.children_dict[blocks[120].id] == [f"nested {i}" for i in range(150)]
+    assert sorted(fake.chunk_sizes) == [50, 50, 100, 100, 100]
+
+
+def test_append_children_async(monkeypatch):
+    fake = FakeAppendBlockChildren()
+    monkeypatch.setattr(
+        AppendBlockChildren,
+        "execute_async",
+        lambda request: fake.execute_async(request),
+    )
+    nested = [paragraph(f"nested {i}") for i in range(150)]
+    child_values = [paragraph(str(i)) for i in range(250)]
+    child_values[0] = paragraph("0", nested)
+
+    block_id = uuid4()
+    blocks = asyncio.run(Block(block_id).append_children_async(child_values))
+
+    assert fake.children_dict[block_id] == [str(i) for i in range(250)]
+    assert fake.children_dict[blocks[0].id] == [f"nested {i}" for i in range(150)]
+
+
+def test_append_children_inline(monkeypatch):
+    fake = FakeAppendBlockChildren()
+    monkeypatch.setattr(
+        AppendBlockChildren, "execute", lambda request: fake.execute(request)
+    )
+    child_values = [paragraph(str(i)) for i in range(150)]
+    # two levels of nesting are sent inline
+    child_values[0] = paragraph(
+        "0", [paragraph(f"0.{i}", [paragraph(f"0.{i}.0")]) for i in range(3)]
+    )
+    # the third level is appended after
+    child_values[1] = paragraph(
+        "1", [paragraph("1.0", [paragraph("1.0.0", [paragraph("1.0.0.0")])])]
+    )
+    # 1000 blocks at most in a request
+    child_values[2] = paragraph(
+        "2", [paragraph(f"2.{i}", [paragraph("") for _ in range(9)]) for i in range(99)]
+    )
+
+    block_id = uuid4()
+    blocks = Block(block_id).append_children(child_values)
+
+    assert fake.children_dict[block_id] == [str(i) for i in range(150)]
+    assert fake.children_dict[blocks[0].id] == ["0.0", "0.1", "0.2"]
+    assert fake.children_dict[blocks[1].id] == ["1.0"]
+    assert len(fake.children_dict[blocks[2].id]) == 99
+    assert sorted(fake.chunk_sizes) == [1, 4, 46, 100]
+
+
+def test_append_children_async_cancel(monkeypatch):
+    started = []
+
+    async def execute_async(request):
+        started.append(request.id)
+        if len(started) == 1:
+            return [BlockData.deserialize(get_block_raw()) for _ in request.children]
+        await asyncio.sleep(0 if request.id == block_id else 10)
+        if request.id == block_id:
+            raise RuntimeError
+        return []
+
+    monkeypatch.setattr(AppendBlockChildren, "execute_async", execute_async)
+    nested = [paragraph("", [paragraph("", [paragraph("")])])]
+    child_values = [paragraph(str(i), nested) for i in range(150)]
+
+    block_id = uuid4()
+
+    async def append() -> None:
+        with pytest.raises(RuntimeError):
+            await Block(block_id).append_children_async(child_values)
+        assert all(
+            task.done()
+            for task in asyncio.all_tasks()
+            if task is not asyncio.current_task()
+        )
+
+    asyncio.run(append())
+    assert len(started) > 2
+
+
+def test_create_child_page(fake_execute):
+    fake = FakeAppendBlockChildren()
+    fake_execute.patch(AppendBlockChildren, fake.execute)
+    fake_execute.patch(CreatePage, lambda request: PageData.deserialize(get_page_raw()))
+    nested = [paragraph("0.0", [paragraph("0.0.0")])]
+
+    Page(uuid4()).create_child_page(children=[paragraph("0", nested)])
+    (request,) = fake_execute.requests
+    assert count_blocks(request.get_body()["children"]) == 3
+
+    fake_execute.clear()
+    child_values = [paragraph(str(i)) for i in range(120)]
+    child_values[10] = paragraph("10", [paragraph("", nested)])
+    Page(uuid4()).create_child_page(children=child_values)
+    create_request, *append_requests = fake_execute.requests
+    assert len(create_request.children) == 10
+    assert sorted(len(request.children) for request in append_requests) == [1, 10, 100]
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from uuid import UUID, uuid4
+
+import pytest
+
+from notion_df.core import transport
+from notion_df.core.request_core import RequestError
+from notion_df.data import PageData
+from notion_df.entity import Database, Page
+from notion_df.property import TitleProperty
+from notion_df.request.database import QueryDatabase
+from notion_df.request.page import RetrievePage
+from test.conftest import get_page_raw, get_title_raw
+
+
+def get_related_page_raw(related_ids: list[UUID]) -> dict:
+    return get_page_raw(
+        properties={
+            "Links": {
+                "id": "b",
+                "type": "relation",
+                "relation": [{"id": str(related_id)} for related_id in related_ids],
+                "has_more": False,
+            }
+        }
+    )
+
+
+def test_query_prefetch_related(monkeypatch, fake_execute):
+    r1, r2, r3 = (uuid4() for _ in range(3))
+    responses = [
+        {"results": [get_related_page_raw([r1, r2])], "has_more": True},
+        {"results": [get_related_page_raw([r2, r3])], "has_more": False},
+    ]
+    monkeypatch.setattr(QueryDatabase, "execute_raw", lambda *_: iter(responses))
+    fake_execute.patch(
+        RetrievePage,
+        lambda request: PageData.deserialize(get_page_raw(request.id)).set_real(),
+    )
+
+    pages = Database(uuid4()).query(prefetch_related=["Links"])
+    assert pages[0]
+    assert sorted(fake_execute.requested_ids) == sorted([r1, r2])
+    assert len(pages) == 2
+    assert sorted(fake_execute.requested_ids) == sorted([r1, r2, r3])
+
+
+def test_query_prefetch_related_not_relation(monkeypatch, fake_execute):
+    raw = get_related_page_raw([uuid4()])
+    raw["properties"]["Name"] = get_title_raw("a")
+    monkeypatch.setattr(
+        QueryDatabase,
+        "execute_raw",
+        lambda *_: iter([{"results": [raw], "has_more": False}]),
+    )
+    fake_execute.patch(RetrievePage, lambda request: None)
+
+    for prop in ["Name", TitleProperty("Name")]:
+        with pytest.raises(ValueError):
+            list(Database(uuid4()).query(prefetch_related=[prop]))
+    assert fake_execute.requests == []
+
+
+def test_retrieve_async_concurrently(server):
+    database = server.database_dict[server.add_database(12)]
+    pages = [Page(database.get_page_id(index)) for index in range(12)]
+    server.latency = 0.2
+
+    async def retrieve_all() -> float:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(page.retrieve_async() for page in pages))
+        return time.perf_counter() - started_at
+
+    # 12 requests on 10 workers take 2 rounds of the latency
+    assert asyncio.run(retrieve_all()) < 0.2 * 6
+    assert all(page.local_data for page in pages)
+
+    transport.configure_session(pool_maxsize=3)
+    try:
+        # capped to 3 concurrent requests, 4 rounds
+        assert asyncio.run(retrieve_all()) >= 0.2 * 4
+    finally:
+        transport.configure_session(pool_maxsize=10)
+
+
+def test_query_async(server):
+    database = Database(server.add_database(250))
+
+    async def query() -> list[Page]:
+        return [page async for page in database.query_async()]
+
+    pages = asyncio.run(query())
+    assert len(pages) == 250
+    assert pages[3].data.properties["Count"] == 3
+    assert server.request_count == 3
+
+    async def query_missing() -> list[Page]:
+        return [page async for page in Database(uuid4()).query_async()]
+
+    with pytest.raises(RequestError) as exc_info:
+        asyncio.run(query_missing())
+    assert exc_info.value.response.status_code == 404
+
+
+def test_query_prefetch_close(server):
+    database = Database(server.add_database(500))
+
+    def get_prefetch_threads() -> list[threading.Thread]:
+        return [
+            thread
+            for thread in threading.enumerate()
+            if thread.name == "notion_df-prefetch"
+        ]
+
+    with database.query(prefetch=1) as pages:
+        assert pages[0]
+        assert (threads := get_prefetch_threads())
+    for thread in threads:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    assert server.request_count < 5
+    assert len(pages) == 1
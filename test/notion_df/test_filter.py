@@ -0,0 +1,158 @@
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from notion_df.core.variable import my_tz
+from notion_df.data import PageData
+from notion_df.entity import Page
+from notion_df.filter import (
+    LocalEvaluationError,
+    PropertyFilter,
+    RollupPropertyAggregateFilter,
+    last_edited_time_filter,
+)
+from notion_df.property import (
+    DateProperty,
+    MultiSelectProperty,
+    NumberProperty,
+    RelationProperty,
+    SelectProperty,
+    TitleProperty,
+)
+from test.conftest import get_page_raw, get_title_raw
+
+related_page_id = str(uuid4())
+
+
+def get_page_data(title: str, number, due: str, select) -> PageData:
+    return PageData.deserialize(
+        get_page_raw(
+            properties={
+                "Name": get_title_raw(title),
+                "Count": {"id": "a", "type": "number", "number": number},
+                "Due": {
+                    "id": "b",
+                    "type": "date",
+                    "date": due and {"start": due, "end": None, "time_zone": None},
+                },
+                "Stage": {
+                    "id": "c",
+                    "type": "select",
+                    "select": select
+                    and {"id": "1", "name": select, "color": "default"},
+                },
+                "Tags": {
+                    "id": "d",
+                    "type": "multi_select",
+                    "multi_select": [{"id": "2", "name": "x", "color": "default"}],
+                },
+                "Links": {
+                    "id": "e",
+                    "type": "relation",
+                    "relation": [{"id": related_page_id}],
+                    "has_more": False,
+                },
+            }
+        )
+    )
+
+
+def test_evaluate():
+    page_data = get_page_data("Hello World", 0, "2023-01-05", "done")
+    name = TitleProperty("Name").filter
+    count = NumberProperty("Count").filter
+    due = DateProperty("Due").filter
+    stage = SelectProperty("Stage").filter
+
+    assert name.contains("hello").evaluate(page_data)
+    assert name.starts_with("HELLO").evaluate(page_data)
+    assert not name.ends_with("hello").evaluate(page_data)
+    assert not name.is_empty().evaluate(page_data)
+    assert count.equals(0).evaluate(page_data)
+    assert not count.is_empty().evaluate(page_data)
+    assert count.less_than(1).evaluate(page_data)
+    assert due.after(date(2023, 1, 4)).evaluate(page_data)
+    assert due.on_or_before(datetime(2023, 1, 5, 12, tzinfo=my_tz)).evaluate(page_data)
+    assert not due.past_week().evaluate(page_data)
+    assert stage.equals("done").evaluate(page_data)
+    assert MultiSelectProperty("Tags").filter.contains("x").evaluate(page_data)
+    assert (
+        RelationProperty("Links")
+        .filter.contains(Page(related_page_id))
+        .evaluate(page_data)
+    )
+    assert last_edited_time_filter.on_or_after(date(2023, 1, 2)).evaluate(page_data)
+
+    assert (count.equals(1) | stage.equals("done")).evaluate(page_data)
+    assert not (count.equals(1) & stage.equals("done")).evaluate(page_data)
+
+
+def test_evaluate_empty():
+    page_data = get_page_data("", None, None, None)
+    assert TitleProperty("Name").filter.is_empty().evaluate(page_data)
+    assert NumberProperty("Count").filter.is_empty().evaluate(page_data)
+    assert not NumberProperty("Count").filter.greater_than(-1).evaluate(page_data)
+    assert DateProperty("Due").filter.is_empty().evaluate(page_data)
+    assert not DateProperty("Due").filter.past_week().evaluate(page_data)
+    assert SelectProperty("Stage").filter.does_not_equal("done").evaluate(page_data)
+
+
+def test_evaluate_relative_date():
+    yesterday = (datetime.now(my_tz) - timedelta(days=1)).date().isoformat()
+    page_data = get_page_data("", None, yesterday, None)
+    assert DateProperty("Due").filter.past_week().evaluate(page_data)
+    assert not DateProperty("Due").filter.next_week().evaluate(page_data)
+
+
+def test_evaluate_rollup():
+    raw = get_page_data("", None, None, None).raw
+    rollup_raw = {
+        "function": "show_original",
+        "type": "array",
+        "array": [
+            {"type": "number", "number": 1},
+            {"type": "number", "number": 3},
+        ],
+    }
+    page_data = PageData.deserialize(
+        {
+            **raw,
+            "properties": {
+                **raw["properties"],
+                "Rollup": {"id": "f", "type": "rollup", "rollup": rollup_raw},
+                "Sum": {
+                    "id": "g",
+                    "type": "rollup",
+                    "rollup": {"function": "sum", "type": "number", "number": 4},
+                },
+            },
+        }
+    )
+
+    def rollup_filter(aggregate_type, condition, name="Rollup"):
+        return RollupPropertyAggregateFilter(name, aggregate_type, "number", condition)
+
+    assert rollup_filter("any", {"greater_than": 2}).evaluate(page_data)
+    assert not rollup_filter("every", {"greater_than": 2}).evaluate(page_data)
+    assert rollup_filter("none", {"equals": 2}).evaluate(page_data)
+    with pytest.raises(LocalEvaluationError):
+        rollup_filter("any", {"equals": 4}, "Sum").evaluate(page_data)
+    with pytest.raises(LocalEvaluationError):
+        rollup_filter("any", {"equals": 4}, "Missing").evaluate(page_data)
+
+
+def test_evaluate_unknown_condition():
+    page_data = get_page_data("", None, None, None)
+    due_filter = PropertyFilter("Due", "date", {"this_week": {}})
+    assert due_filter.serialize() == {"property": "Due", "date": {"this_week": {}}}
+    with pytest.raises(LocalEvaluationError):
+        due_filter.evaluate(page_data)
+    with pytest.raises(LocalEvaluationError):
+        PropertyFilter("Count", "number", {"contains": 1}).evaluate(page_data)
+    with pytest.raises(LocalEvaluationError):
+        RollupPropertyAggregateFilter(
+            "Rollup", "any", "checkbox", {"is_empty": True}
+        ).evaluate(page_data)
+    with pytest.raises(LocalEvaluationError):
+        PropertyFilter("Count", "unique_id", {"equals": 1}).evaluate(page_data)
@@ -0,0 +1,153 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from notion_df.core.variable import my_tz
+from notion_df.data import PageData
+from notion_df.frame import get_columns, get_page_diffs, to_frame, write_parquet
+from notion_df.property import DatabaseProperties
+from test.conftest import get_page_raw, get_title_raw
+
+pd = pytest.importorskip("pandas")
+
+database_properties_raw = {
+    "Name": {"id": "title", "type": "title", "title": {}},
+    "Count": {"id": "a", "type": "number", "number": {"format": "number"}},
+    "Done": {"id": "b", "type": "checkbox", "checkbox": {}},
+    "Due": {"id": "c", "type": "date", "date": {}},
+    "Stage": {
+        "id": "d",
+        "type": "select",
+        "select": {
+            "options": [
+                {"id": "1", "name": "todo", "color": "red"},
+                {"id": "2", "name": "done", "color": "green"},
+            ]
+        },
+    },
+    "Links": {
+        "id": "e",
+        "type": "relation",
+        "relation": {
+            "database_id": "5c2a8e0c-6a4c-4b6b-9a7d-3f1c2e4b5a6d",
+            "type": "single_property",
+            "single_property": {},
+        },
+    },
+}
+
+
+def get_result_raw(page_id: str, name: str, count, done, due, stage, links) -> dict:
+    """only the fields which the frame reads."""
+    return {
+        "object": "page",
+        "id": page_id,
+        "properties": {
+            "Name": {
+                "id": "title",
+                "type": "title",
+                "title": [{"type": "text", "plain_text": name}],
+            },
+            "Count": {"id": "a", "type": "number", "number": count},
+            "Done": {"id": "b", "type": "checkbox", "checkbox": done},
+            "Due": {"id": "c", "type": "date", "date": due and {"start": due}},
+            "Stage": {"id": "d", "type": "select", "select": stage and {"name": stage}},
+            "Links": {
+                "id": "e",
+                "type": "relation",
+                "relation": [{"id": link} for link in links],
+            },
+        },
+    }
+
+
+def get_response_data() -> list[dict]:
+    return [
+        {
+            "results": [
+                get_result_raw("p1", "a", 1, True, "2023-01-01", "done", ["r1", "r2"]),
+                get_result_raw("p2", "b", None, False, None, None, []),
+            ]
+        },
+        {
+            "results": [
+                get_result_raw(
+                    "p3", "c", 2.5, False, "2023-01-01T03:00:00.000Z", "new", []
+                ),
+            ]
+        },
+    ]
+
+
+def test_to_frame():
+    columns = get_columns(DatabaseProperties.deserialize(database_properties_raw))
+    frame = to_frame(columns, get_response_data())
+
+    assert list(frame.index) == ["p1", "p2", "p3"]
+    assert list(frame.columns) == ["Name", "Count", "Done", "Due", "Stage", "Links"]
+    assert str(frame["Name"].dtype) == "string"
+    assert str(frame["Count"].dtype) == "Float64"
+    assert frame["Count"].isna().tolist() == [False, True, False]
+    assert str(frame["Done"].dtype) == "boolean"
+    assert frame["Due"]["p1"] == datetime(2023, 1, 1, tzinfo=my_tz)
+    assert frame["Due"]["p3"] == datetime(2023, 1, 1, 12, tzinfo=my_tz)
+    assert pd.isna(frame["Due"]["p2"])
+    assert list(frame["Stage"].cat.categories) == ["todo", "done", "new"]
+    assert frame["Links"]["p1"] == ["r1", "r2"]
+
+
+def test_write_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    columns = get_columns(DatabaseProperties.deserialize(database_properties_raw))
+    path = tmp_path / "database.parquet"
+    assert write_parquet(columns, get_response_data(), path) == 3
+
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 2
+    table = parquet_file.read()
+    assert table.column_names == ["id", *(column.name for column in columns)]
+    assert table["Due"].to_pylist()[0] == datetime(2023, 1, 1, tzinfo=my_tz)
+    assert table["Stage"].to_pylist() == ["done", None, "new"]
+    assert table["Links"].to_pylist() == [["r1", "r2"], [], []]
+
+
+def get_full_page_raw(name: str, count, due) -> dict:
+    return get_page_raw(
+        properties={
+            "Name": get_title_raw(name),
+            "Count": {"id": "a", "type": "number", "number": count},
+            "Due": {
+                "id": "c",
+                "type": "date",
+                "date": {"start": due, "end": None, "time_zone": None},
+            },
+        }
+    )
+
+
+def test_get_page_diffs():
+    database_properties = DatabaseProperties.deserialize(
+        {name: database_properties_raw[name] for name in ["Name", "Count", "Due"]}
+    )
+    database = SimpleNamespace(properties=database_properties)
+    page_data_list = [
+        PageData.deserialize(get_full_page_raw("a", 1, "2023-01-01")).set_real(),
+        PageData.deserialize(get_full_page_raw("b", 2, "2023-01-01")).set_real(),
+    ]
+    columns = get_columns(database_properties)
+    frame = to_frame(columns, [{"results": [data.raw for data in page_data_list]}])
+    frame.loc[frame.index[0], "Count"] = 1.5
+    frame.loc[frame.index[1], "Due"] = datetime(2023, 1, 2, tzinfo=my_tz)
+
+    diffs = get_page_diffs(frame, database)
+    assert [page.id for page, _ in diffs] == [data.id for data in page_data_list]
+    assert diffs[0][1].serialize() == {"Count": {"type": "number", "number": 1.5}}
+    assert diffs[1][1].serialize() == {
+        "Due": {
+            "type": "date",
+            "date": {"start": "2023-01-02", "end": None},
+        }
+    }
+    for data in page_data_list:
+        data.unset_real()
@@ -0,0 +1,42 @@
+from notion_df.core import transport
+from notion_df.core.transport import RecordingTransport, ReplayTransport
+from notion_df.entity import Database
+
+
+def test_stand_in_server(server):
+    database = Database(server.add_database(250))
+    pages = database.query()
+    assert len(pages) == 250
+    assert pages[3].data.properties["Count"] == 3
+    assert database.properties.get("Stage")
+    assert list(pages[0].as_block().retrieve_children()) == []
+
+    server.rate_limit_ratio = 0.5
+    assert len(database.query_frame()) == 250
+    assert server.rate_limited_count > 0
+
+
+def test_record_and_replay(server, tmp_path):
+    database = Database(server.add_database(150))
+    path = tmp_path / "records.jsonl"
+    previous = transport.set_transport(RecordingTransport(path))
+    try:
+        frame = database.query_frame()
+        transport.set_transport(ReplayTransport(path))
+        server.stop()
+        assert database.query_frame().equals(frame)
+    finally:
+        transport.set_transport(previous)
+
+
+def test_stand_in_server_malformed_id(server):
+    for method, path in [
+        ("GET", "/v1/pages/abc"),
+        ("POST", "/v1/databases/abc/query"),
+        ("GET", "/v1/blocks/abc/children"),
+        ("PATCH", "/v1/blocks/abc/children"),
+    ]:
+        status, response, _ = server.handle(method, path, None, {"children": [{}]})
+        assert status == 400
+        assert response["code"] == "validation_error"
+    assert server.block_children_dict == {}
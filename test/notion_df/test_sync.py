@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from notion_df.data import PageData
+from notion_df.entity import Database
+from notion_df.filter import TimestampFilter
+from notion_df.request.database import QueryDatabase
+from test.conftest import get_page_raw
+
+
+def get_count_page_raw(page_id: UUID, last_edited_time: str, number) -> dict:
+    return get_page_raw(
+        page_id,
+        {"Count": {"id": "a", "type": "number", "number": number}},
+        last_edited_time=last_edited_time,
+    )
+
+
+def test_sync(monkeypatch):
+    page_ids = [uuid4() for _ in range(3)]
+    responses = [
+        [
+            get_count_page_raw(page_ids[0], "2023-01-01T00:00:00.000Z", 1),
+            get_count_page_raw(page_ids[1], "2023-01-02T00:00:00.000Z", 1),
+        ],
+        [
+            get_count_page_raw(page_ids[1], "2023-01-02T00:00:00.000Z", 1),
+            get_count_page_raw(page_ids[2], "2023-01-03T00:00:00.000Z", 1),
+        ],
+        [get_count_page_raw(page_ids[2], "2023-01-03T00:00:00.000Z", 2)],
+    ]
+    queries: list[QueryDatabase] = []
+
+    def execute(self: QueryDatabase, prefetch: int = 0):
+        queries.append(self)
+        for raw in responses[len(queries) - 1]:
+            yield PageData.deserialize(raw)
+
+    monkeypatch.setattr(QueryDatabase, "execute", execute)
+    database = Database(uuid4())
+
+    result = database.sync()
+    assert [page.id for page in result.added] == [page_ids[0], page_ids[1]]
+    assert queries[0].filter is None
+    assert queries[0].sort[0].serialize() == {
+        "timestamp": "last_edited_time",
+        "direction": "ascending",
+    }
+
+    result = database.sync()
+    assert isinstance(watermark_filter := queries[1].filter, TimestampFilter)
+    assert watermark_filter.condition == {
+        "on_or_after": datetime(2023, 1, 2, tzinfo=timezone.utc)
+    }
+    assert [page.id for page in result.added] == [page_ids[2]]
+    assert not result.updated
+
+    result = database.sync()
+    assert not result.added
+    assert [page.id for page in result.updated] == [page_ids[2]]
+    assert len(database.mirror) == 3
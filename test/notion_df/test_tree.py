@@ -0,0 +1,52 @@
+from uuid import uuid4
+
+from notion_df.data import BlockData
+from notion_df.entity import Page
+from notion_df.request.block import RetrieveBlockChildren
+from test.conftest import get_block_raw
+
+
+def test_retrieve_descendants(fake_execute):
+    # root -> [a -> [a1, a2 -> [a21]], b]
+    root_id, a, a1, a2, a21, b = (uuid4() for _ in range(6))
+    children_dict = {root_id: [a, b], a: [a1, a2], a2: [a21]}
+
+    def respond(request: RetrieveBlockChildren):
+        for child_id in children_dict[request.id]:
+            yield BlockData.deserialize(
+                get_block_raw(child_id, request.id, child_id in children_dict)
+            )
+
+    fake_execute.patch(RetrieveBlockChildren, respond)
+    streamed = []
+    root = Page(root_id).retrieve_descendants(callback=streamed.append)
+
+    assert [node.block.id for node in root.walk()] == [a, a1, a2, a21, b]
+    assert sorted(fake_execute.requested_ids) == sorted([root_id, a, a2])
+    assert len(streamed) == 5
+    a21_node = root.children[0].children[1].children[0]
+    assert a21_node.depth == 3
+    assert a21_node.parent.parent.block.id == a
+
+    fake_execute.clear()
+    root = Page(root_id).retrieve_descendants(max_depth=1)
+    assert [node.block.id for node in root.walk()] == [a, b]
+    assert fake_execute.requested_ids == [root_id]
+
+
+def test_retrieve_descendants_child_pages(fake_execute):
+    # root -> [child page -> [a]]
+    root_id, child_page_id, a = (uuid4() for _ in range(3))
+    child_page_raw = get_block_raw(child_page_id, root_id, True)
+    del child_page_raw["paragraph"]
+    child_page_raw.update(type="child_page", child_page={"title": "child"})
+    raw_dict = {root_id: [child_page_raw], child_page_id: [get_block_raw(a)]}
+    fake_execute.patch(
+        RetrieveBlockChildren,
+        lambda request: (BlockData.deserialize(raw) for raw in raw_dict[request.id]),
+    )
+
+    root = Page(root_id).retrieve_descendants()
+    assert [node.block.id for node in root.walk()] == [child_page_id]
+    root = Page(root_id).retrieve_descendants(include_child_pages=True)
+    assert [node.block.id for node in root.walk()] == [child_page_id, a]